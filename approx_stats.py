@@ -0,0 +1,343 @@
+from collections import namedtuple
+
+import numpy as np
+from scipy import stats
+
+# Valor estimado e intervalo de confiança
+Estimate = namedtuple("Estimate", ["value", "low", "high"])
+
+# Orçamento padrão de amostras (nós, caminhos ou pivôs) de cada estimador
+SAMPLE_BUDGET = 2000
+CONFIDENCE = 0.95
+
+# Caminhos u–w–v sorteados por nó no clustering amostrado (limita o custo dos hubs)
+WEDGES_PER_NODE = 32
+
+# Iterações de potência e tolerância da centralidade de autovetor aproximada
+EIGENVECTOR_ITER = 50
+EIGENVECTOR_TOL = 1.0e-4
+
+# Registradores por nó no HyperLogLog da função de vizinhança (erro ~ 1.04 / sqrt(m))
+HLL_REGISTERS = 32
+HLL_TRIALS = 3
+HLL_BLOCK_NNZ = 5_000_000
+
+# Nós de maior betweenness estimada mantidos no resumo gravado (ver `summarize`)
+TOP_BETWEENNESS = 20
+
+
+def normal_interval(mean, std_err, confidence=CONFIDENCE):
+    z = stats.norm.ppf(0.5 + confidence / 2)
+    return Estimate(mean, mean - z * std_err, mean + z * std_err)
+
+
+def sample_mean(values, confidence=CONFIDENCE):
+    """Média amostral com intervalo pela distribuição t."""
+    values = np.asarray(values, dtype=np.float64)
+    mean = values.mean(axis=0)
+    if len(values) < 2:
+        return Estimate(mean, mean, mean)
+    std_err = values.std(axis=0, ddof=1) / np.sqrt(len(values))
+    t = stats.t.ppf(0.5 + confidence / 2, len(values) - 1)
+    return Estimate(mean, mean - t * std_err, mean + t * std_err)
+
+
+def common_neighbors(a, b):
+    """Interseção de duas listas ordenadas de vizinhos (busca a menor na maior)."""
+    if len(a) > len(b):
+        a, b = b, a
+    if not len(a):
+        return a
+    pos = np.minimum(np.searchsorted(b, a), len(b) - 1)
+    return a[b[pos] == a]
+
+
+def sampled_average_clustering(graph, num_samples=SAMPLE_BUDGET, seed=42, confidence=CONFIDENCE,
+                               wedges=WEDGES_PER_NODE):
+    """Clustering bipartido médio estimado com uma amostra de nós e de caminhos em cada nó.
+
+    De cada nó `u` sorteado saem `wedges` caminhos u–w–v, que chegam a `v` com
+    probabilidade p(v) = Σ 1 / (d_u (d_w - 1)) sobre os vizinhos comuns `w`. A
+    média de |N(u) ∩ N(v)| / |N(u) ∪ N(v)| sobre os `v` distintos é estimada com
+    pesos 1 / p(v), e o custo por nó fica em `wedges` interseções de listas de
+    vizinhos, mesmo nos hubs.
+    """
+    rng = np.random.default_rng(seed)
+    n = graph.num_nodes
+    A = graph.adjacency
+    degrees = graph.degrees()
+    keys = edge_keys(graph)
+    sample = rng.choice(n, size=min(num_samples, n), replace=False)
+    clustering = np.zeros(len(sample))
+    for k, u in enumerate(sample.tolist()):
+        neighbors = A.indices[A.indptr[u]:A.indptr[u + 1]]
+        w = neighbors[rng.integers(0, len(neighbors), wedges)] if len(neighbors) else neighbors
+        w = w[degrees[w] > 1]
+        if not len(w):
+            # Sem vizinhos a dois passos o clustering do nó é 0
+            continue
+        v = random_neighbors(graph, keys, w, np.full(len(w), u), rng)
+        values = np.empty(len(v))
+        weights = np.empty(len(v))
+        for i, other in enumerate(v.tolist()):
+            common = common_neighbors(neighbors, A.indices[A.indptr[other]:A.indptr[other + 1]])
+            shared = len(common)
+            probability = np.sum(1.0 / (degrees[common] - 1)) / len(neighbors)
+            values[i] = shared / (len(neighbors) + degrees[other] - shared) / probability
+            weights[i] = 1.0 / probability
+        clustering[k] = values.sum() / weights.sum()
+    return sample_mean(clustering, confidence)
+
+
+def approximate_eigenvector_centrality(graph, max_iter=EIGENVECTOR_ITER, tol=EIGENVECTOR_TOL):
+    """Centralidade de autovetor com um número fixo de iterações de potência.
+
+    Mesmo esquema de `graph_stats.eigenvector_centrality`, mas com custo
+    limitado a `max_iter` produtos pela matriz: devolve o vetor da última
+    iteração em vez de falhar quando não converge.
+    """
+    n = graph.num_nodes
+    A = graph.adjacency.astype(np.float64)
+    x = np.full(n, 1.0 / max(n, 1))
+    for _ in range(max_iter):
+        x_last = x
+        x = x_last + A @ x_last
+        x = x / (np.linalg.norm(x) or 1.0)
+        if np.abs(x - x_last).sum() < n * tol:
+            break
+    return x
+
+
+def edge_keys(graph):
+    """Chave `linha * n + coluna` de cada entrada da CSR (ordenada, permite busca binária)."""
+    A = graph.adjacency
+    rows = np.repeat(np.arange(graph.num_nodes, dtype=np.int64), np.diff(A.indptr))
+    return rows * graph.num_nodes + A.indices
+
+
+def edge_exists(graph, keys, u, v):
+    """Testa, de forma vetorizada, se cada par `(u[i], v[i])` é uma aresta."""
+    wanted = u.astype(np.int64) * graph.num_nodes + v
+    pos = np.minimum(np.searchsorted(keys, wanted), len(keys) - 1)
+    return keys[pos] == wanted
+
+
+def random_neighbors(graph, keys, nodes, exclude, rng):
+    """Um vizinho aleatório de cada nó, diferente do respectivo `exclude`."""
+    A = graph.adjacency
+    start = A.indptr[nodes]
+    degrees = A.indptr[nodes + 1] - start
+    # Sorteia entre os d - 1 vizinhos restantes e pula a posição de `exclude`
+    offsets = rng.integers(0, degrees - 1)
+    excluded = np.searchsorted(keys, nodes.astype(np.int64) * graph.num_nodes + exclude) - start
+    offsets += offsets >= excluded
+    return A.indices[start + offsets]
+
+
+def wedge_sampling_clustering(graph, num_samples=SAMPLE_BUDGET, seed=42, confidence=CONFIDENCE):
+    """Clustering bipartido de Robins–Alexander (fração de caminhos de 3 arestas que fecham um ciclo de 4).
+
+    É o análogo bipartido da amostragem de wedges: sorteia caminhos u–w–v–x
+    uniformemente (aresta central com peso (d_w - 1)(d_v - 1)) e verifica se a
+    aresta u–x existe.
+    """
+    rng = np.random.default_rng(seed)
+    w, v = graph.edges()
+    degrees = graph.degrees()
+    weights = (degrees[w] - 1).astype(np.float64) * (degrees[v] - 1)
+    total = weights.sum()
+    if total == 0:
+        return Estimate(0.0, 0.0, 0.0)
+    chosen = rng.choice(len(w), size=num_samples, p=weights / total)
+    w, v = w[chosen], v[chosen]
+    keys = edge_keys(graph)
+    u = random_neighbors(graph, keys, w, v, rng)
+    x = random_neighbors(graph, keys, v, w, rng)
+    closed = edge_exists(graph, keys, u, x) & (u != x)
+    p = closed.mean()
+    return normal_interval(p, np.sqrt(p * (1 - p) / num_samples), confidence)
+
+
+def pivot_bfs(A, source):
+    """BFS por níveis a partir de `source`: níveis, número de caminhos mínimos e distâncias."""
+    n = A.shape[0]
+    sigma = np.zeros(n)
+    dist = np.full(n, -1, dtype=np.int64)
+    sigma[source] = 1.0
+    dist[source] = 0
+    frontier = np.array([source])
+    levels = [frontier]
+    while True:
+        paths = A[frontier].T @ sigma[frontier]
+        frontier = np.flatnonzero((paths > 0) & (dist < 0))
+        if not len(frontier):
+            return levels, sigma, dist
+        dist[frontier] = len(levels)
+        sigma[frontier] = paths[frontier]
+        levels.append(frontier)
+
+
+def pivot_dependencies(A, levels, sigma):
+    """Acúmulo de dependências de Brandes, nível a nível, a partir do mais distante."""
+    delta = np.zeros(A.shape[0])
+    for current, following in zip(levels[-2::-1], levels[:0:-1]):
+        coef = np.zeros(A.shape[0])
+        coef[following] = (1 + delta[following]) / sigma[following]
+        delta[current] = sigma[current] * (A[current] @ coef)
+    delta[levels[0]] = 0
+    return delta
+
+
+def approximate_betweenness(graph, num_pivots=SAMPLE_BUDGET, seed=42, confidence=CONFIDENCE):
+    """Betweenness normalizada (como em `nx.betweenness_centrality`) com pivôs sorteados.
+
+    Retorna um `Estimate` de vetores indexados pelos nós e a distância média
+    estimada com as mesmas BFS.
+    """
+    rng = np.random.default_rng(seed)
+    n = graph.num_nodes
+    A = graph.adjacency.astype(np.float64)
+    pivots = rng.choice(n, size=min(num_pivots, n), replace=False)
+    scale = n / ((n - 1) * (n - 2)) if n > 2 else 0.0
+
+    total = np.zeros(n)
+    total_sq = np.zeros(n)
+    distances = []
+    for source in pivots:
+        levels, sigma, dist = pivot_bfs(A, source)
+        contribution = pivot_dependencies(A, levels, sigma) * scale
+        total += contribution
+        total_sq += contribution ** 2
+        if len(levels) > 1:
+            distances.append(dist[dist > 0].mean())
+
+    k = len(pivots)
+    mean = total / k
+    variance = np.maximum(total_sq / k - mean ** 2, 0) * k / max(k - 1, 1)
+    betweenness = normal_interval(mean, np.sqrt(variance / k), confidence)
+    avg_distance = sample_mean(distances, confidence) if distances else Estimate(0.0, 0.0, 0.0)
+    return betweenness, avg_distance
+
+
+def hll_cardinality(registers):
+    """Estimativa HyperLogLog (com correção para conjuntos pequenos) de cada linha."""
+    m = registers.shape[1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)), axis=1)
+    zeros = np.sum(registers == 0, axis=1)
+    small = (raw <= 2.5 * m) & (zeros > 0)
+    raw[small] = m * np.log(m / zeros[small])
+    return raw
+
+
+def neighbourhood_function(graph, registers=HLL_REGISTERS, max_hops=50, seed=42):
+    """Função de vizinhança N(t) (pares a distância <= t) pelo método HyperANF."""
+    rng = np.random.default_rng(seed)
+    n = graph.num_nodes
+    A = graph.adjacency
+    counters = np.zeros((n, registers), dtype=np.uint8)
+    ranks = np.minimum(rng.geometric(0.5, n), 32).astype(np.uint8)
+    counters[np.arange(n), rng.integers(0, registers, n)] = ranks
+    has_neighbors = np.diff(A.indptr) > 0
+
+    curve = [hll_cardinality(counters).sum()]
+    rows_per_block = max(1, HLL_BLOCK_NNZ // max(1, A.nnz // max(n, 1)))
+    for _ in range(max_hops):
+        updated = counters.copy()
+        for start in range(0, n, rows_per_block):
+            end = min(n, start + rows_per_block)
+            lo, hi = A.indptr[start], A.indptr[end]
+            if lo == hi:
+                continue
+            gathered = counters[A.indices[lo:hi]]
+            # Só as linhas com vizinhos delimitam segmentos: com início repetido
+            # (linhas vazias) o `reduceat` encurtaria o segmento anterior
+            mask = has_neighbors[start:end]
+            segment_starts = A.indptr[start:end][mask] - lo
+            block = np.maximum.reduceat(gathered, segment_starts, axis=0)
+            rows = updated[start:end]
+            rows[mask] = np.maximum(rows[mask], block)
+        if np.array_equal(updated, counters):
+            break
+        counters = updated
+        curve.append(hll_cardinality(counters).sum())
+    return np.array(curve)
+
+
+def effective_diameter(curve, quantile=0.9):
+    """Menor t (interpolado) com N(t) >= quantile * N(∞)."""
+    target = quantile * curve[-1]
+    t = int(np.searchsorted(curve, target))
+    if t == 0:
+        return 0.0
+    return t - 1 + (target - curve[t - 1]) / (curve[t] - curve[t - 1])
+
+
+def approximate_effective_diameter(graph, registers=HLL_REGISTERS, trials=HLL_TRIALS,
+                                   quantile=0.9, seed=42, confidence=CONFIDENCE):
+    """Diâmetro efetivo por HyperANF, repetido com sementes diferentes para o intervalo."""
+    values = [
+        effective_diameter(neighbourhood_function(graph, registers, seed=seed + trial), quantile)
+        for trial in range(trials)
+    ]
+    return sample_mean(values, confidence)
+
+
+def approximate_network_statistics(graph, sample_budget=SAMPLE_BUDGET, seed=42):
+    """Versão amostrada de `graph_stats.network_statistics`, com intervalos de confiança."""
+    clustering = sampled_average_clustering(graph, sample_budget, seed)
+    four_cycles = wedge_sampling_clustering(graph, sample_budget, seed)
+    # Cada pivô custa uma BFS completa; usa uma fração do orçamento
+    pivots = max(1, sample_budget // 50)
+    betweenness, avg_distance = approximate_betweenness(graph, pivots, seed)
+    diameter = approximate_effective_diameter(graph, seed=seed)
+
+    def fmt(estimate):
+        return f"{estimate.value:.4f} [{estimate.low:.4f}, {estimate.high:.4f}]"
+
+    print(f"📊 Número de vértices: {graph.num_nodes}")
+    print(f"🔗 Número de arestas: {graph.num_edges}")
+    print(f"🔄 Clustering bipartido médio (amostrado): {fmt(clustering)}")
+    print(f"🔄 Clustering de Robins–Alexander (amostrado): {fmt(four_cycles)}")
+    print(f"📏 Distância média (amostrada): {fmt(avg_distance)}")
+    print(f"📏 Diâmetro efetivo (HyperANF): {fmt(diameter)}")
+    return {
+        "clustering": clustering,
+        "robins_alexander": four_cycles,
+        "betweenness": betweenness,
+        "avg_distance": avg_distance,
+        "effective_diameter": diameter,
+        "samples": {
+            "clustering_nodes": min(sample_budget, graph.num_nodes),
+            "wedges_per_node": WEDGES_PER_NODE,
+            "robins_alexander_paths": sample_budget,
+            "betweenness_pivots": min(pivots, graph.num_nodes),
+            "hll_registers": HLL_REGISTERS,
+            "hll_trials": HLL_TRIALS,
+        },
+    }
+
+
+def summarize(graph, results, top=TOP_BETWEENNESS, confidence=CONFIDENCE):
+    """Resultado de `approximate_network_statistics` em tipos do JSON.
+
+    Cada estimativa vira `{value, low, high}` (intervalo de `confidence`); da
+    betweenness, que tem um valor por nó, ficam só os `top` maiores.
+    """
+    def interval(estimate):
+        return {"value": float(estimate.value), "low": float(estimate.low), "high": float(estimate.high)}
+
+    betweenness = results["betweenness"]
+    order = np.argsort(-betweenness.value, kind="stable")[:top]
+    return {
+        "num_nodes": graph.num_nodes,
+        "num_edges": graph.num_edges,
+        "confidence": confidence,
+        "samples": results["samples"],
+        **{name: interval(results[name])
+           for name in ("clustering", "robins_alexander", "avg_distance", "effective_diameter")},
+        "top_betweenness": [
+            {"id": graph.ids[i], **interval(Estimate(*(values[i] for values in betweenness)))}
+            for i in order.tolist()
+        ],
+    }
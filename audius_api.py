@@ -0,0 +1,72 @@
+import json
+import os
+
+from discovery_nodes import NodePool
+from http_cache import ResponseCache
+
+# Define o nome do aplicativo para as requisições
+APP_NAME = "MARS_STUDY"
+
+# Lista de URLs da API
+BASE_URLS = [
+    "https://discoveryprovider.audius.co",
+    "https://audius-discovery-5.cultur3stake.com",
+    "https://blockdaemon-audius-discovery-03.bdnodes.net"
+]
+
+# Sessões, estatísticas de latência e cache de respostas compartilhados
+# entre todas as requisições dos coletores (criados no primeiro uso; ver node_pool)
+_NODES = None
+
+
+def node_pool():
+    """Pool de discovery nodes do processo, com o cache SQLite de respostas.
+
+    Criado só na primeira chamada, para que importar o módulo não abra o banco
+    nem os pools de threads.
+    """
+    global _NODES
+    if _NODES is None:
+        _NODES = NodePool(BASE_URLS, cache=ResponseCache())
+    return _NODES
+
+
+def get_trending_tracks(time="month", limit=100):
+    """Obtém as faixas em alta e retorna uma lista com um limite máximo de resultados."""
+    params = {"time": time, "app_name": APP_NAME}
+    tracks = node_pool().request("/v1/tracks/trending", params)
+    if tracks:
+        print("Trending tracks obtidas com sucesso.")
+        return tracks[:limit]
+    print("Não foi possível obter dados de nenhum endpoint.")
+    return []
+
+
+def get_artist_ids_from_tracks(tracks):
+    """Extrai os IDs únicos dos artistas a partir das faixas."""
+    return list({track.get("user", {}).get("id") for track in tracks if track.get("user")})
+
+
+def get_followers(artist_id, limit=50):
+    """Obtém seguidores de um artista específico."""
+    params = {"limit": limit, "app_name": APP_NAME}
+    followers = node_pool().request(f"/v1/users/{artist_id}/followers", params)
+    if followers:
+        print(f"Followers obtidos para o artista {artist_id}.")
+        return followers
+    return []
+
+
+def save_to_file(data, filename):
+    """Salva os dados em um arquivo JSON."""
+    with open(filename, "w") as file:
+        json.dump(data, file, indent=4)
+    print(f"Dados salvos em '{filename}'")
+
+
+def load_from_file(filename):
+    """Carrega dados de um arquivo JSON se ele existir."""
+    if os.path.exists(filename):
+        with open(filename, "r") as file:
+            return json.load(file)
+    return None
@@ -0,0 +1,159 @@
+# Gerador de dados sintéticos no formato dos arquivos coletados do Audius, em
+# qualquer escala: graus de seguidores em lei de potência, seguidores divididos
+# em comunidades por gênero (com uma fração `overlap` tirada do público geral,
+# que gera sobreposição entre artistas) e textos com frequências de Zipf.
+import json
+import os
+import string
+
+import numpy as np
+
+GENRES = (
+    "Electronic", "Hip-Hop/Rap", "Pop", "Alternative", "Lo-Fi",
+    "House", "Dubstep", "R&B/Soul", "Rock", "Techno",
+)
+
+# Escalas padrão: faixas em alta, usuários distintos e média de seguidores por artista
+SCALES = {
+    "small": {"num_tracks": 100, "num_users": 5_000, "mean_followers": 50},
+    "medium": {"num_tracks": 1_000, "num_users": 100_000, "mean_followers": 200},
+    "large": {"num_tracks": 10_000, "num_users": 1_000_000, "mean_followers": 500},
+}
+
+ID_ALPHABET = np.array(list(string.ascii_letters + string.digits))
+
+
+def random_ids(rng, count, length=7):
+    """Ids no estilo do Audius (base62), distintos entre si."""
+    ids = set()
+    while len(ids) < count:
+        chars = ID_ALPHABET[rng.integers(0, len(ID_ALPHABET), size=(count - len(ids), length))]
+        ids.update("".join(row) for row in chars)
+    return rng.permutation(sorted(ids)).tolist()
+
+
+def random_words(rng, count):
+    """Palavras só com letras (sobrevivem ao pré-processamento de `corpus.py`)."""
+    words = set()
+    while len(words) < count:
+        length = int(rng.integers(3, 10))
+        words.add("".join(rng.choice(list(string.ascii_lowercase), size=length)))
+    return sorted(words)
+
+
+def weighted_sampler(rng, weights):
+    """Sorteio proporcional a `weights`: `sample(size)` com reposição (busca binária na CDF)
+    e `sample(size, distinct=True)` sem reposição."""
+    weights = np.asarray(weights, dtype=np.float64)
+    cdf = np.cumsum(weights)
+    cdf /= cdf[-1]
+
+    def sample(size, distinct=False):
+        if not distinct:
+            return np.minimum(np.searchsorted(cdf, rng.random(size)), len(cdf) - 1)
+        size = min(size, len(weights))
+        # Tenta sobre-amostrar com reposição (barato quando `size` é pequeno perto do total)
+        draw = np.minimum(np.searchsorted(cdf, rng.random(2 * size + 8)), len(cdf) - 1)
+        _, first = np.unique(draw, return_index=True)
+        if len(first) >= size:
+            return draw[np.sort(first)][:size]
+        # Senão, Efraimidis–Spirakis: as `size` menores chaves -log(u) / w
+        keys = -np.log(rng.random(len(weights))) / weights
+        return np.argpartition(keys, size - 1)[:size] if size < len(weights) else np.arange(size)
+
+    return sample
+
+
+def power_law_degrees(rng, count, mean, exponent, maximum):
+    """Graus com cauda em lei de potência P(d) ~ d^-exponent e média teórica `mean`."""
+    shape = exponent - 1
+    minimum = mean * (shape - 1) / shape
+    return np.clip(np.round(minimum * (rng.pareto(shape, count) + 1)), 1, maximum).astype(np.int64)
+
+
+def text(rng, vocabulary, sample, min_words, max_words):
+    return " ".join(vocabulary[i] for i in sample(int(rng.integers(min_words, max_words + 1))))
+
+
+def generate_dataset(num_tracks=100, num_users=5_000, mean_followers=50, exponent=2.5, overlap=0.3,
+                     vocabulary_size=5_000, seed=42):
+    """Retorna `(tracks, artist_ids, followers)` nos esquemas dos coletores."""
+    rng = np.random.default_rng(seed)
+    num_artists = max(1, int(num_tracks * 0.8))
+    artist_ids = random_ids(rng, num_artists)
+    artist_genre = rng.integers(0, len(GENRES), num_artists)
+
+    # Usuários: comunidade (gênero) e popularidade de Zipf
+    user_ids = random_ids(rng, num_users)
+    user_genre = rng.integers(0, len(GENRES), num_users)
+    popularity = 1.0 / (rng.permutation(num_users) + 1)
+    global_sample = weighted_sampler(rng, popularity)
+    members = [np.flatnonzero(user_genre == g) for g in range(len(GENRES))]
+    genre_samples = [weighted_sampler(rng, popularity[m]) if len(m) else global_sample for m in members]
+
+    degrees = power_law_degrees(rng, num_artists, mean_followers, exponent, num_users)
+    followers = {}
+    for k, artist_id in enumerate(artist_ids):
+        shared = int(round(degrees[k] * overlap))
+        community = members[artist_genre[k]]
+        local = genre_samples[artist_genre[k]](degrees[k] - shared, distinct=True)
+        chosen = np.unique(np.concatenate([community[local], global_sample(shared, distinct=True)]))
+        followers[artist_id] = [
+            {"id": user_ids[u], "handle": f"user{u}", "name": f"User {u}", "follower_count": int(popularity[u] * 1000)}
+            for u in rng.permutation(chosen)
+        ]
+
+    # Textos: cada gênero favorece uma região diferente do vocabulário
+    vocabulary = random_words(rng, vocabulary_size)
+    ranks = np.arange(1, vocabulary_size + 1)
+    word_samples = [
+        weighted_sampler(rng, 1.0 / np.roll(ranks, g * vocabulary_size // (2 * len(GENRES))))
+        for g in range(len(GENRES))
+    ]
+    track_ids = random_ids(rng, num_tracks)
+    artist_names = {artist_id: f"Artist {k}" for k, artist_id in enumerate(artist_ids)}
+    track_artists = weighted_sampler(rng, 1.0 / np.arange(1, num_artists + 1))(num_tracks)
+    tracks = []
+    for track_id, k in zip(track_ids, track_artists.tolist()):
+        words = word_samples[artist_genre[k]]
+        tags = [vocabulary[i] for i in words(int(rng.integers(0, 6)))]
+        tracks.append({
+            "id": track_id,
+            "title": text(rng, vocabulary, words, 1, 6).title(),
+            "description": text(rng, vocabulary, words, 5, 40) if rng.random() < 0.5 else "",
+            "tags": ",".join(tags),
+            "genre": GENRES[artist_genre[k]],
+            "mood": None,
+            "play_count": int(rng.pareto(1.5) * 1000),
+            "user": {
+                "id": artist_ids[k],
+                "name": artist_names[artist_ids[k]],
+                "handle": f"artist{k}",
+                "follower_count": len(followers[artist_ids[k]]),
+            },
+        })
+    trending_artists = list(dict.fromkeys(track["user"]["id"] for track in tracks))
+    return tracks, trending_artists, {artist_id: followers[artist_id] for artist_id in trending_artists}
+
+
+def write_dataset(directory, tracks, artist_ids, followers, suffix=""):
+    """Grava os três arquivos com os nomes usados pelos scripts (`suffix="_allTime"` para o allTime)."""
+    os.makedirs(directory, exist_ok=True)
+    for name, data in (("trending_tracks", tracks), ("trending_artists", artist_ids), ("followers", followers)):
+        with open(os.path.join(directory, f"{name}{suffix}.json"), "w") as file:
+            json.dump(data, file)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos no formato do Audius.")
+    parser.add_argument("directory")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--suffix", default="")
+    parser.add_argument("--overlap", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    dataset = generate_dataset(**SCALES[args.scale], overlap=args.overlap, seed=args.seed)
+    write_dataset(args.directory, *dataset, suffix=args.suffix)
+    print(f"Dados '{args.scale}' gravados em '{args.directory}'")
@@ -0,0 +1,338 @@
+# Mede tempo e pico de memória de cada etapa do pipeline em várias escalas de
+# dados sintéticos e compara com uma linha de base salva.
+#
+#   python -m benchmarks.run --scales small medium
+#   python -m benchmarks.run --scales small --save-baseline
+#   python -m benchmarks.run --scales small --compare
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.generate import SCALES, generate_dataset, write_dataset  # noqa: E402
+from benchmarks.server import stand_in_server  # noqa: E402
+
+RESULTS_FILE = os.path.join(ROOT, "benchmarks", "results.json")
+BASELINE_FILE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# Uma etapa regrediu se ficou mais de TOLERANCE mais lenta (ou mais pesada) que a
+# linha de base e a diferença passa do mínimo absoluto
+TOLERANCE = 0.25
+MIN_SECONDS = 0.05
+MIN_PEAK_MB = 1.0
+
+# Passadas de tempo por escala; vale a menor medida de cada etapa (menos ruído)
+REPEAT = 3
+
+
+def measure(function, *args, trace_memory=False):
+    """Roda `function` e retorna `(resultado, segundos ou pico de memória em MB)`.
+
+    Com `trace_memory` o valor é o pico do `tracemalloc` (alocações do Python e
+    do NumPy no processo principal; processos de trabalho não entram). Como o
+    rastreamento deixa o código Python mais lento, tempo e memória saem de
+    execuções separadas. A saída da etapa é descartada.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function(*args)
+    seconds = time.perf_counter() - start
+    if not trace_memory:
+        return result, seconds
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak / 2 ** 20
+
+
+def stages(workdir, tracks, artists, followers, base_url):
+    """Etapas medidas, na ordem; cada uma recebe o contexto com os resultados anteriores."""
+    def collect_trending(ctx):
+        from discovery_nodes import NodePool
+
+        pool = NodePool([base_url])
+        try:
+            return pool.request("/v1/tracks/trending", {"time": "month", "app_name": "BENCH"})
+        finally:
+            pool.close()
+
+    def crawl(ctx, paginate):
+        from crawler import crawl_all_followers, crawl_followers
+        from discovery_nodes import NodePool
+
+        pool = NodePool([base_url])
+        try:
+            if paginate:
+                return crawl_all_followers(artists, pool, "BENCH", os.path.join(workdir, "pages.jsonl"))
+            return crawl_followers(artists, pool, "BENCH", limit=50)
+        finally:
+            pool.close()
+
+    def snapshot(ctx):
+        from snapshots import SnapshotStore
+
+        store = SnapshotStore(os.path.join(workdir, "snapshots.sqlite"))
+        try:
+            store.add_snapshot(tracks, followers, "month")
+            return store.top_movers(10)
+        finally:
+            store.close()
+
+    def build_bipartite_graph(ctx):
+        from graph import build_bipartite
+
+        ctx["graph"] = build_bipartite(artists, followers)
+
+    def stream_graph(ctx):
+        from ingest import load_graph
+
+        return load_graph(artists, os.path.join(workdir, "followers.json"))
+
+    def build_network(ctx):
+        from network import build_network
+
+        return build_network(artists, followers)
+
+    def compute_network_statistics(ctx):
+        from graph_stats import network_statistics
+
+        return network_statistics(ctx["graph"])
+
+    def compute_centralities(ctx):
+        from graph_stats import centrality_table, eigenvector_centrality
+
+        ctx["eigenvector"] = eigenvector_centrality(ctx["graph"])
+        return centrality_table(ctx["graph"], ctx["eigenvector"])
+
+    def louvain(ctx):
+        from community_detection import detect_communities
+
+        return detect_communities(ctx["graph"], resolutions=(1.0,), seeds=(0,),
+                                  cache_dir=os.path.join(workdir, "communities"), max_workers=1)
+
+    def gexf_export(ctx):
+        from graph_export import export_graph, node_attributes
+
+        attributes = node_attributes(ctx["graph"], tracks, ctx.get("eigenvector"))
+        export_graph(ctx["graph"], os.path.join(workdir, "network_graph.gexf"), attributes)
+
+    def corpus(ctx):
+        from corpus import load_corpus
+
+        ctx["corpus"] = load_corpus(os.path.join(workdir, "trending_tracks.json"), os.path.join(workdir, "corpus"))
+
+    def text_statistics(ctx):
+        return {field: ctx["corpus"].lengths(field).mean() for field in ctx["corpus"].fields}
+
+    def bigrams(ctx):
+        from ngrams import field_ngrams
+
+        return field_ngrams(os.path.join(workdir, "corpus"), n=2, max_workers=2)
+
+    def reduction(ctx):
+        from reduction import reduce_corpus
+
+        return reduce_corpus(ctx["corpus"])
+
+    def sentiment(ctx):
+        from sentiment import sentiment_table
+
+        return sentiment_table(ctx["corpus"], os.path.join(workdir, "sentiment.csv.gz"), max_workers=2)
+
+    def topics(ctx):
+        from bertopic import BERTopic
+        from reduction import svd_projection
+
+        # No pipeline os embeddings vêm do cache (ver embeddings.py) e o modelo do
+        # sentence-transformers é baixado do Hugging Face; aqui o BERTopic recebe
+        # vetores prontos (TF-IDF + SVD), e a etapa mede UMAP, HDBSCAN e c-TF-IDF
+        return BERTopic().fit_transform(ctx["corpus"].texts(), embeddings=svd_projection(ctx["corpus"]))
+
+    def wordcloud(ctx):
+        from wordcloud import WordCloud
+
+        return WordCloud(width=800, height=400).generate_from_frequencies(ctx["corpus"].word_counts())
+
+    # (etapa, módulos importados antes da medição, função)
+    return [
+        ("collect_trending", ["discovery_nodes"], collect_trending),
+        ("crawl_followers", ["crawler"], lambda ctx: crawl(ctx, paginate=False)),
+        ("crawl_all_followers", ["crawler"], lambda ctx: crawl(ctx, paginate=True)),
+        ("snapshot_store", ["snapshots"], snapshot),
+        ("build_bipartite", ["graph"], build_bipartite_graph),
+        ("stream_graph", ["ingest"], stream_graph),
+        ("build_network", ["network"], build_network),
+        ("compute_network_statistics", ["graph_stats"], compute_network_statistics),
+        ("compute_centralities", ["graph_stats"], compute_centralities),
+        ("louvain", ["community_detection"], louvain),
+        ("gexf_export", ["graph_export"], gexf_export),
+        ("text_corpus", ["corpus"], corpus),
+        ("text_statistics", [], text_statistics),
+        ("text_bigrams", ["ngrams"], bigrams),
+        ("text_reduction", ["reduction", "sklearn.decomposition"], reduction),
+        ("text_sentiment", ["sentiment", "nltk.sentiment.vader"], sentiment),
+        ("text_topics", ["bertopic", "reduction"], topics),
+        ("text_wordcloud", ["wordcloud"], wordcloud),
+    ]
+
+
+def run_stages(data, only, trace_memory):
+    """Uma passada por todas as etapas num diretório novo (caches vazios).
+
+    Retorna `{etapa: segundos ou MB}`, com a mensagem de erro nas etapas puladas.
+    """
+    tracks, artists, followers = data
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    try:
+        write_dataset(workdir, tracks, artists, followers)
+        values = {}
+        ctx = {}
+        with stand_in_server(tracks, followers) as base_url:
+            for name, modules, function in stages(workdir, tracks, artists, followers, base_url):
+                if only and name not in only:
+                    continue
+                try:
+                    # O tempo de importação não entra na medida da etapa
+                    for module in modules:
+                        importlib.import_module(module)
+                    _, values[name] = measure(function, ctx, trace_memory=trace_memory)
+                except ImportError as error:
+                    values[name] = ImportError(error)
+        return values
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_scale(scale, only=None, seed=42, repeat=REPEAT):
+    """Gera os dados da escala e mede cada etapa: `repeat` passadas para o tempo
+    (fica o menor) e outra, com o `tracemalloc` ligado, para o pico de memória."""
+    data = generate_dataset(**SCALES[scale], seed=seed)
+    tracks, artists, followers = data
+    edges = sum(len(v) for v in followers.values())
+    print(f"\n== {scale}: {len(tracks)} faixas, {len(artists)} artistas, {edges} arestas ==")
+    times = run_stages(data, only, trace_memory=False)
+    for _ in range(repeat - 1):
+        for name, seconds in run_stages(data, only, trace_memory=False).items():
+            if not isinstance(seconds, ImportError):
+                times[name] = min(times[name], seconds)
+    peaks = run_stages(data, only, trace_memory=True)
+    results = {}
+    for name, seconds in times.items():
+        peak = peaks.get(name)
+        if isinstance(seconds, ImportError) or isinstance(peak, ImportError):
+            error = seconds if isinstance(seconds, ImportError) else peak
+            results[name] = {"skipped": str(error)}
+            print(f"{name:<28} pulada ({error})")
+            continue
+        results[name] = {"seconds": round(seconds, 4), "peak_mb": round(peak, 2)}
+        print(f"{name:<28} {seconds:>9.3f} s {peak:>10.1f} MB")
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Lista as etapas mais lentas ou mais pesadas que a linha de base."""
+    regressions = []
+    for scale, stages_results in results["scales"].items():
+        for name, current in stages_results.items():
+            previous = baseline.get("scales", {}).get(scale, {}).get(name)
+            if not previous or "seconds" not in previous or "seconds" not in current:
+                continue
+            for key, minimum in (("seconds", MIN_SECONDS), ("peak_mb", MIN_PEAK_MB)):
+                before, after = previous[key], current[key]
+                if after > before * (1 + tolerance) and after - before > minimum:
+                    regressions.append(f"{scale}/{name}: {key} {before} → {after}")
+    return regressions
+
+
+def unmeasured(results, baseline):
+    """Etapas medidas agora sem medida na linha de base (puladas ou ausentes), e o contrário.
+
+    Não há com o que comparar: a linha de base precisa ser gravada de novo com
+    todas as dependências instaladas (ou a execução atual, completada).
+    """
+    missing = []
+    for scale, stages_results in results["scales"].items():
+        for name, current in stages_results.items():
+            previous = baseline.get("scales", {}).get(scale, {}).get(name) or {"skipped": "sem medida"}
+            if "seconds" in current and "seconds" not in previous:
+                missing.append(f"{scale}/{name}: pulada na linha de base ({previous['skipped']})")
+            elif "seconds" in previous and "seconds" not in current:
+                missing.append(f"{scale}/{name}: pulada nesta execução ({current['skipped']})")
+    return missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks das etapas com dados sintéticos.")
+    parser.add_argument("--scales", nargs="+", default=["small"], choices=sorted(SCALES))
+    parser.add_argument("--stages", nargs="*", help="só estas etapas")
+    parser.add_argument("--output", default=RESULTS_FILE)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="grava os resultados como linha de base")
+    parser.add_argument("--compare", action="store_true", help="compara com a linha de base e falha se regredir")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="passadas de tempo por escala")
+    args = parser.parse_args()
+
+    # Todas as etapas rodam neste processo: os processos de trabalho (bigramas,
+    # sentimento) não podem ser criados com fork depois que o UMAP do BERTopic
+    # abriu as threads do numba, senão travam esperando uma trava herdada
+    multiprocessing.set_start_method("forkserver")
+
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "scales": {scale: run_scale(scale, args.stages, repeat=args.repeat) for scale in args.scales},
+    }
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"\nResultados salvos em '{args.output}'")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Linha de base salva em '{args.baseline}'")
+        skipped = [f"{scale}/{name}" for scale, stages_results in results["scales"].items()
+                   for name, result in stages_results.items() if "skipped" in result]
+        if skipped:
+            print(f"⚠️  Etapas puladas (sem comparação possível com --compare): {', '.join(skipped)}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            sys.exit(f"Linha de base '{args.baseline}' não encontrada; grave uma com --save-baseline")
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        print(f"Linha de base: Python {baseline.get('python')}, {baseline.get('machine')}, "
+              f"{baseline.get('cpus')} CPUs ({baseline.get('created')})")
+        if baseline.get("cpus") != results["cpus"]:
+            print(f"⚠️  Linha de base gravada com {baseline.get('cpus')} CPUs, esta execução tem {results['cpus']}: "
+                  "as etapas em paralelo não são comparáveis")
+        missing = unmeasured(results, baseline)
+        for line in missing:
+            print(f"❌ {line}")
+        if missing:
+            sys.exit("Comparação incompleta: grave de novo a linha de base com todas as dependências instaladas")
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"❌ {line}")
+        if regressions:
+            sys.exit(1)
+        print("✅ Nenhuma regressão em relação à linha de base")
+
+
+if __name__ == "__main__":
+    main()
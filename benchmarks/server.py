@@ -0,0 +1,65 @@
+# Servidor HTTP local que imita os endpoints do Audius usados pelos coletores,
+# servindo dados gerados por `generate.py` (sem rede e com latência controlada)
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+RELATION_PATH = re.compile(r"^/v1/users/([^/]+)/(followers|following)$")
+
+
+class AudiusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+
+        if url.path == "/v1/tracks/trending":
+            data = server.tracks
+        else:
+            match = RELATION_PATH.match(url.path)
+            if not match:
+                self.send_error(404)
+                return
+            offset = int(params.get("offset", ["0"])[0])
+            limit = int(params.get("limit", ["50"])[0])
+            relation = server.followers if match.group(2) == "followers" else server.following
+            data = relation.get(match.group(1), [])[offset:offset + limit]
+
+        body = json.dumps({"data": data}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def stand_in_server(tracks, followers, latency=0.0):
+    """Sobe o servidor numa porta livre e retorna a URL base (para `NodePool([url])`)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), AudiusHandler)
+    server.daemon_threads = True
+    server.tracks = tracks
+    server.followers = followers
+    # Quem cada usuário segue, invertendo as listas de seguidores
+    server.following = {}
+    users = {artist_id: {"id": artist_id} for artist_id in followers}
+    for artist_id, followers_list in followers.items():
+        for follower in followers_list:
+            server.following.setdefault(follower["id"], []).append(users[artist_id])
+    server.latency = latency
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import math
+import os
+from collections import namedtuple
+
+import numpy as np
+
+# Campos das faixas usados pelas análises; artwork, CIDs e carteiras ficam de fora
+TRACK_COLUMNS = [
+    "id",
+    "title",
+    "description",
+    "tags",
+    "genre",
+    "mood",
+    "release_date",
+    "duration",
+    "play_count",
+    "repost_count",
+    "favorite_count",
+    "comment_count",
+    "permalink",
+    "user.id",
+    "user.name",
+    "user.handle",
+    "user.follower_count",
+    "user.followee_count",
+    "user.track_count",
+    "user.is_verified",
+]
+
+SCHEMA_FILE = "schema.json"
+
+# Sufixo do diretório da cópia colunar de um arquivo JSON de faixas
+COLUMNS_SUFFIX = "_columns"
+
+FollowerEdges = namedtuple("FollowerEdges", ["ids", "artists", "src", "dst"])
+
+
+def get_field(record, path):
+    """Lê um campo possivelmente aninhado (ex.: `user.id`)."""
+    value = record
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def column_kind(values):
+    """Escolhe o tipo de armazenamento da coluna a partir dos valores presentes."""
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, bool) for v in present):
+        return "bool"
+    if present and all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        return "int" if len(present) == len(values) else "float"
+    if present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return "float"
+    if all(v is None or isinstance(v, str) for v in values):
+        return "str"
+    return "json"
+
+
+class StringColumn:
+    """Coluna de texto guardada como bytes UTF-8 concatenados e offsets."""
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_list(self):
+        return list(self)
+
+
+def save_string_column(values, prefix):
+    encoded = [(v or "").encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    np.save(prefix + ".offsets.npy", offsets)
+    np.save(prefix + ".bytes.npy", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+
+def file_hash(filepath):
+    digest = hashlib.sha1()
+    with open(filepath, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_stamp(filepath):
+    """Tamanho e data de modificação (em ns) do arquivo, comparados antes de recalcular o hash."""
+    stat = os.stat(filepath)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def source_hash(filepath, recorded=None):
+    """Hash de `filepath`, reaproveitando o de `recorded` (um dicionário com
+    `source` e `stamp`) enquanto o tamanho e a data de modificação forem os
+    mesmos; só quando mudam o arquivo é relido inteiro."""
+    if recorded and recorded.get("source") and recorded.get("stamp") == file_stamp(filepath):
+        return recorded["source"]
+    return file_hash(filepath)
+
+
+def save_tracks_columnar(tracks, directory, columns=TRACK_COLUMNS, source=None, stamp=None):
+    """Salva as faixas como uma tabela colunar (um arquivo `.npy` por coluna).
+
+    `source` é o hash do JSON de origem e `stamp` o seu `file_stamp`, usados por
+    `load_tracks` para saber se a cópia ainda vale.
+    """
+    os.makedirs(directory, exist_ok=True)
+    schema = {"num_rows": len(tracks), "source": source, "stamp": stamp, "columns": {}}
+    for column in columns:
+        values = [get_field(track, column) for track in tracks]
+        kind = column_kind(values)
+        prefix = os.path.join(directory, column)
+        if kind == "bool":
+            np.save(prefix + ".npy", np.array([bool(v) for v in values], dtype=bool))
+        elif kind == "int":
+            np.save(prefix + ".npy", np.array(values, dtype=np.int64))
+        elif kind == "float":
+            np.save(prefix + ".npy", np.array([np.nan if v is None else v for v in values], dtype=np.float64))
+        elif kind == "str":
+            save_string_column(values, prefix)
+        else:
+            save_string_column([None if v is None else json.dumps(v) for v in values], prefix)
+        schema["columns"][column] = kind
+    with open(os.path.join(directory, SCHEMA_FILE), "w") as file:
+        json.dump(schema, file, indent=4)
+    print(f"Tabela colunar salva em '{directory}'")
+
+
+def load_tracks_columnar(directory, columns=None):
+    """Carrega apenas as colunas pedidas, mapeando os arquivos em memória.
+
+    Retorna `{coluna: array}`; colunas de texto vêm como `StringColumn`, que só
+    decodifica o valor quando ele é acessado.
+    """
+    with open(os.path.join(directory, SCHEMA_FILE), "r") as file:
+        schema = json.load(file)
+    if columns is None:
+        columns = list(schema["columns"])
+
+    table = {}
+    for column in columns:
+        kind = schema["columns"][column]
+        prefix = os.path.join(directory, column)
+        if kind in ("str", "json"):
+            table[column] = StringColumn(
+                np.load(prefix + ".offsets.npy", mmap_mode="r"),
+                np.load(prefix + ".bytes.npy", mmap_mode="r"),
+            )
+        else:
+            table[column] = np.load(prefix + ".npy", mmap_mode="r")
+    return table
+
+
+def track_records(table, json_columns=()):
+    """Faixas no formato do JSON (dicionários aninhados), só com as colunas de `table`.
+
+    Textos ausentes voltam como "" e as colunas em `json_columns` são decodificadas.
+    """
+    columns = {}
+    for column, values in table.items():
+        if column in json_columns:
+            values = [json.loads(v) if v else None for v in values]
+        elif isinstance(values, StringColumn):
+            values = values.to_list()
+        else:
+            values = np.asarray(values).tolist()
+        columns[column] = [None if isinstance(v, float) and math.isnan(v) else v for v in values]
+    num_rows = len(next(iter(columns.values()))) if columns else 0
+    records = [{} for _ in range(num_rows)]
+    for column, values in columns.items():
+        *parents, name = column.split(".")
+        for record, value in zip(records, values):
+            for parent in parents:
+                record = record.setdefault(parent, {})
+            record[name] = value
+    return records
+
+
+def load_tracks(filename, columns, directory=None, source=None):
+    """Faixas de `filename` com apenas as colunas pedidas (ex.: `["title", "user.id"]`).
+
+    Lê da cópia colunar ao lado do JSON (`<nome>_columns`) enquanto ela
+    corresponder ao arquivo; senão carrega o JSON uma vez e grava a cópia, para
+    que as próximas leituras custem só as colunas usadas. O JSON só é relido
+    para conferir o hash quando o tamanho ou a data de modificação mudaram.
+    """
+    directory = directory or os.path.splitext(filename)[0] + COLUMNS_SUFFIX
+    schema_file = os.path.join(directory, SCHEMA_FILE)
+    schema = None
+    if os.path.exists(schema_file):
+        with open(schema_file, "r") as file:
+            schema = json.load(file)
+    stamp = file_stamp(filename)
+    source = source or source_hash(filename, schema)
+    if schema is None or schema.get("source") != source or any(c not in schema["columns"] for c in columns):
+        with open(filename, "r", encoding="utf-8") as file:
+            tracks = json.load(file)
+        save_tracks_columnar(tracks, directory, list(dict.fromkeys(TRACK_COLUMNS + list(columns))), source, stamp)
+        with open(schema_file, "r") as file:
+            schema = json.load(file)
+    elif schema.get("stamp") != stamp:
+        # Mesmo conteúdo com outra data (arquivo copiado ou regravado): só atualiza o carimbo
+        schema["stamp"] = stamp
+        with open(schema_file, "w") as file:
+            json.dump(schema, file, indent=4)
+    json_columns = [column for column in columns if schema["columns"][column] == "json"]
+    return track_records(load_tracks_columnar(directory, columns), json_columns)
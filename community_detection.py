@@ -0,0 +1,137 @@
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# Grade padrão de resoluções e sementes
+RESOLUTIONS = (0.5, 0.75, 1.0, 1.25, 1.5, 2.0)
+SEEDS = (0, 1, 2, 3, 4)
+
+# Diretório com as partições já calculadas, indexadas pelo hash do snapshot
+CACHE_DIR = "communities_cache"
+
+# Grafo do processo de trabalho, montado uma única vez em `init_worker`
+_worker_graph = None
+
+
+def bipartite_edges(graph):
+    """Arestas do grafo artista–seguidor (peso 1) e o id de cada nó."""
+    src, dst = graph.edges()
+    return list(graph.ids), src, dst, np.ones(len(src))
+
+
+def projection_edges(graph):
+    """Arestas da projeção artista–artista, com peso = número de seguidores em comum."""
+    from overlap import AudienceOverlap
+
+    overlap = AudienceOverlap(graph)
+    upper = sp.triu(overlap.counts(), k=1).tocoo()
+    return list(overlap.artist_ids), upper.row, upper.col, upper.data.astype(np.float64)
+
+
+def init_worker(num_nodes, src, dst, weights):
+    global _worker_graph
+    import networkx as nx
+
+    G = nx.Graph()
+    G.add_nodes_from(range(num_nodes))
+    G.add_weighted_edges_from(zip(src.tolist(), dst.tolist(), weights.tolist()))
+    _worker_graph = G
+
+
+def run_partition(method, resolution, seed):
+    """Executa Louvain ou Leiden no grafo do processo e retorna `(partição, modularidade)`."""
+    from community import community_louvain
+
+    G = _worker_graph
+    if method == "leiden":
+        import igraph as ig
+        import leidenalg
+
+        H = ig.Graph(n=G.number_of_nodes(), edges=list(G.edges()))
+        H.es["weight"] = [w for _, _, w in G.edges(data="weight")]
+        result = leidenalg.find_partition(
+            H, leidenalg.RBConfigurationVertexPartition, weights="weight",
+            resolution_parameter=resolution, seed=seed,
+        )
+        labels = np.array(result.membership, dtype=np.int32)
+    else:
+        partition = community_louvain.best_partition(G, resolution=resolution, random_state=seed)
+        labels = np.array([partition[node] for node in range(G.number_of_nodes())], dtype=np.int32)
+
+    modularity = community_louvain.modularity(dict(enumerate(labels.tolist())), G)
+    return labels, modularity
+
+
+def partition_stability(partitions):
+    """Estabilidade entre sementes: NMI médio entre todos os pares de partições."""
+    from sklearn.metrics import normalized_mutual_info_score
+
+    pairs = list(itertools.combinations(partitions, 2))
+    if not pairs:
+        return 1.0
+    return float(np.mean([normalized_mutual_info_score(a, b) for a, b in pairs]))
+
+
+def detect_communities(graph, mode="bipartite", method="louvain", resolutions=RESOLUTIONS,
+                       seeds=SEEDS, cache_dir=CACHE_DIR, max_workers=None):
+    """Roda a grade resoluções × sementes em paralelo, reaproveitando partições em cache.
+
+    `mode` é `bipartite` (grafo artista–seguidor) ou `projection` (artistas
+    ligados pelo número de seguidores em comum). Retorna `(nós, partições,
+    resumo)`: `partições[(resolução, semente)]` é o vetor de comunidades alinhado
+    com `nós` e `resumo` é um DataFrame com modularidade e estabilidade de cada
+    execução.
+    """
+    nodes, src, dst, weights = projection_edges(graph) if mode == "projection" else bipartite_edges(graph)
+    key = f"{graph.snapshot_hash()}_{mode}_{method}"
+    os.makedirs(cache_dir, exist_ok=True)
+
+    partitions = {}
+    modularities = {}
+    missing = []
+    for resolution, seed in itertools.product(resolutions, seeds):
+        prefix = os.path.join(cache_dir, f"{key}_{resolution}_{seed}")
+        if os.path.exists(prefix + ".json"):
+            partitions[(resolution, seed)] = np.load(prefix + ".npy")
+            with open(prefix + ".json", "r") as file:
+                modularities[(resolution, seed)] = json.load(file)["modularity"]
+        else:
+            missing.append((resolution, seed))
+
+    if missing:
+        print(f"Calculando {len(missing)} partições ({len(partitions)} já em cache)...")
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker,
+                                 initargs=(len(nodes), src, dst, weights)) as executor:
+            runs = executor.map(run_partition, itertools.repeat(method), *zip(*missing))
+            for (resolution, seed), (labels, modularity) in zip(missing, runs):
+                prefix = os.path.join(cache_dir, f"{key}_{resolution}_{seed}")
+                np.save(prefix + ".npy", labels)
+                with open(prefix + ".json", "w") as file:
+                    json.dump({"modularity": modularity}, file)
+                partitions[(resolution, seed)] = labels
+                modularities[(resolution, seed)] = modularity
+    else:
+        print("Todas as partições carregadas do cache.")
+
+    rows = []
+    for resolution in resolutions:
+        stability = partition_stability([partitions[(resolution, seed)] for seed in seeds])
+        for seed in seeds:
+            labels = partitions[(resolution, seed)]
+            rows.append([resolution, seed, len(np.unique(labels)), modularities[(resolution, seed)], stability])
+    summary = pd.DataFrame(rows, columns=["Resolução", "Semente", "Comunidades", "Modularidade", "Estabilidade"])
+    return nodes, partitions, summary
+
+
+def best_partition(partitions, summary):
+    """Partição de maior modularidade na resolução de maior modularidade média."""
+    by_resolution = summary.groupby("Resolução")["Modularidade"].mean()
+    resolution = by_resolution.idxmax()
+    runs = summary[summary["Resolução"] == resolution]
+    seed = int(runs.loc[runs["Modularidade"].idxmax(), "Semente"])
+    return partitions[(resolution, seed)]
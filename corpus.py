@@ -0,0 +1,177 @@
+import json
+import os
+import re
+
+import numpy as np
+
+from columnar import file_stamp, load_tracks, source_hash
+
+# Campos de texto das faixas analisados (na ordem em que entram no corpus)
+FIELDS = ("title", "description", "tags")
+
+# Diretório padrão do corpus já tokenizado
+CORPUS_DIR = "corpus_month"
+
+# Expressões do pré-processamento, compiladas uma única vez
+HYPHEN = re.compile(r"-")
+NON_ALPHA = re.compile(r"[^a-z\s]")
+SPACES = re.compile(r"\s+")
+
+
+def field_text(track, field):
+    """Texto de um campo da faixa (listas são unidas por espaço; ausente vira '')."""
+    text = track.get(field) or ""
+    if isinstance(text, list):
+        text = " ".join(text)
+    return text if isinstance(text, str) else ""
+
+
+def preprocess(text):
+    """Minúsculas, hífens viram espaços, remove o que não é letra e espaços extras."""
+    if not isinstance(text, str):
+        text = ""
+    text = HYPHEN.sub(" ", text.lower())
+    text = NON_ALPHA.sub("", text)
+    return SPACES.sub(" ", text).strip()
+
+
+class Corpus:
+    """Textos das faixas tokenizados uma única vez.
+
+    `tokens` guarda os ids (em `vocabulary`) de todas as palavras em sequência e
+    `offsets[d]:offsets[d + 1]` delimita o documento `d`. Os documentos de cada
+    campo são contíguos: `fields[campo] = (primeiro, último + 1)`, e dentro de
+    cada campo seguem a ordem de `track_ids`.
+    """
+
+    def __init__(self, vocabulary, tokens, offsets, fields, track_ids, source=None, stamp=None):
+        self.vocabulary = vocabulary
+        self.tokens = tokens
+        self.offsets = offsets
+        self.fields = fields
+        self.track_ids = track_ids
+        self.source = source
+        self.stamp = stamp
+
+    @classmethod
+    def from_tracks(cls, tracks, fields=FIELDS, source=None):
+        index = {}
+        vocabulary = []
+        tokens = []
+        offsets = [0]
+        ranges = {}
+        for field in fields:
+            first = len(offsets) - 1
+            for track in tracks:
+                for word in preprocess(field_text(track, field)).split():
+                    token = index.get(word)
+                    if token is None:
+                        token = index[word] = len(vocabulary)
+                        vocabulary.append(word)
+                    tokens.append(token)
+                offsets.append(len(tokens))
+            ranges[field] = (first, len(offsets) - 1)
+        track_ids = [track.get("id") for track in tracks]
+        return cls(
+            vocabulary, np.array(tokens, dtype=np.int32), np.array(offsets, dtype=np.int64),
+            ranges, track_ids, source,
+        )
+
+    def document_fields(self, field=None):
+        """Id da faixa e campo de cada documento do intervalo de `field`."""
+        track_ids = []
+        names = []
+        for name, (first, last) in self.fields.items():
+            if field is None or name == field:
+                track_ids.extend(self.track_ids)
+                names.extend([name] * (last - first))
+        return track_ids, names
+
+    def document_range(self, field=None):
+        """Intervalo de documentos de um campo (ou de todos, com `None`)."""
+        if field is None:
+            return 0, len(self.offsets) - 1
+        return self.fields[field]
+
+    def lengths(self, field=None):
+        """Número de palavras de cada documento."""
+        first, last = self.document_range(field)
+        return np.diff(self.offsets[first:last + 1])
+
+    def token_ids(self, field=None):
+        """Tokens do campo em sequência e os offsets dos documentos (começando em 0)."""
+        first, last = self.document_range(field)
+        offsets = self.offsets[first:last + 1]
+        return self.tokens[offsets[0]:offsets[-1]], offsets - offsets[0]
+
+    def texts(self, field=None):
+        """Textos pré-processados (palavras separadas por espaço), para modelos que recebem strings."""
+        tokens, offsets = self.token_ids(field)
+        words = np.array(self.vocabulary, dtype=object)[tokens]
+        return [" ".join(words[start:end]) for start, end in zip(offsets[:-1], offsets[1:])]
+
+    def word_counts(self, field=None):
+        """Frequência de cada palavra do campo, como `{palavra: contagem}`."""
+        tokens, _ = self.token_ids(field)
+        counts = np.bincount(tokens, minlength=len(self.vocabulary))
+        present = np.flatnonzero(counts)
+        return {self.vocabulary[i]: int(counts[i]) for i in present}
+
+    def save(self, directory=CORPUS_DIR):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "tokens.npy"), self.tokens)
+        np.save(os.path.join(directory, "offsets.npy"), self.offsets)
+        self.save_meta(directory)
+        print(f"Corpus tokenizado salvo em '{directory}'")
+
+    def save_meta(self, directory=CORPUS_DIR):
+        """Regrava só o `corpus.json` (os vetores podem estar mapeados em memória)."""
+        with open(os.path.join(directory, "corpus.json"), "w", encoding="utf-8") as file:
+            json.dump({
+                "vocabulary": self.vocabulary,
+                "fields": self.fields,
+                "track_ids": self.track_ids,
+                "source": self.source,
+                "stamp": self.stamp,
+            }, file)
+
+    @classmethod
+    def load(cls, directory=CORPUS_DIR, mmap=True):
+        mode = "r" if mmap else None
+        with open(os.path.join(directory, "corpus.json"), "r", encoding="utf-8") as file:
+            meta = json.load(file)
+        return cls(
+            meta["vocabulary"],
+            np.load(os.path.join(directory, "tokens.npy"), mmap_mode=mode),
+            np.load(os.path.join(directory, "offsets.npy"), mmap_mode=mode),
+            {field: tuple(bounds) for field, bounds in meta["fields"].items()},
+            meta.get("track_ids"),
+            meta["source"],
+            meta.get("stamp"),
+        )
+
+
+def load_corpus(filepath, directory=CORPUS_DIR, fields=FIELDS):
+    """Corpus do arquivo de faixas, reaproveitado do disco enquanto o arquivo não mudar.
+
+    O arquivo só é relido para calcular o hash se o tamanho ou a data de
+    modificação diferirem dos gravados com o corpus.
+    """
+    stamp = file_stamp(filepath)
+    corpus = None
+    if os.path.exists(os.path.join(directory, "corpus.json")):
+        corpus = Corpus.load(directory)
+    source = source_hash(filepath, corpus and {"source": corpus.source, "stamp": corpus.stamp})
+    if corpus is not None and corpus.source == source and tuple(corpus.fields) == tuple(fields) \
+            and corpus.track_ids is not None:
+        if corpus.stamp != stamp:
+            corpus.stamp = stamp
+            corpus.save_meta(directory)
+        print(f"Corpus carregado de '{directory}'")
+        return corpus
+    # Só as colunas de texto (e o id) das faixas, lidas da cópia colunar (ver columnar.py)
+    tracks = load_tracks(filepath, ["id", *fields], source=source)
+    corpus = Corpus.from_tracks(tracks, fields, source)
+    corpus.stamp = stamp
+    corpus.save(directory)
+    return corpus
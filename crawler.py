@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from ingest import project
+
+# Limite de requisições simultâneas no total
+MAX_IN_FLIGHT = 16
+
+# Tamanho de página usado na coleta paginada (máximo aceito pela API)
+PAGE_SIZE = 100
+
+
+def project_page(page, fields):
+    """Mantém só os campos `fields` de cada seguidor (todos, se `fields` for None).
+
+    Por padrão os coletores gravam o objeto completo da API, igual ao laço
+    sequencial; a projeção em `ingest.FOLLOWER_FIELDS` acontece na leitura.
+    """
+    if page is None or fields is None:
+        return page
+    return [project(follower, fields) for follower in page]
+
+
+def fetch_followers(pool, artist_id, app_name, limit=50, fields=None):
+    """Obtém seguidores de um artista pelo node mais rápido disponível em `pool`."""
+    params = {"limit": limit, "app_name": app_name}
+    return project_page(pool.request(f"/v1/users/{artist_id}/followers", params), fields) or []
+
+
+def crawl_followers(artist_ids, pool, app_name, limit=50, max_in_flight=MAX_IN_FLIGHT, fields=None):
+    """Obtém os seguidores de vários artistas em paralelo.
+
+    `pool` é um `NodePool`, que limita a concorrência por node e escolhe o node
+    mais rápido para cada requisição. Retorna o mesmo dicionário
+    `{artist_id: [seguidores]}` do laço sequencial de `main()`; com `fields`,
+    só esses campos de cada seguidor são mantidos.
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        futures = {
+            executor.submit(fetch_followers, pool, artist_id, app_name, limit, fields): artist_id
+            for artist_id in artist_ids
+        }
+        for future in as_completed(futures):
+            artist_id = futures[future]
+            results[artist_id] = future.result()
+            if results[artist_id]:
+                print(f"Followers obtidos para o artista {artist_id}.")
+            else:
+                print(f"Nenhum seguidor encontrado para o artista {artist_id}.")
+
+    # Mantém a ordem original dos artistas
+    return {artist_id: results[artist_id] for artist_id in artist_ids if results.get(artist_id)}
+
+
+def fetch_followers_page(pool, artist_id, app_name, offset, limit, fields=None):
+    """Obtém uma página de seguidores; retorna None se nenhum node respondeu."""
+    params = {"limit": limit, "offset": offset, "app_name": app_name}
+    return project_page(pool.request(f"/v1/users/{artist_id}/followers", params), fields)
+
+
+class FollowerCheckpoint:
+    """Arquivo JSONL só de acréscimo com as páginas coletadas e um cursor por artista.
+
+    Cada linha de `pages_file` é `{"artist_id", "offset", "followers"}`. O cursor
+    (`pages_file + ".cursor.json"`) guarda o próximo `offset` de cada artista e se a
+    lista já foi esgotada, permitindo retomar uma coleta interrompida.
+    """
+
+    def __init__(self, pages_file):
+        self.pages_file = pages_file
+        self.cursor_file = pages_file + ".cursor.json"
+        self.lock = threading.Lock()
+        self.cursors = {}
+        if os.path.exists(self.cursor_file):
+            with open(self.cursor_file, "r") as file:
+                self.cursors = json.load(file)
+
+    def cursor(self, artist_id):
+        return self.cursors.get(artist_id, {"offset": 0, "done": False})
+
+    def append(self, artist_id, offset, followers, done):
+        """Grava a página no JSONL e só então avança o cursor do artista."""
+        line = json.dumps({"artist_id": artist_id, "offset": offset, "followers": followers})
+        with self.lock:
+            with open(self.pages_file, "a") as file:
+                file.write(line + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            self.cursors[artist_id] = {"offset": offset + len(followers), "done": done}
+            tmp_file = self.cursor_file + ".tmp"
+            with open(tmp_file, "w") as file:
+                json.dump(self.cursors, file)
+            os.replace(tmp_file, self.cursor_file)
+
+    def load(self, artist_ids=None):
+        """Remonta `{artist_id: [seguidores]}` a partir do JSONL.
+
+        Páginas repetidas (gravadas antes de uma queda e refeitas na retomada)
+        são descartadas pelo par (artista, offset).
+        """
+        pages = {}
+        if os.path.exists(self.pages_file):
+            with open(self.pages_file, "r") as file:
+                for line in file:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Última linha truncada por uma interrupção
+                        continue
+                    pages.setdefault(record["artist_id"], {})[record["offset"]] = record["followers"]
+
+        if artist_ids is None:
+            artist_ids = list(pages)
+        followers_data = {}
+        for artist_id in artist_ids:
+            offsets = pages.get(artist_id, {})
+            followers = [f for offset in sorted(offsets) for f in offsets[offset]]
+            if followers:
+                followers_data[artist_id] = followers
+        return followers_data
+
+
+def harvest_followers(pool, checkpoint, artist_id, app_name, page_size=PAGE_SIZE, max_followers=None,
+                      fields=None):
+    """Percorre `offset` até esgotar os seguidores do artista ou atingir `max_followers`."""
+    cursor = checkpoint.cursor(artist_id)
+    offset = cursor["offset"]
+    done = cursor["done"]
+    while not done:
+        limit = page_size
+        if max_followers is not None:
+            limit = min(page_size, max_followers - offset)
+        if limit <= 0:
+            break
+        page = fetch_followers_page(pool, artist_id, app_name, offset, limit, fields)
+        if page is None:
+            print(f"Coleta do artista {artist_id} interrompida no offset {offset}; será retomada na próxima execução.")
+            return offset
+        # Só marca como concluído quando a lista se esgota; com um `max_followers`
+        # maior numa próxima execução a coleta continua de onde parou.
+        done = len(page) < limit
+        checkpoint.append(artist_id, offset, page, done)
+        offset += len(page)
+    return offset
+
+
+def crawl_all_followers(artist_ids, pool, app_name, pages_file="followers_pages.jsonl",
+                        page_size=PAGE_SIZE, max_followers=None, max_in_flight=MAX_IN_FLIGHT,
+                        fields=None):
+    """Coleta paginada e retomável dos seguidores de vários artistas.
+
+    As páginas são gravadas em `pages_file` à medida que chegam; artistas já
+    concluídos em execuções anteriores não são buscados de novo. Retorna o mesmo
+    dicionário `{artist_id: [seguidores]}` de `crawl_followers`.
+    """
+    checkpoint = FollowerCheckpoint(pages_file)
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        futures = {
+            executor.submit(harvest_followers, pool, checkpoint, artist_id, app_name,
+                            page_size, max_followers, fields): artist_id
+            for artist_id in artist_ids
+        }
+        for future in as_completed(futures):
+            artist_id = futures[future]
+            print(f"{future.result()} seguidores coletados para o artista {artist_id}.")
+
+    return checkpoint.load(artist_ids)
@@ -0,0 +1,261 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import HTTP
+
+# Limite de requisições simultâneas por discovery node
+MAX_PER_NODE = 6
+
+# Tempo máximo (em segundos) de espera por uma resposta
+REQUEST_TIMEOUT = 15
+
+# Peso das novas medições nas médias móveis de latência e taxa de erro
+EWMA_ALPHA = 0.2
+
+# Percentil de latência do node principal a partir do qual uma cópia da
+# requisição é disparada para o segundo melhor node
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 10
+HEDGE_DEFAULT_DELAY = 2.0
+LATENCY_WINDOW = 200
+
+# Falhas consecutivas que abrem o circuito e tempo (s) até uma nova tentativa
+FAILURE_THRESHOLD = 3
+COOLDOWN = 30.0
+
+
+class TokenBucket:
+    """Limita as requisições a `rate` por segundo, com rajadas de até `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Espera até haver uma ficha disponível e a consome."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+
+class NodeStats:
+    """Latência e taxa de erro recentes de um discovery node, com circuit breaker."""
+
+    def __init__(self):
+        self.ewma_latency = None
+        self.error_rate = 0.0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.in_flight = 0
+
+    def record_success(self, latency):
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.ewma_latency
+        self.error_rate = (1 - EWMA_ALPHA) * self.error_rate
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self):
+        self.error_rate = EWMA_ALPHA + (1 - EWMA_ALPHA) * self.error_rate
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= FAILURE_THRESHOLD:
+            # Circuito aberto: o node só volta a ser testado após o cooldown
+            self.open_until = time.monotonic() + COOLDOWN
+
+    def is_available(self, now):
+        return now >= self.open_until
+
+    def hedge_delay(self):
+        """Prazo para disparar a requisição duplicada, pelo percentil das latências recentes."""
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return float(np.percentile(self.latencies, HEDGE_PERCENTILE))
+
+
+class NodePool:
+    """Sessões keep-alive por discovery node com roteamento pela latência observada.
+
+    Cada requisição vai para o node saudável mais rápido (média móvel da latência,
+    penalizada pela taxa de erro e pela carga atual). Se ele não responder dentro
+    do percentil `HEDGE_PERCENTILE` das suas latências, uma cópia é enviada ao
+    segundo melhor node e vale a primeira resposta. Nodes com falhas seguidas
+    ficam fora do rodízio por `COOLDOWN` segundos. `cache` é um
+    `http_cache.ResponseCache` opcional; `metrics` é um `metrics.HttpMetrics`
+    (padrão: o do processo, exportado por `metrics.stage_metrics`). Com `rate`,
+    cada node recebe no máximo `rate` requisições por segundo (token bucket).
+    """
+
+    def __init__(self, base_urls, max_per_node=MAX_PER_NODE, timeout=REQUEST_TIMEOUT, cache=None, metrics=None,
+                 rate=None, burst=None):
+        self.base_urls = list(base_urls)
+        self.cache = cache
+        self.metrics = HTTP if metrics is None else metrics
+        self.max_per_node = max_per_node
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.sessions = {}
+        self.semaphores = {}
+        self.stats = {}
+        self.buckets = {}
+        for base_url in self.base_urls:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_per_node)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self.sessions[base_url] = session
+            self.semaphores[base_url] = threading.BoundedSemaphore(max_per_node)
+            self.stats[base_url] = NodeStats()
+            if rate is not None:
+                self.buckets[base_url] = TokenBucket(rate, burst)
+        # Threads para as requisições principais e duplicadas (hedged)
+        self.executor = ThreadPoolExecutor(max_workers=2 * max_per_node * len(self.base_urls))
+
+    def fetch(self, base_url, path, params=None, headers=None, started=None):
+        """Faz um GET em `base_url + path`.
+
+        Retorna `(status, data, cabeçalhos)` ou None em caso de erro. Numa resposta
+        304 (revalidação do cache), `data` é None. `started` (um `threading.Event`)
+        é sinalizado quando a requisição sai, depois da espera pelo token bucket e
+        pelo limite de conexões do node.
+        """
+        url = f"{base_url}{path}"
+        stats = self.stats[base_url]
+        if base_url in self.buckets:
+            self.buckets[base_url].acquire()
+        with self.semaphores[base_url]:
+            with self.lock:
+                stats.in_flight += 1
+            if started is not None:
+                started.set()
+            start = time.monotonic()
+            try:
+                response = self.sessions[base_url].get(url, params=params, headers=headers, timeout=self.timeout)
+                response.raise_for_status()
+                data = None if response.status_code == 304 else response.json().get("data", [])
+            except (requests.RequestException, ValueError) as e:
+                print(f"Erro ao conectar com {url}: {e}")
+                with self.lock:
+                    stats.in_flight -= 1
+                    stats.record_failure()
+                self.metrics.error(base_url, type(e).__name__, time.monotonic() - start)
+                return None
+            latency = time.monotonic() - start
+            with self.lock:
+                stats.in_flight -= 1
+                stats.record_success(latency)
+            self.metrics.observe(base_url, latency, len(response.content), response.status_code)
+            return response.status_code, data, response.headers
+
+    def get(self, base_url, path, params=None):
+        """Faz um GET em `base_url + path` e retorna o campo `data` da resposta (ou None em caso de erro)."""
+        result = self.fetch(base_url, path, params)
+        return None if result is None else result[1]
+
+    def ranked_nodes(self):
+        """Nodes disponíveis do melhor para o pior; nodes ainda sem medições vêm primeiro."""
+        now = time.monotonic()
+        with self.lock:
+            available = [url for url in self.base_urls if self.stats[url].is_available(now)]
+            if not available:
+                # Todos os circuitos abertos: tenta o que reabre primeiro
+                available = [min(self.base_urls, key=lambda url: self.stats[url].open_until)]
+
+            def score(url):
+                stats = self.stats[url]
+                if stats.ewma_latency is None:
+                    return (0, self.base_urls.index(url))
+                load = 1 + stats.in_flight / self.max_per_node
+                return (1, stats.ewma_latency * (1 + 4 * stats.error_rate) * load)
+
+            return sorted(available, key=score)
+
+    def request(self, path, params=None):
+        """GET roteado pela latência, com requisição duplicada e fallback entre nodes.
+
+        Com um `cache`, respostas ainda válidas não vão à rede; respostas vencidas
+        são revalidadas (ETag/Last-Modified) e servidas mesmo assim se nenhum node
+        responder. Retorna o campo `data` ou None se não houver resposta.
+        """
+        entry = None
+        if self.cache is not None:
+            entry = self.cache.lookup(path, params)
+            if entry is not None and entry.fresh:
+                self.metrics.cache_lookup("hit")
+                return entry.data
+
+        result = self.hedged_fetch(path, params, entry.validators() if entry else None)
+        if result is None:
+            if entry is not None:
+                self.metrics.cache_lookup("stale")
+                return entry.data
+            return None
+        status, data, headers = result
+        if status == 304 and entry is not None:
+            self.metrics.cache_lookup("revalidated")
+            self.cache.revalidated(entry)
+            return entry.data
+        if self.cache is not None:
+            self.metrics.cache_lookup("miss")
+        if self.cache is not None and data is not None:
+            self.cache.store(path, params, data, headers)
+        return data
+
+    def hedged_fetch(self, path, params=None, headers=None):
+        """Envia a requisição ao melhor node e, passado o prazo, também ao segundo melhor."""
+        nodes = self.ranked_nodes()
+        started = threading.Event()
+        primary = self.executor.submit(self.fetch, nodes[0], path, params, headers, started)
+        primary.add_done_callback(lambda _: started.set())
+        pending = {primary}
+        tried = 1
+        if len(nodes) > 1:
+            # O prazo conta a partir do envio: a espera pela ficha do token bucket
+            # não é lentidão do node e não deve disparar a cópia (mas, se ela
+            # passar do tempo de uma requisição, a cópia sai mesmo assim)
+            started.wait(self.timeout)
+            done, _ = wait(pending, timeout=self.stats[nodes[0]].hedge_delay())
+            if not done:
+                self.metrics.fallback(nodes[0], nodes[1], "hedge")
+                pending.add(self.executor.submit(self.fetch, nodes[1], path, params, headers))
+                tried = 2
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result is not None:
+                    return result
+
+        # Os nodes tentados falharam (o principal pode falhar antes do prazo da
+        # cópia, sem que o segundo seja acionado): tenta os demais em ordem
+        for base_url in nodes[tried:]:
+            self.metrics.fallback(nodes[0], base_url, "fallback")
+            result = self.fetch(base_url, path, params, headers)
+            if result is not None:
+                return result
+        return None
+
+    def close(self):
+        """Fecha as conexões abertas com todos os nodes."""
+        self.executor.shutdown(wait=False)
+        for session in self.sessions.values():
+            session.close()
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Modelo padrão do BERTopic para textos em inglês
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Diretório com os vetores já calculados (um subdiretório por modelo)
+EMBEDDING_DIR = "embeddings_cache"
+
+# Textos codificados por chamada ao modelo
+BATCH_SIZE = 64
+
+KEY_SIZE = hashlib.sha1().digest_size
+
+
+def text_key(text):
+    """Chave do texto pré-processado no cache (SHA-1 do conteúdo)."""
+    return hashlib.sha1(text.encode("utf-8")).digest()
+
+
+class EmbeddingStore:
+    """Cache persistente de embeddings, indexado pelo hash do texto.
+
+    Os vetores ficam em `vectors.f32` (float32, uma linha por texto, mapeado em
+    memória) e as chaves, na mesma ordem, em `keys.bin`; textos novos são
+    acrescentados ao fim dos dois arquivos. Só os textos ausentes passam pelo
+    modelo, em lotes.
+    """
+
+    def __init__(self, model_name=EMBEDDING_MODEL, directory=EMBEDDING_DIR, batch_size=BATCH_SIZE):
+        self.model_name = model_name
+        self.directory = os.path.join(directory, model_name.replace("/", "__"))
+        self.batch_size = batch_size
+        self._model = None
+        os.makedirs(self.directory, exist_ok=True)
+        self.keys_file = os.path.join(self.directory, "keys.bin")
+        self.vectors_file = os.path.join(self.directory, "vectors.f32")
+        self.meta_file = os.path.join(self.directory, "meta.json")
+
+        self.dim = None
+        if os.path.exists(self.meta_file):
+            with open(self.meta_file, "r") as file:
+                self.dim = json.load(file)["dim"]
+        self.rows = {}
+        if self.dim is not None and os.path.exists(self.keys_file):
+            with open(self.keys_file, "rb") as file:
+                keys = file.read()
+            # Vetores gravados antes das chaves: uma gravação interrompida deixa só linhas sem chave
+            stored = os.path.getsize(self.vectors_file) // (4 * self.dim)
+            count = min(len(keys) // KEY_SIZE, stored)
+            self.rows = {keys[i * KEY_SIZE:(i + 1) * KEY_SIZE]: i for i in range(count)}
+
+    @property
+    def model(self):
+        """Modelo do sentence-transformers, carregado só quando há textos a codificar."""
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def vectors(self):
+        if not self.rows:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return np.memmap(self.vectors_file, dtype=np.float32, mode="r", shape=(len(self.rows), self.dim))
+
+    def append(self, keys, vectors):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            with open(self.meta_file, "w") as file:
+                json.dump({"model": self.model_name, "dim": self.dim}, file)
+        # Descarta restos de uma gravação interrompida antes de acrescentar
+        with open(self.vectors_file, "ab") as file:
+            file.truncate(len(self.rows) * 4 * self.dim)
+            file.write(vectors.tobytes())
+        with open(self.keys_file, "ab") as file:
+            file.truncate(len(self.rows) * KEY_SIZE)
+            file.write(b"".join(keys))
+        for key in keys:
+            self.rows[key] = len(self.rows)
+
+    def embed(self, texts):
+        """Embeddings de `texts` (float32, uma linha por texto), codificando só os ausentes do cache."""
+        keys = [text_key(text) for text in texts]
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self.rows and key not in missing:
+                missing[key] = text
+        print(f"Embeddings: {len(set(keys)) - len(missing)} textos em cache, {len(missing)} a calcular")
+
+        pending = list(missing.items())
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            vectors = self.model.encode([text for _, text in batch], batch_size=self.batch_size,
+                                        show_progress_bar=False)
+            self.append([key for key, _ in batch], vectors)
+
+        rows = np.array([self.rows[key] for key in keys], dtype=np.int64)
+        return np.asarray(self.vectors()[rows])
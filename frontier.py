@@ -0,0 +1,285 @@
+import hashlib
+import math
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from columnar import FollowerEdges
+from crawler import MAX_IN_FLIGHT, PAGE_SIZE
+from ingest import FOLLOWER_FIELDS, project
+from metrics import log_event
+
+# Estado da coleta (fronteira, usuários vistos e arestas), durável entre execuções
+CRAWL_DB = "crawl_state.sqlite"
+
+# Profundidade máxima (0 = só as sementes) e usuários expandidos no total
+MAX_DEPTH = 2
+CRAWL_BUDGET = 100_000
+
+# Vizinhos lidos por usuário em cada relação (limita o custo dos hubs)
+MAX_PER_USER = 1000
+
+# Tentativas de expandir um usuário antes de desistir dele
+MAX_ATTEMPTS = 3
+
+# Capacidade e taxa de falsos positivos do filtro de Bloom dos ids já vistos
+BLOOM_CAPACITY = 10_000_000
+BLOOM_ERROR = 0.001
+
+# Endpoints de cada relação; as arestas são sempre gravadas como (seguidor, seguido)
+RELATIONS = {
+    "followers": "/v1/users/{}/followers",
+    "following": "/v1/users/{}/following",
+}
+
+PENDING, DONE, FAILED = 0, 1, 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    node INTEGER PRIMARY KEY,
+    id TEXT UNIQUE NOT NULL,
+    depth INTEGER NOT NULL,
+    priority REAL NOT NULL,
+    status INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    handle TEXT,
+    follower_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS users_frontier ON users (status, depth, priority DESC);
+CREATE TABLE IF NOT EXISTS edges (
+    follower INTEGER NOT NULL,
+    followee INTEGER NOT NULL,
+    PRIMARY KEY (follower, followee)
+) WITHOUT ROWID;
+"""
+
+
+class BloomFilter:
+    """Conjunto aproximado de strings em um vetor de bits (sem falsos negativos)."""
+
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR):
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.num_hashes)]
+
+    def add(self, item):
+        for p in self.positions(item):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self.positions(item))
+
+
+class CrawlFrontier:
+    """Fronteira de uma coleta em vários saltos, guardada em SQLite.
+
+    Os usuários são expandidos do mais raso para o mais profundo e, na mesma
+    profundidade, do mais seguido para o menos. O filtro de Bloom evita consultar
+    o banco para ids nunca vistos (a maioria numa coleta que cresce); quando ele
+    diz "talvez", a tabela `users` dá a resposta exata. Cada expansão é gravada
+    numa transação, então a coleta pode ser interrompida e retomada a qualquer momento.
+    """
+
+    def __init__(self, filename=CRAWL_DB, bloom_capacity=BLOOM_CAPACITY, bloom_error=BLOOM_ERROR):
+        self.db = sqlite3.connect(filename)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        count = self.db.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        self.seen = BloomFilter(max(bloom_capacity, 2 * count), bloom_error)
+        for (user_id,) in self.db.execute("SELECT id FROM users"):
+            self.seen.add(user_id)
+
+    def close(self):
+        self.db.close()
+
+    def lookup(self, user_id):
+        """`(node, depth, status)` de um usuário já visto, ou None."""
+        if user_id not in self.seen:
+            return None
+        return self.db.execute("SELECT node, depth, status FROM users WHERE id = ?", (user_id,)).fetchone()
+
+    def discover(self, user, depth):
+        """Registra um usuário encontrado a `depth` saltos e retorna o seu nó.
+
+        Usuários já vistos continuam com o nó que tinham; se ainda não foram
+        expandidos, ficam com a menor profundidade em que apareceram.
+        """
+        user_id = user["id"]
+        priority = user.get("follower_count") or 0
+        found = self.lookup(user_id)
+        if found is None:
+            cursor = self.db.execute(
+                "INSERT INTO users (id, depth, priority, handle, follower_count) VALUES (?, ?, ?, ?, ?)",
+                (user_id, depth, priority, user.get("handle"), user.get("follower_count")),
+            )
+            self.seen.add(user_id)
+            return cursor.lastrowid
+        node, known_depth, status = found
+        if status == PENDING and depth < known_depth:
+            self.db.execute("UPDATE users SET depth = ? WHERE node = ?", (depth, node))
+        return node
+
+    def seed(self, user_ids):
+        """Acrescenta as sementes (profundidade 0, antes de todos os outros)."""
+        with self.db:
+            for user_id in user_ids:
+                node = self.discover({"id": user_id}, 0)
+                self.db.execute("UPDATE users SET priority = ? WHERE node = ? AND depth = 0", (math.inf, node))
+
+    def expanded(self):
+        return self.db.execute("SELECT COUNT(*) FROM users WHERE status = ?", (DONE,)).fetchone()[0]
+
+    def next_batch(self, size, max_depth, exclude=()):
+        """Os próximos `size` usuários pendentes até `max_depth`, fora os de `exclude`."""
+        rows = self.db.execute(
+            "SELECT node, id, depth FROM users WHERE status = ? AND depth <= ? "
+            "ORDER BY depth, priority DESC LIMIT ?",
+            (PENDING, max_depth, size + len(exclude)),
+        ).fetchall()
+        return [row for row in rows if row[0] not in exclude][:size]
+
+    def record(self, node, depth, neighbors):
+        """Grava numa transação as arestas e os usuários novos de uma expansão.
+
+        `neighbors` é `{relação: [usuários]}`; None marca uma falha, e o usuário
+        volta para a fronteira até esgotar `MAX_ATTEMPTS`.
+        """
+        with self.db:
+            if neighbors is None:
+                self.db.execute(
+                    "UPDATE users SET attempts = attempts + 1, "
+                    "status = CASE WHEN attempts + 1 >= ? THEN ? ELSE status END WHERE node = ?",
+                    (MAX_ATTEMPTS, FAILED, node),
+                )
+                return
+            edges = []
+            for relation, users in neighbors.items():
+                for user in users:
+                    other = self.discover(user, depth + 1)
+                    edges.append((other, node) if relation == "followers" else (node, other))
+            self.db.executemany("INSERT OR IGNORE INTO edges (follower, followee) VALUES (?, ?)", edges)
+            self.db.execute("UPDATE users SET status = ? WHERE node = ?", (DONE, node))
+
+    def edge_list(self):
+        """Arestas coletadas no formato de `columnar.FollowerEdges` (seguido, seguidor).
+
+        Os nós são as posições em `ids`; `artists` são as sementes. Serve de entrada
+        para `graph.from_edge_list`.
+        """
+        ids = [user_id for (user_id,) in self.db.execute("SELECT id FROM users ORDER BY node")]
+        # Os nós são atribuídos em sequência a partir de 1 e nunca apagados
+        seeds = self.db.execute("SELECT node FROM users WHERE depth = 0 ORDER BY node").fetchall()
+        seeds = np.array(seeds, dtype=np.int64).reshape(-1) - 1
+        pairs = np.array(self.db.execute("SELECT followee, follower FROM edges").fetchall(), dtype=np.int64)
+        pairs = pairs.reshape(-1, 2) - 1
+        return FollowerEdges(ids, seeds.astype(np.int32), pairs[:, 0].astype(np.int32), pairs[:, 1].astype(np.int32))
+
+
+def fetch_neighbors(pool, user_id, relation, app_name, page_size=PAGE_SIZE, max_per_user=MAX_PER_USER,
+                    fields=FOLLOWER_FIELDS):
+    """Todas as páginas de uma relação de um usuário (até `max_per_user`); None se alguma falhar."""
+    users = []
+    while len(users) < max_per_user:
+        limit = min(page_size, max_per_user - len(users))
+        params = {"limit": limit, "offset": len(users), "app_name": app_name}
+        page = pool.request(RELATIONS[relation].format(user_id), params)
+        if page is None:
+            return None
+        users.extend(project(user, fields) for user in page)
+        if len(page) < limit:
+            break
+    return users
+
+
+def expand(pool, user_id, relations, app_name, page_size, max_per_user):
+    """Vizinhos de um usuário em cada relação, ou None se alguma requisição falhou."""
+    neighbors = {}
+    for relation in relations:
+        users = fetch_neighbors(pool, user_id, relation, app_name, page_size, max_per_user)
+        if users is None:
+            return None
+        neighbors[relation] = users
+    return neighbors
+
+
+def crawl_network(seeds, pool, app_name, filename=CRAWL_DB, max_depth=MAX_DEPTH, budget=CRAWL_BUDGET,
+                  relations=("followers", "following"), page_size=PAGE_SIZE, max_per_user=MAX_PER_USER,
+                  max_in_flight=MAX_IN_FLIGHT):
+    """Coleta em largura (por prioridade) a partir das `seeds`, até `max_depth` saltos.
+
+    Para depois de expandir `budget` usuários (contando execuções anteriores) ou
+    quando a fronteira se esgota. Interromper com Ctrl+C espera as expansões em
+    andamento e mantém o estado em `filename`; chamar de novo retoma dali. O
+    ritmo por node vem do `pool` (`NodePool(..., rate=...)`). Retorna a
+    `CrawlFrontier` (ainda aberta).
+    """
+    frontier = CrawlFrontier(filename)
+    frontier.seed(seeds)
+    done = frontier.expanded()
+    running = {}
+    started = time.monotonic()
+    stopping = False
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        try:
+            while True:
+                if not stopping and done + len(running) < budget:
+                    in_flight = {node for node, _ in running.values()}
+                    slots = min(max_in_flight - len(running), budget - done - len(running))
+                    for node, user_id, depth in frontier.next_batch(slots, max_depth, in_flight):
+                        future = executor.submit(expand, pool, user_id, relations, app_name, page_size, max_per_user)
+                        running[future] = (node, depth)
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    node, depth = running.pop(future)
+                    neighbors = future.result()
+                    frontier.record(node, depth, neighbors)
+                    if neighbors is not None:
+                        done += 1
+                        if done % 100 == 0:
+                            rate = done / (time.monotonic() - started)
+                            print(f"{done} usuários expandidos ({rate:.1f}/s)")
+                            log_event("crawl_progress", expanded=done, in_flight=len(running))
+        except KeyboardInterrupt:
+            print("Interrompido: aguardando as expansões em andamento para salvar o estado...")
+            for future in running:
+                node, depth = running[future]
+                frontier.record(node, depth, future.result())
+            running.clear()
+    print(f"Coleta parada com {frontier.expanded()} usuários expandidos; estado em '{filename}'")
+    return frontier
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from audius_api import APP_NAME, BASE_URLS, load_from_file
+    from discovery_nodes import NodePool
+    from metrics import stage_metrics
+
+    parser = argparse.ArgumentParser(description="Coleta de seguidores em vários saltos, retomável.")
+    parser.add_argument("--seeds", default="trending_artists.json", help="JSON com a lista de ids iniciais")
+    parser.add_argument("--depth", type=int, default=MAX_DEPTH)
+    parser.add_argument("--budget", type=int, default=CRAWL_BUDGET, help="usuários expandidos no total")
+    parser.add_argument("--relations", nargs="+", choices=sorted(RELATIONS), default=["followers", "following"])
+    parser.add_argument("--max-per-user", type=int, default=MAX_PER_USER)
+    parser.add_argument("--rate", type=float, default=5.0, help="requisições por segundo em cada node")
+    parser.add_argument("--db", default=CRAWL_DB)
+    args = parser.parse_args()
+
+    pool = NodePool(BASE_URLS, rate=args.rate)
+    try:
+        with stage_metrics("crawl"):
+            crawl_network(load_from_file(args.seeds), pool, APP_NAME, args.db, args.depth, args.budget,
+                          args.relations, max_per_user=args.max_per_user).close()
+    finally:
+        pool.close()
@@ -1,41 +1,46 @@
-import networkx as nx
-import json
+import os
 
+import pandas as pd
+
+from columnar import load_tracks
+from graph import BipartiteGraph
+from graph_export import export_graph, node_attributes
+from graph_stats import eigenvector_centrality
+from ingest import TRACK_FIELDS, load_user_attributes
+
+# Snapshot do grafo salvo por network.build_stage, com handle e follower_count de
+# cada usuário, e só as colunas das faixas usadas (ver ingest.py e columnar.py)
 def load_data():
-    with open("trending_artists_allTime.json", "r") as file:
-        artists = json.load(file)
-    with open("followers_allTime.json", "r") as file:
-        followers = json.load(file)
-    return artists, followers
+    graph = BipartiteGraph.load()
+    tracks = load_tracks("trending_tracks_allTime.json", TRACK_FIELDS)
+    return graph, load_user_attributes(), tracks
 
-# Monta o grafo com os dados
-def build_network(artists, followers):
-    G = nx.Graph()
-    
-    # Adiciona nós para artistas
-    for artist in artists:
-        G.add_node(artist, type="artist")
-    
-    # Adiciona arestas com base nos seguidores
-    for artist, followers_list in followers.items():
-        for follower in followers_list:
-            follower_id = follower.get("id") if isinstance(follower, dict) else follower
-            G.add_node(follower_id, type="follower")
-            G.add_edge(artist, follower_id)
-    
-    return G
+# Comunidades já detectadas por comunidades.py, se houver
+def load_communities(filename="network_communities.csv"):
+    if not os.path.exists(filename):
+        return None
+    table = pd.read_csv(filename, dtype={"Nó": str})
+    return dict(zip(table["Nó"], table["Comunidade"]))
 
-# Exporta para GEXF (compatível com Gephi)
-def export_to_gephi(G, filename="network_graph.gexf"):
-    nx.write_gexf(G, filename)
-    print(f"✅ Arquivo salvo como {filename}, pronto para importar no Gephi!")
+# Exporta para GEXF ou GraphML (compatível com Gephi), gravando nó a nó com os
+# atributos já calculados; use a extensão .gz para comprimir (ver graph_export.py)
+def export_to_gephi(graph, filename="network_graph.gexf", tracks=None, communities=None, users=None):
+    attributes = node_attributes(
+        graph,
+        tracks=tracks,
+        eigenvector=eigenvector_centrality(graph),
+        communities=communities,
+    )
+    if users is not None:
+        attributes.update(users)
+    export_graph(graph, filename, attributes)
 
-if __name__ == "__main__":
-    # Carrega os dados
-    artists, followers = load_data()
-    
-    # Monta o grafo
-    G = build_network(artists, followers)
+def main():
+    # Carrega o grafo salvo e os atributos dos usuários
+    graph, users, tracks = load_data()
     
     # Exporta para Gephi
-    export_to_gephi(G)
+    export_to_gephi(graph, tracks=tracks, communities=load_communities(), users=users)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import scipy.sparse as sp
+
+# Diretório padrão do snapshot do grafo allTime
+GRAPH_DIR = "graph_allTime"
+
+
+class BipartiteGraph:
+    """Grafo artista–seguidor com ids internados como inteiros consecutivos.
+
+    `ids[i]` é o id do Audius do nó `i`, `is_artist[i]` indica se ele é artista e
+    `adjacency` é a matriz de adjacência simétrica em formato CSR. `followers`
+    guarda a direção das arestas: linha `k` = seguidores do k-ésimo artista de
+    `artist_nodes()`, sem os nós que esse artista segue.
+    """
+
+    def __init__(self, ids, is_artist, adjacency, followers=None):
+        self.ids = ids
+        self.is_artist = is_artist
+        self.adjacency = adjacency
+        self.followers = followers
+        self._index = None
+
+    @property
+    def num_nodes(self):
+        return len(self.ids)
+
+    @property
+    def num_edges(self):
+        return self.adjacency.nnz // 2
+
+    @property
+    def index(self):
+        """Dicionário id do Audius -> índice inteiro (montado na primeira consulta)."""
+        if self._index is None:
+            self._index = {node_id: i for i, node_id in enumerate(self.ids)}
+        return self._index
+
+    def degrees(self):
+        return np.diff(self.adjacency.indptr)
+
+    def neighbors(self, i):
+        return self.adjacency.indices[self.adjacency.indptr[i]:self.adjacency.indptr[i + 1]]
+
+    def edges(self):
+        """Arestas `(origem, destino)` com cada par listado uma única vez."""
+        upper = sp.triu(self.adjacency, k=1).tocoo()
+        return upper.row, upper.col
+
+    def artist_nodes(self):
+        return np.flatnonzero(self.is_artist)
+
+    def incidence(self):
+        """Matriz artistas × nós (linha `k` = seguidores do k-ésimo artista de `artist_nodes()`).
+
+        Sem `followers` (snapshots antigos), cai nas linhas da adjacência, que
+        também incluem quem o artista segue.
+        """
+        if self.followers is not None:
+            return self.followers
+        return self.adjacency[self.artist_nodes()]
+
+    def node_type(self, i):
+        return "artist" if self.is_artist[i] else "follower"
+
+    def snapshot_hash(self):
+        """Hash do conteúdo do grafo (ids, tipos e arestas), usado como chave de cache."""
+        digest = hashlib.sha1()
+        digest.update(json.dumps(list(self.ids)).encode("utf-8"))
+        digest.update(np.asarray(self.is_artist, dtype=bool).tobytes())
+        digest.update(np.asarray(self.adjacency.indptr, dtype=np.int64).tobytes())
+        digest.update(np.asarray(self.adjacency.indices, dtype=np.int64).tobytes())
+        return digest.hexdigest()
+
+    def save(self, directory=GRAPH_DIR):
+        """Grava o snapshot para ser mapeado em memória por outros scripts."""
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "ids.json"), "w") as file:
+            json.dump(list(self.ids), file)
+        np.save(os.path.join(directory, "is_artist.npy"), np.asarray(self.is_artist, dtype=bool))
+        np.save(os.path.join(directory, "indptr.npy"), self.adjacency.indptr)
+        np.save(os.path.join(directory, "indices.npy"), self.adjacency.indices)
+        np.save(os.path.join(directory, "data.npy"), self.adjacency.data)
+        if self.followers is not None:
+            np.save(os.path.join(directory, "followers_indptr.npy"), self.followers.indptr)
+            np.save(os.path.join(directory, "followers_indices.npy"), self.followers.indices)
+        print(f"Snapshot do grafo salvo em '{directory}'")
+
+    @classmethod
+    def load(cls, directory=GRAPH_DIR, mmap=True):
+        """Carrega um snapshot salvo por `save` sem reconstruir a adjacência."""
+        mode = "r" if mmap else None
+        with open(os.path.join(directory, "ids.json"), "r") as file:
+            ids = json.load(file)
+        is_artist = np.load(os.path.join(directory, "is_artist.npy"), mmap_mode=mode)
+        adjacency = sp.csr_matrix(
+            (
+                np.load(os.path.join(directory, "data.npy"), mmap_mode=mode),
+                np.load(os.path.join(directory, "indices.npy"), mmap_mode=mode),
+                np.load(os.path.join(directory, "indptr.npy"), mmap_mode=mode),
+            ),
+            shape=(len(ids), len(ids)),
+            copy=False,
+        )
+        followers = None
+        if os.path.exists(os.path.join(directory, "followers_indptr.npy")):
+            indptr = np.load(os.path.join(directory, "followers_indptr.npy"), mmap_mode=mode)
+            indices = np.load(os.path.join(directory, "followers_indices.npy"), mmap_mode=mode)
+            followers = sp.csr_matrix(
+                (np.ones(len(indices), dtype=np.int8), indices, indptr),
+                shape=(len(indptr) - 1, len(ids)),
+                copy=False,
+            )
+        return cls(ids, is_artist, adjacency, followers)
+
+    def to_networkx(self):
+        """Converte para `nx.Graph` (com o atributo `type`), para os gráficos que ainda usam NetworkX."""
+        import networkx as nx
+
+        G = nx.Graph()
+        G.add_nodes_from((node_id, {"type": self.node_type(i)}) for i, node_id in enumerate(self.ids))
+        src, dst = self.edges()
+        G.add_edges_from((self.ids[a], self.ids[b]) for a, b in zip(src.tolist(), dst.tolist()))
+        return G
+
+
+def from_edge_list(ids, artists, src, dst):
+    """Monta o grafo a partir de arestas já codificadas como inteiros (ver `columnar.py`)."""
+    num_nodes = len(ids)
+    is_artist = np.zeros(num_nodes, dtype=bool)
+    is_artist[np.asarray(artists)] = True
+    src = np.asarray(src, dtype=np.int32)
+    dst = np.asarray(dst, dtype=np.int32)
+    keep = src != dst
+    rows = np.concatenate([src[keep], dst[keep]])
+    cols = np.concatenate([dst[keep], src[keep]])
+    adjacency = sp.csr_matrix(
+        (np.ones(len(rows), dtype=np.int8), (rows, cols)),
+        shape=(num_nodes, num_nodes),
+    )
+    # Arestas repetidas são somadas na conversão; o grafo não tem pesos
+    adjacency.data[:] = 1
+    adjacency.sort_indices()
+    return BipartiteGraph(list(ids), is_artist, adjacency, follower_matrix(is_artist, src[keep], dst[keep]))
+
+
+def follower_matrix(is_artist, src, dst):
+    """Incidência dirigida artistas × nós a partir das arestas (seguido, seguidor).
+
+    Arestas cujo seguido não é artista (coletas em vários saltos) ficam de fora.
+    """
+    artist_nodes = np.flatnonzero(is_artist)
+    keep = is_artist[src]
+    src, dst = src[keep], dst[keep]
+    row_of = np.full(len(is_artist), -1, dtype=np.int64)
+    row_of[artist_nodes] = np.arange(len(artist_nodes))
+    followers = sp.csr_matrix(
+        (np.ones(len(src), dtype=np.int8), (row_of[src], dst)),
+        shape=(len(artist_nodes), len(is_artist)),
+    )
+    followers.data[:] = 1
+    followers.sort_indices()
+    return followers
+
+
+def build_bipartite(artists, followers):
+    """Monta o grafo a partir da lista de artistas e de `{artist_id: [seguidores]}`.
+
+    Os seguidores podem ser dicionários da API (com `id`) ou ids simples.
+    """
+    index = {}
+    for artist in artists:
+        index.setdefault(artist, len(index))
+    artist_idx = list(index.values())
+    src = []
+    dst = []
+    for artist, followers_list in followers.items():
+        a = index.setdefault(artist, len(index))
+        artist_idx.append(a)
+        for follower in followers_list:
+            follower_id = follower.get("id") if isinstance(follower, dict) else follower
+            src.append(a)
+            dst.append(index.setdefault(follower_id, len(index)))
+    return from_edge_list(list(index), artist_idx, src, dst)
@@ -0,0 +1,177 @@
+import gzip
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+
+# Nós e linhas da matriz processados por vez ao escrever o arquivo
+EXPORT_BLOCK = 50_000
+
+# Tipo de cada atributo em cada formato, a partir do dtype do vetor
+GEXF_TYPES = {"i": "integer", "u": "integer", "f": "double", "b": "boolean"}
+GRAPHML_TYPES = {"i": "long", "u": "long", "f": "double", "b": "boolean"}
+
+
+def artist_metadata(tracks):
+    """Nome e gênero de cada artista, tirados da primeira faixa dele em `tracks`."""
+    metadata = {}
+    for track in tracks:
+        user = track.get("user") or {}
+        if user.get("id") and user["id"] not in metadata:
+            metadata[user["id"]] = {"name": user.get("name") or "", "genre": track.get("genre") or ""}
+    return metadata
+
+
+def node_attributes(graph, tracks=None, eigenvector=None, communities=None):
+    """Atributos por nó para a exportação, como `{nome: vetor indexado pelos nós}`.
+
+    `communities` pode ser um vetor alinhado com os nós ou um dicionário
+    `{id: comunidade}` (nós ausentes recebem -1).
+    """
+    attributes = {
+        "type": np.where(graph.is_artist, "artist", "follower"),
+        "degree": graph.degrees(),
+    }
+    if eigenvector is not None:
+        attributes["eigenvector"] = np.asarray(eigenvector, dtype=np.float64)
+    if communities is not None:
+        if isinstance(communities, dict):
+            communities = [communities.get(node_id, -1) for node_id in graph.ids]
+        attributes["community"] = np.asarray(communities, dtype=np.int64)
+    if tracks is not None:
+        metadata = artist_metadata(tracks)
+        attributes["name"] = np.array([metadata.get(node_id, {}).get("name", "") for node_id in graph.ids], dtype=object)
+        attributes["genre"] = np.array([metadata.get(node_id, {}).get("genre", "") for node_id in graph.ids], dtype=object)
+    return attributes
+
+
+def open_output(filename):
+    """Abre o arquivo para escrita em texto, comprimindo com gzip se terminar em `.gz`."""
+    if filename.endswith(".gz"):
+        return gzip.open(filename, "wt", encoding="utf-8", compresslevel=6)
+    return open(filename, "w", encoding="utf-8")
+
+
+def attribute_type(values, types):
+    return types.get(np.asarray(values).dtype.kind, "string")
+
+
+def format_value(value):
+    if isinstance(value, (bool, np.bool_)):
+        return "true" if value else "false"
+    if isinstance(value, (float, np.floating)):
+        return repr(float(value))
+    return str(value)
+
+
+def present(value):
+    """Textos vazios (artista sem nome ou gênero, seguidores) ficam sem valor no arquivo."""
+    return not (isinstance(value, str) and value == "")
+
+
+def edge_blocks(graph, block=EXPORT_BLOCK):
+    """Arestas `(origem, destino, peso)` em blocos de linhas da CSR, sem montar a lista inteira."""
+    A = graph.adjacency
+    for start in range(0, graph.num_nodes, block):
+        end = min(graph.num_nodes, start + block)
+        lo, hi = A.indptr[start], A.indptr[end]
+        rows = np.repeat(np.arange(start, end), np.diff(A.indptr[start:end + 1]))
+        cols = A.indices[lo:hi]
+        keep = cols > rows
+        yield rows[keep], cols[keep], A.data[lo:hi][keep]
+
+
+def label_of(graph, attributes, i):
+    names = attributes.get("name")
+    return names[i] if names is not None and names[i] else graph.ids[i]
+
+
+def write_gexf(graph, filename, attributes, block=EXPORT_BLOCK):
+    """Escreve o grafo em GEXF 1.2 nó a nó e aresta a aresta (memória constante)."""
+    columns = list(attributes)
+    with open_output(filename) as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        file.write('<gexf xmlns="http://www.gexf.net/1.2draft" version="1.2">\n')
+        file.write('  <graph defaultedgetype="undirected" mode="static">\n')
+        file.write('    <attributes class="node" mode="static">\n')
+        for k, name in enumerate(columns):
+            kind = attribute_type(attributes[name], GEXF_TYPES)
+            file.write(f'      <attribute id="{k}" title={quoteattr(name)} type="{kind}" />\n')
+        file.write('    </attributes>\n')
+
+        file.write('    <nodes>\n')
+        for start in range(0, graph.num_nodes, block):
+            lines = []
+            for i in range(start, min(graph.num_nodes, start + block)):
+                values = "".join(
+                    f'<attvalue for="{k}" value={quoteattr(format_value(attributes[name][i]))} />'
+                    for k, name in enumerate(columns)
+                    if present(attributes[name][i])
+                )
+                lines.append(
+                    f'      <node id={quoteattr(str(graph.ids[i]))} label={quoteattr(str(label_of(graph, attributes, i)))}>'
+                    f'<attvalues>{values}</attvalues></node>\n'
+                )
+            file.write("".join(lines))
+        file.write('    </nodes>\n')
+
+        file.write('    <edges>\n')
+        edge_id = 0
+        for src, dst, weights in edge_blocks(graph, block):
+            lines = []
+            for u, v, w in zip(src.tolist(), dst.tolist(), weights.tolist()):
+                lines.append(
+                    f'      <edge id="{edge_id}" source={quoteattr(str(graph.ids[u]))} '
+                    f'target={quoteattr(str(graph.ids[v]))} weight="{format_value(w)}" />\n'
+                )
+                edge_id += 1
+            file.write("".join(lines))
+        file.write('    </edges>\n')
+        file.write('  </graph>\n')
+        file.write('</gexf>\n')
+
+
+def write_graphml(graph, filename, attributes, block=EXPORT_BLOCK):
+    """Escreve o grafo em GraphML nó a nó e aresta a aresta (memória constante)."""
+    columns = list(attributes)
+    with open_output(filename) as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        file.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+        for k, name in enumerate(columns):
+            kind = attribute_type(attributes[name], GRAPHML_TYPES)
+            file.write(f'  <key id="d{k}" for="node" attr.name={quoteattr(name)} attr.type="{kind}" />\n')
+        file.write('  <key id="weight" for="edge" attr.name="weight" attr.type="double" />\n')
+        file.write('  <graph edgedefault="undirected">\n')
+
+        for start in range(0, graph.num_nodes, block):
+            lines = []
+            for i in range(start, min(graph.num_nodes, start + block)):
+                values = "".join(
+                    f'<data key="d{k}">{escape(format_value(attributes[name][i]))}</data>'
+                    for k, name in enumerate(columns)
+                    if present(attributes[name][i])
+                )
+                lines.append(f'    <node id={quoteattr(str(graph.ids[i]))}>{values}</node>\n')
+            file.write("".join(lines))
+
+        for src, dst, weights in edge_blocks(graph, block):
+            file.write("".join(
+                f'    <edge source={quoteattr(str(graph.ids[u]))} target={quoteattr(str(graph.ids[v]))}>'
+                f'<data key="weight">{format_value(w)}</data></edge>\n'
+                for u, v, w in zip(src.tolist(), dst.tolist(), weights.tolist())
+            ))
+        file.write('  </graph>\n')
+        file.write('</graphml>\n')
+
+
+def export_graph(graph, filename, attributes=None, block=EXPORT_BLOCK):
+    """Exporta para GEXF ou GraphML conforme a extensão (`.gexf`, `.graphml`, opcionalmente `.gz`)."""
+    if attributes is None:
+        attributes = node_attributes(graph)
+    base = filename[:-3] if filename.endswith(".gz") else filename
+    if base.endswith(".graphml"):
+        write_graphml(graph, filename, attributes, block)
+    elif base.endswith(".gexf"):
+        write_gexf(graph, filename, attributes, block)
+    else:
+        raise ValueError(f"Formato de exportação desconhecido: {filename}")
+    print(f"✅ Arquivo salvo como {filename}, pronto para importar no Gephi!")
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+# Limite de entradas da matriz de vizinhos a dois passos calculadas por bloco
+# no clustering bipartido (controla o pico de memória)
+CLUSTERING_BLOCK_NNZ = 20_000_000
+
+
+def degree_centrality(graph):
+    """Grau e centralidade de grau (grau / (n - 1)), como em `nx.degree_centrality`."""
+    degrees = graph.degrees()
+    n = graph.num_nodes
+    scale = 1.0 / (n - 1) if n > 1 else 1.0
+    return degrees, degrees * scale
+
+
+def eigenvector_centrality(graph, max_iter=1000, tol=1.0e-6, start=None):
+    """Centralidade de autovetor por iteração de potência sobre a matriz CSR.
+
+    Usa o mesmo esquema de `nx.eigenvector_centrality` (iteração com `A + I`,
+    que converge também em grafos bipartidos, e norma L2 unitária). `start`
+    permite partir de um vetor anterior para convergir mais rápido.
+    """
+    n = graph.num_nodes
+    if n == 0:
+        return np.zeros(0)
+    A = graph.adjacency.astype(np.float64)
+    x = np.ones(n) if start is None else np.asarray(start, dtype=np.float64).copy()
+    if x.sum() == 0:
+        x = np.ones(n)
+    x /= x.sum()
+    for _ in range(max_iter):
+        x_last = x
+        x = x_last + A @ x_last
+        norm = np.linalg.norm(x) or 1.0
+        x = x / norm
+        if np.abs(x - x_last).sum() < n * tol:
+            return x
+    raise RuntimeError(f"Centralidade de autovetor não convergiu em {max_iter} iterações")
+
+
+def two_hop_blocks(A, degrees, budget=CLUSTERING_BLOCK_NNZ):
+    """Divide as linhas em blocos cujo produto `A[bloco] @ A` cabe em `budget` entradas."""
+    work = np.cumsum(A @ degrees)
+    n = len(work)
+    start = 0
+    while start < n:
+        done = work[start - 1] if start else 0.0
+        end = max(int(np.searchsorted(work, done + budget, side="right")), start + 1)
+        yield start, min(end, n)
+        start = end
+
+
+def bipartite_clustering(graph):
+    """Clustering bipartido de cada nó (modo `dot` de `nx.bipartite.clustering`).
+
+    Para cada par `u`, `v` a dois passos: |N(u) ∩ N(v)| / |N(u) ∪ N(v)|, com a
+    média tomada sobre os vizinhos a dois passos de `u`.
+    """
+    A = graph.adjacency.astype(np.float64)
+    degrees = graph.degrees().astype(np.float64)
+    clustering = np.zeros(graph.num_nodes)
+    for start, end in two_hop_blocks(A, degrees):
+        common = (A[start:end] @ A).tocoo()
+        rows = common.row + start
+        keep = rows != common.col
+        rows, cols, shared = rows[keep], common.col[keep], common.data[keep]
+        ratio = shared / (degrees[rows] + degrees[cols] - shared)
+        totals = np.bincount(rows - start, weights=ratio, minlength=end - start)
+        counts = np.bincount(rows - start, minlength=end - start)
+        np.divide(totals, counts, out=clustering[start:end], where=counts > 0)
+    return clustering
+
+
+def degree_histogram(graph):
+    """Frequência de cada grau (posição `k` = número de nós com grau `k`)."""
+    return np.bincount(graph.degrees())
+
+
+def network_statistics(graph):
+    """Número de vértices, de arestas e clustering bipartido médio."""
+    clustering = bipartite_clustering(graph)
+    avg_clustering = float(clustering.mean()) if graph.num_nodes else 0.0
+    print(f"📊 Número de vértices: {graph.num_nodes}")
+    print(f"🔗 Número de arestas: {graph.num_edges}")
+    print(f"🔄 Coeficiente de clustering bipartido médio: {avg_clustering:.4f}")
+    return graph.num_nodes, graph.num_edges, avg_clustering
+
+
+def centrality_table(graph, eigenvector=None):
+    """Tabela no formato de `graph_data - Copia.csv`, ordenada pelo grau."""
+    degrees, centrality = degree_centrality(graph)
+    if eigenvector is None:
+        eigenvector = eigenvector_centrality(graph)
+    table = pd.DataFrame({
+        "Node": graph.ids,
+        "Type": np.where(graph.is_artist, "artist", "follower"),
+        "Degree": degrees,
+        "Degree Centrality": centrality,
+        "Eigenvector Centrality": eigenvector,
+    })
+    return table.sort_values("Degree", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def as_node_dict(graph, values):
+    """Converte um vetor indexado pelos nós em `{id: valor}` (formato do NetworkX)."""
+    return dict(zip(graph.ids, np.asarray(values).tolist()))
+
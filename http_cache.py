@@ -0,0 +1,160 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+# Arquivo SQLite compartilhado por todos os coletores
+CACHE_FILE = "audius_cache.sqlite"
+
+# Tamanho máximo (em bytes comprimidos) antes de descartar as respostas menos usadas
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+# Validade (em segundos) das respostas de cada endpoint
+ENDPOINT_TTLS = {
+    "/v1/tracks/trending": 60 * 60,
+    "/v1/users/{id}/followers": 24 * 60 * 60,
+    "/v1/users/{id}/following": 24 * 60 * 60,
+}
+DEFAULT_TTL = 60 * 60
+
+# Parâmetros que não mudam o conteúdo da resposta
+IGNORED_PARAMS = {"app_name"}
+
+USER_ID_PATTERN = re.compile(r"^/v1/users/[^/]+/")
+
+
+def endpoint_of(path):
+    """Normaliza o caminho para o endpoint genérico (ex.: `/v1/users/{id}/followers`)."""
+    return USER_ID_PATTERN.sub("/v1/users/{id}/", path)
+
+
+def cache_key(path, params=None):
+    """Chave estável para o par caminho + parâmetros."""
+    items = sorted((k, str(v)) for k, v in (params or {}).items() if k not in IGNORED_PARAMS)
+    return path + "?" + "&".join(f"{k}={v}" for k, v in items)
+
+
+class CacheEntry:
+    """Resposta armazenada, com os validadores HTTP usados na revalidação."""
+
+    def __init__(self, key, data, etag, last_modified, fetched_at, ttl):
+        self.key = key
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.ttl = ttl
+
+    @property
+    def fresh(self):
+        return time.time() - self.fetched_at < self.ttl
+
+    def validators(self):
+        """Cabeçalhos para uma requisição condicional (vazio se a API não enviou validadores)."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Cache persistente de respostas da API em um único banco SQLite.
+
+    As respostas são indexadas por endpoint e parâmetros, expiram conforme
+    `ENDPOINT_TTLS` e, quando o arquivo passa de `max_bytes`, as menos acessadas
+    recentemente são removidas (LRU).
+    """
+
+    def __init__(self, filename=CACHE_FILE, max_bytes=MAX_CACHE_BYTES, ttls=None):
+        self.max_bytes = max_bytes
+        self.ttls = dict(ENDPOINT_TTLS, **(ttls or {}))
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                   key TEXT PRIMARY KEY,
+                   endpoint TEXT NOT NULL,
+                   body BLOB NOT NULL,
+                   etag TEXT,
+                   last_modified TEXT,
+                   fetched_at REAL NOT NULL,
+                   accessed_at REAL NOT NULL,
+                   size INTEGER NOT NULL
+               )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self.conn.commit()
+        # Total de bytes mantido a cada gravação, sem somar a tabela inteira
+        self.total_bytes = self._stored_bytes()
+
+    def ttl_for(self, endpoint):
+        return self.ttls.get(endpoint, DEFAULT_TTL)
+
+    def lookup(self, path, params=None):
+        """Retorna a entrada armazenada (fresca ou não) ou None."""
+        key = cache_key(path, params)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT endpoint, body, etag, last_modified, fetched_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+        endpoint, body, etag, last_modified, fetched_at = row
+        data = json.loads(zlib.decompress(body))
+        return CacheEntry(key, data, etag, last_modified, fetched_at, self.ttl_for(endpoint))
+
+    def store(self, path, params, data, headers=None):
+        """Grava (ou substitui) a resposta e aplica o limite de tamanho."""
+        headers = headers or {}
+        body = zlib.compress(json.dumps(data).encode("utf-8"))
+        now = time.time()
+        key = cache_key(path, params)
+        with self.lock:
+            previous = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint_of(path), body, headers.get("ETag"),
+                 headers.get("Last-Modified"), now, now, len(body)),
+            )
+            self.total_bytes += len(body) - (previous[0] if previous else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+            self.conn.commit()
+
+    def revalidated(self, entry):
+        """Marca uma entrada como fresca após uma resposta 304 (Not Modified)."""
+        with self.lock:
+            self.conn.execute("UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time(), entry.key))
+            self.conn.commit()
+        entry.fetched_at = time.time()
+
+    def _stored_bytes(self):
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self):
+        # Só aqui (quando o limite estoura) o total é recontado, o que também
+        # corrige gravações feitas por outros processos no mesmo arquivo
+        total = self._stored_bytes()
+        if total <= self.max_bytes:
+            self.total_bytes = total
+            return
+        rows = self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+        self.total_bytes = total
+
+    def close(self):
+        self.conn.close()
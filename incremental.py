@@ -0,0 +1,285 @@
+import os
+
+import numpy as np
+import scipy.sparse as sp
+
+from graph import BipartiteGraph, build_bipartite
+from graph_stats import eigenvector_centrality
+
+
+def edge_keys(src, dst, num_nodes):
+    """Chave inteira única de cada aresta não direcionada."""
+    low = np.minimum(src, dst).astype(np.int64)
+    high = np.maximum(src, dst).astype(np.int64)
+    return low * num_nodes + high
+
+
+def directed(keys, num_nodes, value):
+    """Matriz com `value` em cada aresta dirigida (seguido, seguidor) de `keys`."""
+    src, dst = np.divmod(keys, num_nodes)
+    data = np.full(len(keys), value, dtype=np.int8)
+    return sp.csr_matrix((data, (src, dst)), shape=(num_nodes, num_nodes))
+
+
+def follows_matrix(graph):
+    """Arestas dirigidas do grafo em uma matriz nós × nós (linha = artista seguido)."""
+    incidence = graph.incidence().tocoo()
+    artists = graph.artist_nodes()
+    data = np.ones(incidence.nnz, dtype=np.int8)
+    return sp.csr_matrix((data, (artists[incidence.row], incidence.col)),
+                         shape=(graph.num_nodes, graph.num_nodes))
+
+
+def symmetric(keys, num_nodes, value):
+    """Matriz simétrica com `value` em cada aresta de `keys`."""
+    src, dst = np.divmod(keys, num_nodes)
+    rows = np.concatenate([src, dst])
+    cols = np.concatenate([dst, src])
+    data = np.full(len(rows), value, dtype=np.int8)
+    return sp.csr_matrix((data, (rows, cols)), shape=(num_nodes, num_nodes))
+
+
+def resize(matrix, num_nodes):
+    matrix = matrix.tocsr()
+    matrix.resize((num_nodes, num_nodes))
+    return matrix
+
+
+class IncrementalNetwork:
+    """Grafo de um snapshot e suas métricas, atualizados só pelas arestas que mudaram.
+
+    Os ids já conhecidos mantêm a ordem entre snapshots; nós novos entram no fim
+    e seguidores que ficaram sem arestas saem, para que contagens e normalizações
+    batam com as de um grafo reconstruído. Graus, contagens de seguidores em
+    comum entre artistas (`co_followers`, indexada pelos nós) e a centralidade
+    de autovetor são atualizados a partir da diferença entre o snapshot novo e
+    o anterior.
+
+    `update` recebe o snapshot inteiro e compara com o grafo atual, com custo
+    proporcional ao total de arestas; `apply_delta` recebe só as mudanças (por
+    exemplo de `SnapshotStore.follows_diff`) e interna e consulta apenas os nós
+    delas. Nos dois casos ainda são O(arestas) as somas das matrizes esparsas,
+    a remoção de nós isolados e as iterações da centralidade de autovetor.
+    """
+
+    def __init__(self, graph, eigenvector=None, co_followers=None):
+        self.graph = graph
+        self.follows = follows_matrix(graph)
+        if co_followers is None:
+            follows = self.follows.astype(np.float64)
+            co_followers = (follows @ follows.T).tocsr()
+            co_followers.setdiag(0)
+            co_followers.eliminate_zeros()
+        self.co_followers = co_followers
+        if eigenvector is None:
+            eigenvector = eigenvector_centrality(graph)
+        self.eigenvector = eigenvector
+        self.degrees = graph.degrees()
+
+    @classmethod
+    def from_snapshot(cls, artists, followers):
+        return cls(build_bipartite(artists, followers))
+
+    def diff(self, artists, followers):
+        """Interna os ids do snapshot novo e compara as arestas com as do grafo atual.
+
+        Retorna `(ids, is_artist, adicionadas, removidas, seguidas, desfeitas)`:
+        chaves das arestas não direcionadas e das dirigidas (seguido, seguidor).
+        """
+        index = dict(self.graph.index)
+        ids = list(self.graph.ids)
+
+        def intern(node_id):
+            if node_id not in index:
+                index[node_id] = len(ids)
+                ids.append(node_id)
+            return index[node_id]
+
+        artist_idx = [intern(artist) for artist in artists]
+        src = []
+        dst = []
+        for artist, followers_list in followers.items():
+            a = intern(artist)
+            artist_idx.append(a)
+            for follower in followers_list:
+                follower_id = follower.get("id") if isinstance(follower, dict) else follower
+                src.append(a)
+                dst.append(intern(follower_id))
+
+        num_nodes = len(ids)
+        is_artist = np.zeros(num_nodes, dtype=bool)
+        is_artist[artist_idx] = True
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        keep = src != dst
+        new_keys = np.unique(edge_keys(src[keep], dst[keep], num_nodes))
+        old_src, old_dst = self.graph.edges()
+        old_keys = edge_keys(old_src, old_dst, num_nodes)
+        added = np.setdiff1d(new_keys, old_keys, assume_unique=True)
+        removed = np.setdiff1d(old_keys, new_keys, assume_unique=True)
+
+        new_follows = np.unique(src[keep] * num_nodes + dst[keep])
+        old = self.follows.tocoo()
+        old_follows = old.row.astype(np.int64) * num_nodes + old.col
+        followed = np.setdiff1d(new_follows, old_follows, assume_unique=True)
+        unfollowed = np.setdiff1d(old_follows, new_follows, assume_unique=True)
+        return ids, is_artist, added, removed, followed, unfollowed
+
+    def delta(self, followed, unfollowed, artists=()):
+        """Como `diff`, a partir só dos pares `(artista, seguidor)` que passaram a
+        seguir e que deixaram de seguir; `artists` são artistas novos sem seguidores.
+
+        Só os ids dos pares são internados e a aresta não direcionada de cada par
+        é decidida consultando em `follows` a aresta no sentido oposto. Pares já
+        aplicados (seguir o que já é seguido, desfazer o que não existe) são ignorados.
+        """
+        index = self.graph.index
+        ids = list(self.graph.ids)
+        new = {}
+
+        def intern(node_id):
+            if node_id in index:
+                return index[node_id]
+            if node_id not in new:
+                new[node_id] = len(ids)
+                ids.append(node_id)
+            return new[node_id]
+
+        def keys(pairs):
+            nodes = np.array([(intern(artist), intern(follower)) for artist, follower in pairs],
+                             dtype=np.int64).reshape(-1, 2)
+            nodes = nodes[nodes[:, 0] != nodes[:, 1]]
+            return nodes[:, 0], nodes[:, 1]
+
+        artist_idx = [intern(artist) for artist in artists]
+        followed_src, followed_dst = keys(followed)
+        unfollowed_src, unfollowed_dst = keys(unfollowed)
+        num_nodes = len(ids)
+        is_artist = np.zeros(num_nodes, dtype=bool)
+        is_artist[:self.graph.num_nodes] = self.graph.is_artist
+        is_artist[artist_idx] = True
+        is_artist[followed_src] = True
+
+        old = resize(self.follows, num_nodes)
+
+        def present(src, dst):
+            if not len(src):
+                return np.zeros(0, dtype=bool)
+            return np.asarray(old[src, dst]).ravel() > 0
+
+        followed = np.unique(followed_src * num_nodes + followed_dst)
+        followed = followed[~present(*np.divmod(followed, num_nodes))]
+        unfollowed = np.unique(unfollowed_src * num_nodes + unfollowed_dst)
+        unfollowed = unfollowed[present(*np.divmod(unfollowed, num_nodes))]
+
+        # Aresta nova: o seguidor não seguia o artista antes; aresta removida: o
+        # seguidor continua sem ser seguido pelo artista depois das mudanças
+        src, dst = np.divmod(followed, num_nodes)
+        new_edge = ~present(dst, src)
+        added = np.unique(edge_keys(src[new_edge], dst[new_edge], num_nodes))
+        src, dst = np.divmod(unfollowed, num_nodes)
+        reverse = dst * num_nodes + src
+        remains = (present(dst, src) & ~np.isin(reverse, unfollowed)) | np.isin(reverse, followed)
+        removed = np.unique(edge_keys(src[~remains], dst[~remains], num_nodes))
+        return ids, is_artist, added, removed, followed, unfollowed
+
+    def update(self, artists, followers, max_iter=1000):
+        """Aplica o snapshot novo e atualiza as métricas.
+
+        Retorna `(adicionadas, removidas)`, com as chaves das arestas no índice
+        anterior à remoção dos nós que ficaram isolados.
+        """
+        return self.apply(*self.diff(artists, followers), max_iter=max_iter)
+
+    def apply_delta(self, followed, unfollowed, artists=(), max_iter=1000):
+        """Como `update`, com as mudanças do snapshot em vez dele inteiro (ver `delta`)."""
+        return self.apply(*self.delta(followed, unfollowed, artists), max_iter=max_iter)
+
+    def apply(self, ids, is_artist, added, removed, followed, unfollowed, max_iter=1000):
+        """Atualiza o grafo e as métricas com o resultado de `diff` ou `delta`."""
+        num_nodes = len(ids)
+        old_n = self.graph.num_nodes
+
+        delta = symmetric(added, num_nodes, 1) - symmetric(removed, num_nodes, 1)
+        old_adjacency = resize(self.graph.adjacency, num_nodes).astype(np.int8)
+        adjacency = (old_adjacency + delta).tocsr()
+        adjacency.eliminate_zeros()
+        adjacency.sort_indices()
+
+        # Graus: só mudam os extremos das arestas adicionadas e removidas
+        degrees = np.zeros(num_nodes, dtype=self.degrees.dtype)
+        degrees[:old_n] = self.degrees
+        for keys, sign in ((added, 1), (removed, -1)):
+            ends = np.concatenate(np.divmod(keys, num_nodes))
+            degrees += sign * np.bincount(ends, minlength=num_nodes).astype(degrees.dtype)
+
+        # Co-seguidores: com F a matriz dirigida (linha = artista seguido) e
+        # D = F' - F, F'F'ᵀ = FFᵀ + D·Fᵀ + F·Dᵀ + D·Dᵀ, com custo proporcional a D
+        old_follows = resize(self.follows, num_nodes).astype(np.float64)
+        D = (directed(followed, num_nodes, 1) - directed(unfollowed, num_nodes, 1)).astype(np.float64)
+        X = D @ old_follows.T
+        co_followers = resize(self.co_followers, num_nodes) + X + X.T + D @ D.T
+        co_followers = co_followers.tocsr()
+        co_followers.setdiag(0)
+        co_followers.eliminate_zeros()
+        follows = (old_follows + D).tocsr()
+        follows.eliminate_zeros()
+
+        # Autovetor: parte do vetor anterior (nós novos com o valor médio)
+        start = np.full(num_nodes, self.eigenvector.mean() if old_n else 1.0)
+        start[:old_n] = self.eigenvector
+
+        # Seguidores que perderam todas as arestas saem do grafo (artistas ficam,
+        # como numa reconstrução a partir do snapshot)
+        keep = (degrees > 0) | is_artist
+        if not keep.all():
+            ids = [node_id for node_id, kept in zip(ids, keep.tolist()) if kept]
+            is_artist = is_artist[keep]
+            degrees = degrees[keep]
+            adjacency = adjacency[keep][:, keep]
+            follows = follows[keep][:, keep]
+            co_followers = co_followers[keep][:, keep]
+            start = start[keep]
+
+        self.follows = follows.astype(np.int8)
+        self.graph = BipartiteGraph(ids, is_artist, adjacency, self.follows[np.flatnonzero(is_artist)])
+        self.degrees = degrees
+        self.co_followers = co_followers
+        self.eigenvector = eigenvector_centrality(self.graph, max_iter=max_iter, start=start)
+
+        print(f"➕ {len(added)} arestas novas, ➖ {len(removed)} arestas removidas")
+        return added, removed
+
+    def save(self, directory):
+        self.graph.save(directory)
+        np.save(os.path.join(directory, "eigenvector.npy"), self.eigenvector)
+        sp.save_npz(os.path.join(directory, "co_followers.npz"), self.co_followers)
+
+    @classmethod
+    def load(cls, directory):
+        graph = BipartiteGraph.load(directory, mmap=False)
+        return cls(
+            graph,
+            eigenvector=np.load(os.path.join(directory, "eigenvector.npy")),
+            co_followers=sp.load_npz(os.path.join(directory, "co_followers.npz")).tocsr(),
+        )
+
+
+def update_network(directory, artists, followers):
+    """Atualiza o estado salvo em `directory` com um snapshot novo (ou cria o estado inicial)."""
+    if os.path.exists(os.path.join(directory, "eigenvector.npy")):
+        network = IncrementalNetwork.load(directory)
+        network.update(artists, followers)
+    else:
+        network = IncrementalNetwork.from_snapshot(artists, followers)
+    network.save(directory)
+    return network
+
+
+if __name__ == "__main__":
+    from network import load_data
+
+    artists, followers, _ = load_data()
+    network = update_network("graph_state_allTime", artists, followers)
+    print(f"📊 Número de vértices: {network.graph.num_nodes}")
+    print(f"🔗 Número de arestas: {network.graph.num_edges}")
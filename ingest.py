@@ -0,0 +1,192 @@
+import json
+import os
+import warnings
+from array import array
+
+import numpy as np
+
+from columnar import FollowerEdges, load_tracks
+from graph import GRAPH_DIR, from_edge_list
+
+# Campos mantidos de cada seguidor; o resto do objeto da API é descartado na leitura
+FOLLOWER_FIELDS = ("id", "handle", "follower_count")
+
+# Colunas das faixas usadas pelas análises do grafo (nome e gênero dos artistas, legendas)
+TRACK_FIELDS = ("id", "title", "genre", "user.id", "user.name")
+
+# Bytes lidos do arquivo por vez pelo parser incremental
+READ_BUFFER = 1 << 16
+
+# Atributos dos usuários gravados junto com o snapshot do grafo (ver network.build_stage)
+USERS_FILE = "users.npz"
+
+
+class IdIndex:
+    """Dicionário id do Audius -> inteiro, compartilhado entre arquivos e coletas.
+
+    Cada id guarda uma única cópia da string, por mais vezes que apareça, e os
+    atributos projetados ficam uma vez por usuário (não por aresta).
+    """
+
+    def __init__(self, ids=()):
+        self.ids = []
+        self.positions = {}
+        self.users = {}
+        for node_id in ids:
+            self.intern(node_id)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def intern(self, node_id):
+        position = self.positions.get(node_id)
+        if position is None:
+            position = self.positions[node_id] = len(self.ids)
+            self.ids.append(node_id)
+        return position
+
+    def update(self, position, record):
+        """Guarda os campos do usuário (valores nulos não apagam os já vistos)."""
+        for field, value in record.items():
+            if field == "id" or value is None:
+                continue
+            values = self.users.setdefault(field, [])
+            if len(values) <= position:
+                values.extend([None] * (position + 1 - len(values)))
+            values[position] = value
+
+    def user_attributes(self):
+        """Atributos por nó para `graph_export`: inteiros com -1 e textos com "" onde faltam."""
+        attributes = {}
+        for field, values in self.users.items():
+            values = values + [None] * (len(self.ids) - len(values))
+            present = [v for v in values if v is not None]
+            if present and all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+                attributes[field] = np.array([-1 if v is None else v for v in values], dtype=np.int64)
+            else:
+                attributes[field] = np.array(["" if v is None else str(v) for v in values], dtype=object)
+        return attributes
+
+
+def project(record, fields=FOLLOWER_FIELDS):
+    """Só os campos pedidos de um seguidor (que também pode vir como id simples)."""
+    if not isinstance(record, dict):
+        return {"id": record}
+    return {field: record.get(field) for field in fields}
+
+
+def iter_followers(filename, fields=FOLLOWER_FIELDS):
+    """Percorre `{artist_id: [seguidores]}` gerando `(artist_id, seguidor projetado)`,
+    precedidos por `(artist_id, None)` quando começa a lista de cada artista.
+
+    Com o `ijson` instalado o arquivo é lido aos poucos e só os campos em `fields`
+    chegam a virar objetos Python; sem ele, o JSON é carregado inteiro.
+    """
+    try:
+        import ijson
+    except ImportError:
+        warnings.warn(f"ijson não instalado: carregando '{filename}' inteiro na memória (pip install ijson)",
+                      RuntimeWarning, stacklevel=2)
+        with open(filename, "r", encoding="utf-8") as file:
+            followers = json.load(file)
+        for artist_id, followers_list in followers.items():
+            yield artist_id, None
+            for follower in followers_list:
+                yield artist_id, project(follower, fields)
+        return
+
+    wanted = set(fields)
+    depth = 0
+    artist_id = key = record = None
+    with open(filename, "rb") as file:
+        for event, value in ijson.basic_parse(file, buf_size=READ_BUFFER, use_float=True):
+            if event in ("start_map", "start_array"):
+                depth += 1
+                if depth == 3 and event == "start_map":
+                    record = dict.fromkeys(fields)
+                continue
+            if event in ("end_map", "end_array"):
+                depth -= 1
+                if depth == 2 and event == "end_map":
+                    yield artist_id, record
+                    record = None
+                continue
+            if event == "map_key":
+                if depth == 1:
+                    artist_id = value
+                    yield artist_id, None
+                elif depth == 3:
+                    key = value
+            elif depth == 3 and record is not None and key in wanted:
+                record[key] = value
+            elif depth == 2:
+                # Seguidor gravado só como id
+                yield artist_id, {"id": value}
+
+
+def ingest_followers(items, artists=(), index=None):
+    """Codifica pares `(artist_id, seguidor)` como arestas de inteiros.
+
+    Os artistas de `artists` vêm primeiro no `index`, depois cada artista e
+    seguidor na ordem em que aparecem (a mesma de `graph.build_bipartite`).
+    Retorna `(FollowerEdges, index)`.
+    """
+    index = IdIndex() if index is None else index
+    artist_idx = array("i", (index.intern(artist) for artist in artists))
+    # Arestas em arrays compactos (4 bytes por ponta), não em listas de objetos
+    src = array("i")
+    dst = array("i")
+    for artist_id, follower in items:
+        if follower is None:
+            a = index.intern(artist_id)
+            artist_idx.append(a)
+            continue
+        f = index.intern(follower["id"])
+        index.update(f, follower)
+        src.append(a)
+        dst.append(f)
+    edges = FollowerEdges(index.ids, np.frombuffer(artist_idx, dtype=np.int32),
+                          np.frombuffer(src, dtype=np.int32), np.frombuffer(dst, dtype=np.int32))
+    return edges, index
+
+
+def load_graph(artists, filename, fields=FOLLOWER_FIELDS, index=None):
+    """Monta o grafo bipartido lendo o arquivo de seguidores em streaming.
+
+    Equivale a `build_bipartite(artists, json.load(...))` sem carregar os
+    objetos completos dos seguidores. Retorna `(grafo, index)`; os atributos dos
+    usuários saem de `index.user_attributes()`.
+    """
+    edges, index = ingest_followers(iter_followers(filename, fields), artists, index)
+    return from_edge_list(*edges), index
+
+
+def save_user_attributes(index, directory=GRAPH_DIR):
+    """Grava os atributos dos usuários ao lado do snapshot salvo por `BipartiteGraph.save`."""
+    attributes = {
+        field: values.astype(str) if values.dtype == object else values
+        for field, values in index.user_attributes().items()
+    }
+    np.savez(os.path.join(directory, USERS_FILE), **attributes)
+
+
+def load_user_attributes(directory=GRAPH_DIR):
+    """Atributos por nó gravados por `save_user_attributes` (vazio se não houver)."""
+    path = os.path.join(directory, USERS_FILE)
+    if not os.path.exists(path):
+        return {}
+    with np.load(path) as data:
+        return {field: data[field] for field in data.files}
+
+
+def load_dataset(suffix="", fields=FOLLOWER_FIELDS):
+    """Lê os arquivos dos coletores (`trending_artists{suffix}.json` etc.).
+
+    Retorna `(artistas, grafo, index, faixas)`, com os seguidores lidos em
+    streaming e as faixas só com as colunas de `TRACK_FIELDS` (ver columnar.py).
+    """
+    with open(f"trending_artists{suffix}.json", "r", encoding="utf-8") as file:
+        artists = json.load(file)
+    tracks = load_tracks(f"trending_tracks{suffix}.json", TRACK_FIELDS)
+    graph, index = load_graph(artists, f"followers{suffix}.json", fields)
+    return artists, graph, index, tracks
@@ -0,0 +1,243 @@
+import os
+
+import numpy as np
+
+# Arquivo padrão com as coordenadas já calculadas
+POSITIONS_FILE = "layout_positions.npz"
+
+# Parâmetros do ForceAtlas2
+SCALING_RATIO = 2.0
+GRAVITY = 1.0
+JITTER_TOLERANCE = 1.0
+MAX_DISPLACEMENT = 10.0
+
+# Nós por célula desejados no nível mais fino da grade de Barnes–Hut
+NODES_PER_CELL = 4
+
+
+def grid_levels(num_nodes):
+    """Número de níveis da grade (2^L × 2^L células no nível mais fino)."""
+    return max(2, int(np.ceil(np.log(max(num_nodes / NODES_PER_CELL, 1)) / np.log(4))))
+
+
+def cell_moments(flat, mass, pos, num_cells):
+    """Massa e centro de massa de cada célula: array `(num_cells, 3)` com `[massa, x, y]`."""
+    moments = np.zeros((num_cells, 3))
+    moments[:, 0] = np.bincount(flat, weights=mass, minlength=num_cells)
+    for axis in range(2):
+        weighted = np.bincount(flat, weights=mass * pos[:, axis], minlength=num_cells)
+        np.divide(weighted, moments[:, 0], out=moments[:, axis + 1], where=moments[:, 0] > 0)
+    return moments
+
+
+def cell_repulsion(pos, mass, moments, targets):
+    """Repulsão do ForceAtlas2 (k_r · m_u · M / d) entre cada nó e várias células.
+
+    `targets` tem forma `(n, k)` com o índice de cada célula em `moments`;
+    retorna a força somada por nó.
+    """
+    cell = np.take(moments, targets, axis=0)
+    delta = pos[:, None, :] - cell[..., 1:]
+    dist2 = np.einsum("ijk,ijk->ij", delta, delta) + 1e-9
+    strength = SCALING_RATIO * mass[:, None] * cell[..., 0] / dist2
+    return np.einsum("ijk,ij->ik", delta, strength)
+
+
+# Células ao redor da grade (sempre vazias), para que os deslocamentos abaixo nunca saiam dela
+PADDING = 2
+
+# Para cada posição da célula dentro da célula-pai (paridade x, y): deslocamentos, a
+# partir do canto da célula-pai, das filhas da vizinhança do pai que não são vizinhas
+FAR_OFFSETS = [
+    np.array([(dx, dy) for dx in range(-2, 4) for dy in range(-2, 4)
+              if abs(dx - px) > 1 or abs(dy - py) > 1])
+    for px in range(2) for py in range(2)
+]
+NEIGHBOR_OFFSETS = np.array([(dx, dy) for dx in range(-1, 2) for dy in range(-1, 2) if (dx, dy) != (0, 0)])
+
+# Nós processados por vez (limita os arrays temporários n × 27 × 2)
+REPULSION_CHUNK = 65536
+
+
+def repulsion(pos, mass):
+    """Repulsão aproximada por uma grade hierárquica (Barnes–Hut com monopolos).
+
+    Em cada nível, o nó interage com as células filhas da vizinhança da célula-pai
+    que não são vizinhas da sua própria célula; no nível mais fino, com as 8
+    células vizinhas e com a própria célula (descontando o próprio nó).
+    """
+    n = len(pos)
+    levels = grid_levels(n)
+    low = pos.min(axis=0)
+    span = max(float((pos.max(axis=0) - low).max()), 1e-9) * (1 + 1e-9)
+    unit = (pos - low) / span
+    force = np.zeros_like(pos)
+
+    for level in range(2, levels + 1):
+        size = 2 ** level
+        width = size + 2 * PADDING
+        cells = np.minimum((unit * size).astype(np.int64), size - 1)
+        flat = (cells[:, 0] + PADDING) * width + cells[:, 1] + PADDING
+        moments = cell_moments(flat, mass, pos, width * width)
+
+        parent = (2 * (cells[:, 0] // 2) + PADDING) * width + 2 * (cells[:, 1] // 2) + PADDING
+        parity = (cells[:, 0] % 2) * 2 + cells[:, 1] % 2
+        for code, offsets in enumerate(FAR_OFFSETS):
+            shift = offsets[:, 0] * width + offsets[:, 1]
+            nodes = np.flatnonzero(parity == code)
+            for start in range(0, len(nodes), REPULSION_CHUNK):
+                chunk = nodes[start:start + REPULSION_CHUNK]
+                targets = parent[chunk, None] + shift[None, :]
+                force[chunk] += cell_repulsion(pos[chunk], mass[chunk], moments, targets)
+
+        if level < levels:
+            continue
+        shift = NEIGHBOR_OFFSETS[:, 0] * width + NEIGHBOR_OFFSETS[:, 1]
+        for start in range(0, n, REPULSION_CHUNK):
+            chunk = slice(start, min(n, start + REPULSION_CHUNK))
+            targets = flat[chunk, None] + shift[None, :]
+            force[chunk] += cell_repulsion(pos[chunk], mass[chunk], moments, targets)
+
+        # Própria célula sem o próprio nó
+        own = moments[flat]
+        own_mass = own[:, 0] - mass
+        own_center = own[:, 1:] * own[:, :1] - pos * mass[:, None]
+        np.divide(own_center, own_mass[:, None], out=own_center, where=own_mass[:, None] > 1e-9)
+        delta = pos - own_center
+        dist2 = np.einsum("ij,ij->i", delta, delta) + 1e-9
+        strength = np.where(own_mass > 1e-9, SCALING_RATIO * mass * own_mass / dist2, 0.0)
+        force += delta * strength[:, None]
+    return force
+
+
+def force_layout(graph, iterations=100, seed=42, start=None):
+    """Layout ForceAtlas2 vetorizado sobre a adjacência esparsa.
+
+    Atração linear ao longo das arestas, repulsão proporcional a (grau + 1) com a
+    aproximação de `repulsion`, gravidade em direção ao centro e a velocidade
+    adaptativa (swing/traction) do ForceAtlas2. `start` permite continuar a partir
+    de coordenadas salvas. Retorna um array `n × 2`.
+    """
+    n = graph.num_nodes
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(-1, 1, size=(n, 2)) * np.sqrt(n) if start is None else np.array(start, dtype=np.float64)
+    if n < 2:
+        return pos
+    mass = graph.degrees().astype(np.float64) + 1
+    src, dst = graph.edges()
+    previous = np.zeros_like(pos)
+    speed = 1.0
+
+    for _ in range(iterations):
+        force = repulsion(pos, mass)
+
+        delta = pos[dst] - pos[src]
+        for axis in range(2):
+            force[:, axis] += np.bincount(src, weights=delta[:, axis], minlength=n)
+            force[:, axis] -= np.bincount(dst, weights=delta[:, axis], minlength=n)
+
+        norm = np.linalg.norm(pos, axis=1) + 1e-9
+        force -= (GRAVITY * mass / norm)[:, None] * pos
+
+        swinging = mass * np.linalg.norm(force - previous, axis=1)
+        traction = mass * np.linalg.norm(force + previous, axis=1) / 2
+        target_speed = JITTER_TOLERANCE * traction.sum() / max(swinging.sum(), 1e-9)
+        speed = min(target_speed, 1.5 * speed)
+
+        factor = speed / (1 + speed * np.sqrt(swinging))
+        magnitude = np.linalg.norm(force, axis=1) + 1e-9
+        factor = np.minimum(factor, MAX_DISPLACEMENT / magnitude)
+        pos += force * factor[:, None]
+        previous = force
+    return pos
+
+
+def save_positions(ids, pos, filename=POSITIONS_FILE):
+    # Grava num temporário e troca: etapas em paralelo podem ler o arquivo ao mesmo tempo
+    temp = filename + ".tmp.npz"
+    np.savez(temp, ids=np.asarray(ids, dtype=str), pos=pos)
+    os.replace(temp, filename)
+
+
+def load_positions(graph, filename=POSITIONS_FILE, seed=42):
+    """Coordenadas salvas para os nós do grafo; nós novos começam na média dos vizinhos já posicionados.
+
+    Retorna `(posições, quantidade de nós reaproveitados)` ou `(None, 0)` sem arquivo.
+    """
+    if not os.path.exists(filename):
+        return None, 0
+    saved = np.load(filename)
+    known = {node_id: i for i, node_id in enumerate(saved["ids"].tolist())}
+    rng = np.random.default_rng(seed)
+    pos = np.full((graph.num_nodes, 2), np.nan)
+    found = np.array([known.get(node_id, -1) for node_id in graph.ids])
+    pos[found >= 0] = saved["pos"][found[found >= 0]]
+
+    missing = np.flatnonzero(found < 0)
+    if len(missing):
+        placed = np.nan_to_num(pos)
+        has_pos = (found >= 0).astype(np.float64)
+        A = graph.adjacency.astype(np.float64)
+        counts = A[missing] @ has_pos
+        sums = A[missing] @ placed
+        spread = np.nanstd(pos) if (found >= 0).any() else np.sqrt(graph.num_nodes)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            guess = sums / counts[:, None]
+        random_guess = rng.normal(0, spread or 1.0, size=(len(missing), 2))
+        pos[missing] = np.where(counts[:, None] > 0, guess + rng.normal(0, 1, size=guess.shape), random_guess)
+    return pos, int((found >= 0).sum())
+
+
+def cached_layout(graph, filename=POSITIONS_FILE, iterations=100, refine_iterations=20, seed=42):
+    """Layout reaproveitando coordenadas salvas; só refina quando a maior parte dos nós já é conhecida."""
+    start, reused = load_positions(graph, filename, seed)
+    if start is not None and reused == graph.num_nodes:
+        print(f"Coordenadas carregadas de '{filename}'")
+        return start
+    if start is not None and reused >= graph.num_nodes // 2:
+        pos = force_layout(graph, refine_iterations, seed, start)
+    else:
+        pos = force_layout(graph, iterations, seed)
+    save_positions(graph.ids, pos, filename)
+    print(f"Coordenadas salvas em '{filename}'")
+    return pos
+
+
+def render_graph(graph, pos, filename, colors=None, sizes=None, cmap="jet", title=None,
+                 labels=None, legend=None, legend_title=None, edge_alpha=0.15, dpi=150):
+    """Desenha o grafo sem interface gráfica e salva em PNG ou SVG (pela extensão).
+
+    As arestas são desenhadas de uma vez como `LineCollection` rasterizada;
+    `colors` (comunidade, centralidade ou nomes de cores) e `sizes` são vetores
+    indexados pelos nós. `labels` mapeia índice do nó → texto e `legend` é uma
+    lista de `(cor, rótulo)`.
+    """
+    from matplotlib.collections import LineCollection
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Patch
+
+    src, dst = graph.edges()
+    segments = np.stack([pos[src], pos[dst]], axis=1)
+    numeric = colors is not None and np.issubdtype(np.asarray(colors).dtype, np.number)
+    # Figure sem pyplot: não depende de backend gráfico nem bloqueia em plt.show()
+    fig = Figure(figsize=(15, 10))
+    ax = fig.subplots()
+    ax.add_collection(LineCollection(segments, colors="gray", linewidths=0.3, alpha=edge_alpha, rasterized=True))
+    ax.scatter(
+        pos[:, 0], pos[:, 1],
+        c="lightblue" if colors is None else colors,
+        s=10 if sizes is None else sizes,
+        cmap=cmap if numeric else None,
+        linewidths=0, rasterized=True,
+    )
+    for node, text in (labels or {}).items():
+        ax.annotate(text, pos[node], fontsize=10, ha="center", va="center")
+    if legend:
+        handles = [Patch(color=color, label=label) for color, label in legend]
+        ax.legend(handles=handles, loc="upper left", title=legend_title)
+    ax.autoscale()
+    ax.set_axis_off()
+    if title:
+        ax.set_title(title)
+    fig.savefig(filename, dpi=dpi, bbox_inches="tight")
+    print(f"Grafo salvo em '{filename}'")
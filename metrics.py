@@ -0,0 +1,377 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Diretório com o log estruturado (`events.jsonl`) e os arquivos `.prom` lidos
+# pelo coletor textfile do node_exporter (--collector.textfile.directory)
+METRICS_DIR = "metrics"
+EVENTS_FILE = "events.jsonl"
+
+# Limites (em segundos) dos buckets do histograma de latência das requisições
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0)
+
+# Intervalo (em segundos) entre leituras da memória residente durante uma etapa
+RSS_INTERVAL = 0.05
+
+# Variável de ambiente com as etapas a perfilar (`grafo,bigrams` ou `*`)
+PROFILE_ENV = "AUDIUS_PROFILE"
+
+try:
+    import resource
+except ImportError:
+    # Windows: sem getrusage; CPU só do próprio processo e memória pelo psutil, se houver
+    resource = None
+
+_log_lock = threading.Lock()
+
+
+def log_event(event, directory=METRICS_DIR, **fields):
+    """Acrescenta uma linha JSON (`ts`, `pid`, `event` e os campos) ao log de eventos."""
+    os.makedirs(directory, exist_ok=True)
+    line = json.dumps({"ts": time.time(), "pid": os.getpid(), "event": event, **fields}, ensure_ascii=False)
+    with _log_lock:
+        with open(os.path.join(directory, EVENTS_FILE), "a", encoding="utf-8") as file:
+            file.write(line + "\n")
+
+
+def proc_rss(pid="self"):
+    """Memória residente de um processo lida do /proc, em bytes (None sem /proc)."""
+    try:
+        with open(f"/proc/{pid}/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def current_rss():
+    """Memória residente atual do processo, em bytes (pico até agora onde não há /proc)."""
+    rss = proc_rss()
+    if rss is not None:
+        return rss
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss vem em kB no Linux e em bytes no macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+    try:
+        import psutil
+    except ImportError:
+        return 0
+    return psutil.Process().memory_info().rss
+
+
+def children_rss():
+    """Soma da memória residente dos processos descendentes (pools de processos)."""
+    if os.path.isdir("/proc"):
+        parents = defaultdict(list)
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", "r") as file:
+                    # O nome do processo (entre parênteses) pode ter espaços
+                    ppid = int(file.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, ValueError, IndexError):
+                continue
+            parents[ppid].append(entry)
+        total = 0
+        pending = list(parents.get(os.getpid(), []))
+        while pending:
+            pid = pending.pop()
+            total += proc_rss(pid) or 0
+            pending.extend(parents.get(int(pid), []))
+        return total
+    try:
+        import psutil
+    except ImportError:
+        return 0
+    total = 0
+    for child in psutil.Process().children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+class RssSampler(threading.Thread):
+    """Lê a memória residente a cada `RSS_INTERVAL` segundos e guarda o maior valor,
+    do processo (`peak`) e da soma dos processos filhos ativos (`children_peak`)."""
+
+    def __init__(self, interval=RSS_INTERVAL):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.start_rss = current_rss()
+        self.peak = self.start_rss
+        self.children_peak = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+            self.children_peak = max(self.children_peak, children_rss())
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.peak = max(self.peak, current_rss())
+        return self.peak
+
+
+def cpu_seconds():
+    """Tempo de CPU (usuário + sistema) do processo e dos filhos já encerrados."""
+    if resource is None:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def labels(**values):
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in values.items()) + "}"
+
+
+def write_textfile(lines, filename, directory=METRICS_DIR):
+    """Grava um arquivo no formato texto do Prometheus (renomeado no fim, como o
+    coletor textfile exige, para nunca ser lido pela metade)."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, filename)
+    temp = path + ".tmp"
+    with open(temp, "w", encoding="utf-8") as file:
+        file.write("\n".join(lines) + "\n")
+    os.replace(temp, path)
+
+
+class HttpMetrics:
+    """Contadores por discovery node: requisições, latências (histograma), bytes,
+    erros, requisições duplicadas/fallbacks entre nodes e uso do cache.
+
+    Alimentado pelo `NodePool` a partir de várias threads. Erros e fallbacks
+    também vão para o log de eventos de `directory`, definido por
+    `stage_metrics` durante uma etapa; fora dela (None) só os contadores são
+    atualizados e nenhum arquivo é gravado.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, directory=None):
+        self.buckets = tuple(buckets)
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = defaultdict(int)
+            self.histograms = defaultdict(lambda: [0] * (len(self.buckets) + 1))
+            self.latency_sum = defaultdict(float)
+            self.bytes = defaultdict(int)
+            self.errors = defaultdict(int)
+            self.fallbacks = defaultdict(int)
+            self.cache = defaultdict(int)
+
+    def observe(self, node, latency, num_bytes, status):
+        bucket = next((i for i, limit in enumerate(self.buckets) if latency <= limit), len(self.buckets))
+        with self.lock:
+            self.requests[node, status] += 1
+            self.histograms[node][bucket] += 1
+            self.latency_sum[node] += latency
+            self.bytes[node] += num_bytes
+
+    def error(self, node, kind, latency=None):
+        with self.lock:
+            self.errors[node, kind] += 1
+        if self.directory is not None:
+            log_event("http_error", self.directory, node=node, kind=kind, latency=latency)
+
+    def fallback(self, source, target, reason):
+        """`reason` é `hedge` (cópia enviada ao segundo melhor node) ou `fallback`."""
+        with self.lock:
+            self.fallbacks[source, target, reason] += 1
+        if self.directory is not None:
+            log_event("http_fallback", self.directory, source=source, target=target, reason=reason)
+
+    def cache_lookup(self, outcome):
+        """`outcome`: `hit`, `miss`, `revalidated` ou `stale` (servida vencida sem resposta)."""
+        with self.lock:
+            self.cache[outcome] += 1
+
+    def total_requests(self):
+        with self.lock:
+            return sum(self.requests.values()) + sum(self.errors.values())
+
+    def summary(self):
+        """Resumo por node (para o log JSON)."""
+        with self.lock:
+            nodes = {node for node, _ in self.requests} | {node for node, _ in self.errors}
+            result = {}
+            for node in sorted(nodes):
+                count = sum(n for (name, _), n in self.requests.items() if name == node)
+                result[node] = {
+                    "requests": count,
+                    "errors": sum(n for (name, _), n in self.errors.items() if name == node),
+                    "bytes": self.bytes.get(node, 0),
+                    "mean_latency": self.latency_sum[node] / count if count else None,
+                }
+            return {
+                "nodes": result,
+                "fallbacks": [{"source": s, "target": t, "reason": r, "count": n}
+                              for (s, t, r), n in self.fallbacks.items()],
+                "cache": dict(self.cache),
+            }
+
+    def prometheus_lines(self, **extra):
+        """Métricas no formato texto do Prometheus; `extra` vira rótulo de todas as séries."""
+        with self.lock:
+            lines = [
+                "# HELP audius_http_requests_total Respostas recebidas de cada discovery node.",
+                "# TYPE audius_http_requests_total counter",
+            ]
+            lines += [f"audius_http_requests_total{labels(**extra, node=node, status=status)} {n}"
+                      for (node, status), n in sorted(self.requests.items())]
+            lines += [
+                "# HELP audius_http_request_duration_seconds Latência das respostas bem-sucedidas.",
+                "# TYPE audius_http_request_duration_seconds histogram",
+            ]
+            for node, counts in sorted(self.histograms.items()):
+                total = 0
+                for limit, n in zip(self.buckets + ("+Inf",), counts):
+                    total += n
+                    lines.append(f"audius_http_request_duration_seconds_bucket{labels(**extra, node=node, le=limit)} {total}")
+                lines.append(f"audius_http_request_duration_seconds_sum{labels(**extra, node=node)} {self.latency_sum[node]}")
+                lines.append(f"audius_http_request_duration_seconds_count{labels(**extra, node=node)} {total}")
+            lines += [
+                "# HELP audius_http_response_bytes_total Bytes recebidos de cada discovery node.",
+                "# TYPE audius_http_response_bytes_total counter",
+            ]
+            lines += [f"audius_http_response_bytes_total{labels(**extra, node=node)} {n}"
+                      for node, n in sorted(self.bytes.items())]
+            lines += [
+                "# HELP audius_http_errors_total Requisições que falharam, por tipo de erro.",
+                "# TYPE audius_http_errors_total counter",
+            ]
+            lines += [f"audius_http_errors_total{labels(**extra, node=node, kind=kind)} {n}"
+                      for (node, kind), n in sorted(self.errors.items())]
+            lines += [
+                "# HELP audius_http_fallbacks_total Requisições repassadas a outro node.",
+                "# TYPE audius_http_fallbacks_total counter",
+            ]
+            lines += [f"audius_http_fallbacks_total{labels(**extra, source=s, target=t, reason=r)} {n}"
+                      for (s, t, r), n in sorted(self.fallbacks.items())]
+            lines += [
+                "# HELP audius_http_cache_lookups_total Consultas ao cache de respostas.",
+                "# TYPE audius_http_cache_lookups_total counter",
+            ]
+            lines += [f"audius_http_cache_lookups_total{labels(**extra, outcome=outcome)} {n}"
+                      for outcome, n in sorted(self.cache.items())]
+            return lines
+
+
+# Métricas HTTP do processo, usadas por padrão por todo `NodePool`
+HTTP = HttpMetrics()
+
+
+def profiled_stages():
+    return {name.strip() for name in os.environ.get(PROFILE_ENV, "").split(",") if name.strip()}
+
+
+@contextmanager
+def profiler(name, kind="cprofile", directory=METRICS_DIR):
+    """Perfila o bloco: `cprofile` grava `<name>.prof` (abrir com pstats/snakeviz);
+    `sampling` usa o pyinstrument, se instalado, e grava `<name>.html`."""
+    os.makedirs(directory, exist_ok=True)
+    if kind == "sampling":
+        from pyinstrument import Profiler
+
+        sampler = Profiler()
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            with open(os.path.join(directory, f"{name}.html"), "w", encoding="utf-8") as file:
+                file.write(sampler.output_html())
+        return
+
+    import cProfile
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(os.path.join(directory, f"{name}.prof"))
+
+
+@contextmanager
+def stage_metrics(name, profile=None, directory=METRICS_DIR):
+    """Mede uma etapa: tempo de relógio, tempo de CPU e pico de memória residente.
+
+    A memória é medida como pico do processo, crescimento desde o início da
+    etapa (o que importa quando o processo já rodou outras etapas) e pico da
+    soma dos processos filhos (pools de sentimento, n-gramas e comunidades).
+    Ao terminar (com sucesso ou erro) registra um evento `stage` no log JSON e
+    grava `stage_<name>.prom`; se a etapa fez requisições, também
+    `http_<name>.prom` com as métricas dos discovery nodes. `profile`
+    (`cprofile`/`sampling`) liga o profiler só nesta etapa; sem ele, a etapa é
+    perfilada com cProfile se estiver em `AUDIUS_PROFILE`.
+    """
+    if profile is None and (name in profiled_stages() or "*" in profiled_stages()):
+        profile = "cprofile"
+    HTTP.reset()
+    previous_directory, HTTP.directory = HTTP.directory, directory
+    sampler = RssSampler()
+    sampler.start()
+    status = "error"
+    start_cpu = cpu_seconds()
+    start = time.perf_counter()
+    try:
+        if profile:
+            with profiler(name, profile, directory):
+                yield
+        else:
+            yield
+        status = "ok"
+    finally:
+        wall = time.perf_counter() - start
+        cpu = cpu_seconds() - start_cpu
+        peak = sampler.stop()
+        growth = peak - sampler.start_rss
+        children = sampler.children_peak
+        HTTP.directory = previous_directory
+        finished = time.time()
+        log_event("stage", directory, stage=name, status=status, wall_seconds=wall, cpu_seconds=cpu,
+                  peak_rss_bytes=peak, rss_growth_bytes=growth, children_peak_rss_bytes=children)
+        stage = labels(stage=name)
+        write_textfile([
+            "# HELP audius_stage_wall_seconds Duração da última execução da etapa.",
+            "# TYPE audius_stage_wall_seconds gauge",
+            f"audius_stage_wall_seconds{stage} {wall}",
+            "# HELP audius_stage_cpu_seconds Tempo de CPU da última execução (com processos filhos).",
+            "# TYPE audius_stage_cpu_seconds gauge",
+            f"audius_stage_cpu_seconds{stage} {cpu}",
+            "# HELP audius_stage_peak_rss_bytes Pico de memória residente durante a etapa.",
+            "# TYPE audius_stage_peak_rss_bytes gauge",
+            f"audius_stage_peak_rss_bytes{stage} {peak}",
+            "# HELP audius_stage_rss_growth_bytes Crescimento da memória residente durante a etapa.",
+            "# TYPE audius_stage_rss_growth_bytes gauge",
+            f"audius_stage_rss_growth_bytes{stage} {growth}",
+            "# HELP audius_stage_children_peak_rss_bytes Pico da memória somada dos processos filhos.",
+            "# TYPE audius_stage_children_peak_rss_bytes gauge",
+            f"audius_stage_children_peak_rss_bytes{stage} {children}",
+            "# HELP audius_stage_success Se a última execução terminou sem erro.",
+            "# TYPE audius_stage_success gauge",
+            f"audius_stage_success{stage} {int(status == 'ok')}",
+            "# HELP audius_stage_last_run_timestamp_seconds Fim da última execução.",
+            "# TYPE audius_stage_last_run_timestamp_seconds gauge",
+            f"audius_stage_last_run_timestamp_seconds{stage} {finished}",
+        ], f"stage_{name}.prom", directory)
+        if HTTP.total_requests():
+            log_event("http", directory, stage=name, **HTTP.summary())
+            write_textfile(HTTP.prometheus_lines(stage=name), f"http_{name}.prom", directory)
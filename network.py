@@ -1,11 +1,29 @@
 import networkx as nx
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
 import json
 import pandas as pd
 from collections import Counter
 import numpy as np
 
+from approx_stats import approximate_eigenvector_centrality, approximate_network_statistics, summarize
+from graph import BipartiteGraph, build_bipartite
+from graph_stats import (as_node_dict, centrality_table, degree_centrality, degree_histogram,
+                         eigenvector_centrality, network_statistics)
+from columnar import load_tracks
+from ingest import TRACK_FIELDS, load_dataset, save_user_attributes
+from layout import cached_layout, render_graph
+
+# Modo aproximado (estimadores por amostragem, com intervalos de confiança) para
+# grafos grandes demais para as métricas exatas; ver approx_stats.py
+APPROXIMATE = False
+SAMPLE_BUDGET = 2000
+
+# Figura da distribuição de graus (gravada também quando não há interface gráfica)
+DEGREE_FIGURE = "distribuicao_graus_allTime.png"
+
+# Estatísticas da rede de statistics_stage: exatas ou, no modo aproximado, com
+# intervalos de confiança e o tamanho das amostras
+STATS_FILE = "graph_stats_allTime.json"
+
 # Carrega os dados dos arquivos JSON
 def load_data():
     with open("trending_artists_allTime.json", "r") as file:
@@ -16,22 +34,9 @@ def load_data():
         tracks = json.load(file)
     return artists, followers, tracks
 
-# Monta o grafo com os dados
+# Monta o grafo com os dados (ver graph.py)
 def build_network(artists, followers):
-    G = nx.Graph()
-    
-    # Adiciona nós para artistas
-    for artist in artists:
-        G.add_node(artist, type="artist")
-    
-    # Adiciona arestas com base nos seguidores
-    for artist, followers_list in followers.items():
-        for follower in followers_list:
-            follower_id = follower.get("id") if isinstance(follower, dict) else follower
-            G.add_node(follower_id, type="follower")
-            G.add_edge(artist, follower_id)
-    
-    return G
+    return build_bipartite(artists, followers).to_networkx()
 
 # Calcula estatísticas da rede
 def compute_network_statistics(G):
@@ -45,15 +50,20 @@ def compute_network_statistics(G):
     
     return num_vertices, num_arestas, coef_clustering
 
-# Calcula distribuição de graus
-def plot_degree_distribution(G):
-    degrees = [G.degree(n) for n in G.nodes()]
-    plt.figure(figsize=(10, 5))
-    plt.hist(degrees, bins=30, alpha=0.7, color='blue', edgecolor='black')
-    plt.xlabel("Grau")
-    plt.ylabel("Frequência")
-    plt.title("Distribuição de Graus da Rede")
-    plt.show()
+# Calcula distribuição de graus (a partir da contagem por grau, sem NetworkX);
+# Figure sem pyplot, como em layout.render_graph: não acumula figuras nem bloqueia
+def plot_degree_distribution(graph):
+    from matplotlib.figure import Figure
+
+    histogram = degree_histogram(graph)
+    present = np.flatnonzero(histogram)
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.hist(present, bins=30, weights=histogram[present], alpha=0.7, color='blue', edgecolor='black')
+    ax.set_xlabel("Grau")
+    ax.set_ylabel("Frequência")
+    ax.set_title("Distribuição de Graus da Rede")
+    fig.savefig(DEGREE_FIGURE, bbox_inches="tight")
 
 # Calcula centralidade dos vértices
 def compute_centralities(G):
@@ -62,58 +72,76 @@ def compute_centralities(G):
     
     return degree_centrality, eigenvector_centrality
 
-# Plota a rede com centralidade proporcional
-def plot_artist_graph_with_legend(G, legend_info, degree_centrality, eigenvector_centrality):
-    labels = {artist_id: info["artist_name"] for artist_id, info in legend_info.items()}
-    
-    node_sizes = [5000 * eigenvector_centrality.get(node, 0) if node in labels else 50 for node in G.nodes]
-    node_colors = ["orange" if node in labels else "lightblue" for node in G.nodes]
-    
-    plt.figure(figsize=(15, 10))
-    pos = nx.spring_layout(G, seed=42)
-    nx.draw(
-        G,
-        pos,
-        with_labels=True,
-        labels=labels,
-        node_size=node_sizes,
-        node_color=node_colors,
-        edge_color="gray",
-        font_size=10,
-    )
-    
-    legend_handles = [
-        mpatches.Patch(
-            color="orange", 
-            label=f"{info['artist_name']} - {info['title']} ({info['genre']})"
-        )
+# Desenha a rede com centralidade proporcional (layout em cache, sem interface gráfica; ver layout.py)
+def plot_artist_graph_with_legend(graph, legend_info, degree_centrality, eigenvector_centrality, pos,
+                                  filename="grafo_artistas.png"):
+    labels = {graph.index[artist_id]: info["artist_name"] for artist_id, info in legend_info.items() if artist_id in graph.index}
+    labeled = np.zeros(graph.num_nodes, dtype=bool)
+    labeled[list(labels)] = True
+    
+    eigenvector = np.array([eigenvector_centrality.get(node, 0) for node in graph.ids])
+    node_sizes = np.where(labeled, 5000 * eigenvector, 50)
+    node_colors = np.where(labeled, "orange", "lightblue")
+    
+    legend = [
+        ("orange", f"{info['artist_name']} - {info['title']} ({info['genre']})")
         for artist_id, info in legend_info.items()
     ]
-    plt.legend(handles=legend_handles, loc="upper left", title="Artistas, Músicas e Gêneros")
-    
-    plt.title("Rede de Artistas e Seguidores (Nome do Artista, Música e Gênero)")
-    plt.show()
+    render_graph(
+        graph, pos, filename,
+        colors=node_colors,
+        sizes=node_sizes,
+        labels=labels,
+        legend=legend,
+        legend_title="Artistas, Músicas e Gêneros",
+        title="Rede de Artistas e Seguidores (Nome do Artista, Música e Gênero)",
+    )
 
-if __name__ == "__main__":
-    # Carrega os dados
-    artists, followers, tracks = load_data()
+# Etapas (cada uma pode rodar sozinha no pipeline; ver pipeline.py)
+def build_stage():
+    # Monta o grafo lendo os seguidores em streaming (ver ingest.py) e salva o
+    # snapshot, com os atributos dos usuários, para os demais scripts
+    _, graph, users, _ = load_dataset("_allTime")
+    graph.save()
+    save_user_attributes(users)
 
-    # Monta o grafo
-    G = build_network(artists, followers)
-    
-    # Calcula estatísticas da rede
-    compute_network_statistics(G)
+def statistics_stage():
+    # Só as colunas das faixas usadas na legenda, sem reler os seguidores (ver columnar.py)
+    tracks = load_tracks("trending_tracks_allTime.json", TRACK_FIELDS)
+    graph = BipartiteGraph.load()
+    
+    # Calcula estatísticas da rede sobre a matriz esparsa (ver graph_stats.py)
+    # (no modo aproximado, a centralidade de autovetor também tem custo limitado)
+    if APPROXIMATE:
+        summary = summarize(graph, approximate_network_statistics(graph, SAMPLE_BUDGET))
+        eigenvector = approximate_eigenvector_centrality(graph)
+    else:
+        num_nodes, num_edges, clustering = network_statistics(graph)
+        summary = {"num_nodes": num_nodes, "num_edges": num_edges, "clustering": clustering}
+        eigenvector = eigenvector_centrality(graph)
+    with open(STATS_FILE, "w", encoding="utf-8") as file:
+        json.dump({"approximate": APPROXIMATE, **summary}, file, indent=2, ensure_ascii=False)
     
     # Plota distribuição de graus
-    plot_degree_distribution(G)
+    plot_degree_distribution(graph)
     
-    # Calcula centralidades
-    degree_centrality, eigenvector_centrality = compute_centralities(G)
+    # Calcula centralidades e salva a tabela por nó
+    table = centrality_table(graph, eigenvector)
+    table.to_csv("graph_data.csv", index=False)
+    _, degree = degree_centrality(graph)
     
     # Prepara os dados para a legenda
     legend_info = {track["user"]["id"]: {"artist_name": track["user"]["name"], "title": track["title"], "genre": track["genre"]} for track in tracks}
     
-    # Plota a rede ajustada
-    plot_artist_graph_with_legend(G, legend_info, degree_centrality, eigenvector_centrality)
+    # Desenha a rede ajustada
+    pos = cached_layout(graph)
+    plot_artist_graph_with_legend(graph, legend_info, as_node_dict(graph, degree), as_node_dict(graph, eigenvector), pos)
     
     print("✅ Análise concluída com sucesso!")
+
+def main():
+    build_stage()
+    statistics_stage()
+
+if __name__ == "__main__":
+    main()
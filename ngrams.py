@@ -0,0 +1,222 @@
+import csv
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from corpus import CORPUS_DIR, Corpus
+
+# Documentos lidos do corpus por bloco
+NGRAM_CHUNK = 50_000
+
+# Parâmetros padrão do sketch Count-Min + top-k
+SKETCH_WIDTH = 2 ** 18
+SKETCH_DEPTH = 4
+TOP_K = 1000
+
+# Multiplicador para combinar os hashes das palavras na chave do n-grama
+MIX = np.uint64(0x100000001B3)
+
+# Hashes das palavras do vocabulário, gravados no diretório do corpus para os processos
+HASHES_FILE = "word_hashes.npy"
+
+# Corpus e hashes do processo de trabalho, abertos uma única vez em `init_worker`
+_worker_corpus = None
+_worker_hashes = None
+
+
+def word_hashes(vocabulary):
+    """Hash de 64 bits de cada palavra, estável entre corpora com vocabulários diferentes."""
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+         for word in vocabulary],
+        dtype=np.uint64,
+    )
+
+
+def ngram_keys(tokens, offsets, hashes, n):
+    """Chave de cada n-grama que cabe inteiro em um documento e a posição onde ele começa."""
+    lengths = np.diff(offsets)
+    doc_end = np.repeat(offsets[1:] - offsets[0], lengths)
+    starts = np.flatnonzero(np.arange(len(tokens)) + n <= doc_end)
+    keys = hashes[tokens[starts]]
+    for j in range(1, n):
+        keys = keys * MIX + hashes[tokens[starts + j]]
+    return keys, starts
+
+
+def chunk_counts(corpus, first, last, hashes, n):
+    """N-gramas distintos dos documentos `first:last`, com contagens e palavras."""
+    lo, hi = corpus.offsets[first], corpus.offsets[last]
+    tokens = np.asarray(corpus.tokens[lo:hi])
+    keys, starts = ngram_keys(tokens, corpus.offsets[first:last + 1], hashes, n)
+    keys, index, counts = np.unique(keys, return_index=True, return_counts=True)
+
+    def words(i):
+        start = starts[index[i]]
+        return tuple(corpus.vocabulary[t] for t in tokens[start:start + n])
+
+    return keys, counts, words
+
+
+class NGramCounts:
+    """Contagens exatas de n-gramas, como arrays ordenados de chaves e contagens.
+
+    As chaves são hashes de 64 bits: dois n-gramas diferentes com a mesma chave
+    teriam as contagens somadas. Com N n-gramas distintos a chance é de cerca de
+    N²/2⁶⁵ (desprezível para milhões de bigramas), mas não é zero.
+
+    Contagens parciais (de blocos, campos, arquivos ou processos) se combinam
+    com `merge`; `names` guarda as palavras de cada chave.
+    """
+
+    def __init__(self, n=2):
+        self.n = n
+        self.keys = np.zeros(0, dtype=np.uint64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.names = {}
+
+    def add(self, keys, counts, words):
+        new = np.flatnonzero(~np.isin(keys, self.keys, assume_unique=True))
+        for i in new.tolist():
+            self.names[int(keys[i])] = words(i)
+        self._combine(keys, counts)
+
+    def _combine(self, keys, counts):
+        all_keys, inverse = np.unique(np.concatenate([self.keys, keys]), return_inverse=True)
+        self.counts = np.bincount(inverse.ravel(), weights=np.concatenate([self.counts, counts]),
+                                  minlength=len(all_keys)).astype(np.int64)
+        self.keys = all_keys
+
+    def merge(self, other):
+        self.names.update(other.names)
+        self._combine(other.keys, other.counts)
+        return self
+
+    def most_common(self, k=None):
+        order = np.argsort(-self.counts, kind="stable")[:k]
+        return [(self.names[int(key)], int(count)) for key, count in zip(self.keys[order], self.counts[order])]
+
+
+class HeavyHitters:
+    """Sketch Count-Min com os `k` n-gramas mais frequentes (memória fixa).
+
+    As contagens são superestimadas no máximo em ~e·N/width com probabilidade
+    1 - e^-depth. Sketches com os mesmos parâmetros se combinam com `merge`.
+    """
+
+    def __init__(self, n=2, k=TOP_K, width=SKETCH_WIDTH, depth=SKETCH_DEPTH, seed=42):
+        self.n = n
+        self.k = k
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.shift = np.uint64(64 - int(np.log2(width)))
+        rng = np.random.default_rng(seed)
+        self.multipliers = rng.integers(1, 2 ** 63, size=depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.candidates = {}
+
+    def buckets(self, keys):
+        return [(keys * a) >> self.shift for a in self.multipliers]
+
+    def estimate(self, keys):
+        return np.min([row[b] for row, b in zip(self.table, self.buckets(keys))], axis=0)
+
+    def add(self, keys, counts, words):
+        width = self.table.shape[1]
+        for row, b in zip(self.table, self.buckets(keys)):
+            row += np.bincount(b.astype(np.int64), weights=counts, minlength=width).astype(np.int64)
+        estimates = self.estimate(keys)
+        top = np.argsort(-estimates, kind="stable")[:self.k]
+        for i in top.tolist():
+            key = int(keys[i])
+            if key not in self.candidates:
+                self.candidates[key] = words(i)
+        self._prune()
+
+    def _prune(self):
+        keys = np.fromiter(self.candidates, dtype=np.uint64, count=len(self.candidates))
+        if len(keys) <= self.k:
+            return
+        keep = np.argsort(-self.estimate(keys), kind="stable")[:self.k]
+        self.candidates = {int(key): self.candidates[int(key)] for key in keys[keep]}
+
+    def merge(self, other):
+        if self.table.shape != other.table.shape or not np.array_equal(self.multipliers, other.multipliers):
+            raise ValueError("Só é possível combinar sketches com os mesmos parâmetros")
+        self.table += other.table
+        self.candidates.update(other.candidates)
+        self._prune()
+        return self
+
+    def most_common(self, k=None):
+        keys = np.fromiter(self.candidates, dtype=np.uint64, count=len(self.candidates))
+        estimates = self.estimate(keys) if len(keys) else np.zeros(0, dtype=np.int64)
+        order = np.argsort(-estimates, kind="stable")[:k]
+        return [(self.candidates[int(keys[i])], int(estimates[i])) for i in order]
+
+
+def make_counter(n=2, sketch=False, **sketch_params):
+    return HeavyHitters(n, **sketch_params) if sketch else NGramCounts(n)
+
+
+def count_ngrams(corpus, first, last, n=2, sketch=False, chunk=NGRAM_CHUNK, hashes=None, **sketch_params):
+    """Conta os n-gramas dos documentos `first:last` lendo o corpus em blocos.
+
+    `hashes` são os de `word_hashes(corpus.vocabulary)`, se já calculados.
+    """
+    counter = make_counter(n, sketch, **sketch_params)
+    if hashes is None:
+        hashes = word_hashes(corpus.vocabulary)
+    for start in range(first, last, chunk):
+        counter.add(*chunk_counts(corpus, start, min(last, start + chunk), hashes, n))
+    return counter
+
+
+def init_worker(directory):
+    global _worker_corpus, _worker_hashes
+    _worker_corpus = Corpus.load(directory)
+    _worker_hashes = np.load(os.path.join(directory, HASHES_FILE), mmap_mode="r")
+
+
+def count_range(first, last, n, sketch, sketch_params):
+    """Tarefa de um processo: conta um intervalo do corpus aberto em `init_worker`."""
+    return count_ngrams(_worker_corpus, first, last, n, sketch, hashes=_worker_hashes, **sketch_params)
+
+
+def field_ngrams(directory=CORPUS_DIR, n=2, sketch=False, chunk=NGRAM_CHUNK, max_workers=None, **sketch_params):
+    """Contagens de cada campo do corpus salvo, em paralelo por intervalos de documentos.
+
+    Retorna `{campo: contador}` e, em `None`, a soma de todos os campos. Os
+    hashes do vocabulário são calculados uma vez aqui e mapeados em memória
+    pelos processos, que abrem o corpus uma única vez cada.
+    """
+    corpus = Corpus.load(directory)
+    np.save(os.path.join(directory, HASHES_FILE), word_hashes(corpus.vocabulary))
+    tasks = [
+        (field, start, min(last, start + chunk))
+        for field, (first, last) in corpus.fields.items()
+        for start in range(first, last, chunk)
+    ]
+    results = {field: make_counter(n, sketch, **sketch_params) for field in corpus.fields}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker, initargs=(directory,)) as executor:
+        futures = [
+            (field, executor.submit(count_range, start, end, n, sketch, sketch_params))
+            for field, start, end in tasks
+        ]
+        for field, future in futures:
+            results[field].merge(future.result())
+
+    total = make_counter(n, sketch, **sketch_params)
+    for counter in results.values():
+        total.merge(counter)
+    results[None] = total
+    return results
+
+
+def save_ngrams(counter, filename, k=None):
+    """Grava no formato dos `bigrams_*.csv` (`Bigram,Frequência`), do mais frequente ao menos."""
+    with open(filename, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Bigram", "Frequência"])
+        for words, count in counter.most_common(k):
+            writer.writerow([str(words), count])
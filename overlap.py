@@ -0,0 +1,138 @@
+import json
+
+import numpy as np
+import scipy.sparse as sp
+
+from graph import build_bipartite
+
+METRICS = ("count", "jaccard", "cosine")
+
+# Pares de artistas com os seguidores em comum (o `common_followers.json`
+# versionado é o resultado original e não é sobrescrito)
+OVERLAP_FILE = "common_followers_allTime.json"
+
+
+class AudienceOverlap:
+    """Sobreposição de público entre todos os pares de artistas.
+
+    A matriz de co-seguidores é calculada de uma vez como `B @ B.T`, onde `B` é a
+    incidência dirigida artistas × seguidores (`graph.incidence()`): quem o
+    artista segue não conta como seu público. Só os pares com algum
+    seguidor em comum ocupam memória; as listas de ids compartilhados são
+    montadas apenas quando pedidas.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.artist_nodes = graph.artist_nodes()
+        self.artist_ids = [graph.ids[i] for i in self.artist_nodes]
+        self.position = {artist_id: k for k, artist_id in enumerate(self.artist_ids)}
+
+        incidence = graph.incidence().astype(np.float32)
+        incidence.data[:] = 1
+        self.incidence = incidence
+        self.sizes = np.diff(incidence.indptr).astype(np.float64)
+
+        co = (incidence @ incidence.T).tocsr()
+        co.setdiag(0)
+        co.eliminate_zeros()
+        self.co_followers = co
+
+    @classmethod
+    def from_followers(cls, artists, followers):
+        """Monta a partir dos dados retornados por `load_data()`."""
+        return cls(build_bipartite(artists, followers))
+
+    def counts(self):
+        """Matriz esparsa artista × artista com o número de seguidores em comum."""
+        return self.co_followers
+
+    def similarity(self, metric="jaccard"):
+        """Matriz esparsa de similaridade (`count`, `jaccard` ou `cosine`)."""
+        if metric not in METRICS:
+            raise ValueError(f"Métrica desconhecida: {metric}")
+        co = self.co_followers.tocoo()
+        if metric == "count":
+            values = co.data.astype(np.float64)
+        elif metric == "jaccard":
+            values = co.data / (self.sizes[co.row] + self.sizes[co.col] - co.data)
+        else:
+            values = co.data / np.sqrt(self.sizes[co.row] * self.sizes[co.col])
+        return sp.csr_matrix((values, (co.row, co.col)), shape=co.shape)
+
+    def top_k(self, artist_id, k=10, metric="jaccard"):
+        """Os `k` artistas mais parecidos com `artist_id`, como `[(artist_id, valor), ...]`."""
+        return self.top_k_all(k, metric, [artist_id])[artist_id]
+
+    def top_k_all(self, k=10, metric="jaccard", artist_ids=None):
+        """`{artist_id: [(artist_id, valor), ...]}` para todos (ou alguns) artistas."""
+        similarity = self.similarity(metric)
+        if artist_ids is None:
+            artist_ids = self.artist_ids
+        result = {}
+        for artist_id in artist_ids:
+            row = self.position[artist_id]
+            start, end = similarity.indptr[row], similarity.indptr[row + 1]
+            cols = similarity.indices[start:end]
+            values = similarity.data[start:end]
+            if len(values) > k:
+                best = np.argpartition(-values, k)[:k]
+                cols, values = cols[best], values[best]
+            order = np.argsort(-values, kind="stable")
+            result[artist_id] = [(self.artist_ids[c], float(v)) for c, v in zip(cols[order], values[order])]
+        return result
+
+    def shared_followers(self, artist_a, artist_b):
+        """Ids dos seguidores em comum entre dois artistas."""
+        rows = self.incidence
+        a, b = self.position[artist_a], self.position[artist_b]
+        common = np.intersect1d(
+            rows.indices[rows.indptr[a]:rows.indptr[a + 1]],
+            rows.indices[rows.indptr[b]:rows.indptr[b + 1]],
+            assume_unique=True,
+        )
+        return [self.graph.ids[i] for i in common]
+
+    def export_common_followers(self, filename, min_shared=1, labels=None):
+        """Grava os pares no formato de `common_followers.json` ("A x B": [ids]).
+
+        O arquivo é escrito par a par, sem montar o dicionário inteiro em memória.
+        `labels` substitui os ids dos artistas nas chaves (ex.: "Nome (Gênero)").
+        """
+        labels = labels or {}
+        upper = sp.triu(self.co_followers, k=1).tocoo()
+        keep = upper.data >= min_shared
+        with open(filename, "w", encoding="utf-8") as file:
+            file.write("{")
+            first = True
+            for a, b in zip(upper.row[keep].tolist(), upper.col[keep].tolist()):
+                artist_a, artist_b = self.artist_ids[a], self.artist_ids[b]
+                key = f"{labels.get(artist_a, artist_a)} x {labels.get(artist_b, artist_b)}"
+                file.write("" if first else ",")
+                file.write(f"\n    {json.dumps(key, ensure_ascii=False)}: ")
+                file.write(json.dumps(self.shared_followers(artist_a, artist_b)))
+                first = False
+            file.write("\n}\n")
+        print(f"Pares de artistas com seguidores em comum salvos em '{filename}'")
+
+
+def main():
+    from columnar import load_tracks
+    from graph import BipartiteGraph
+    from ingest import TRACK_FIELDS
+
+    # Snapshot salvo por network.build_stage (mapeado em memória; ver graph.py)
+    graph = BipartiteGraph.load()
+    tracks = load_tracks("trending_tracks_allTime.json", TRACK_FIELDS)
+    overlap = AudienceOverlap(graph)
+    print(f"Pares de artistas com seguidores em comum: {overlap.co_followers.nnz // 2}")
+
+    names = {track["user"]["id"]: track["user"]["name"] for track in tracks}
+    for artist_id, similar in list(overlap.top_k_all(k=5).items())[:10]:
+        print(f"{names.get(artist_id, artist_id)}: " + ", ".join(f"{names.get(a, a)} ({v:.2f})" for a, v in similar))
+
+    overlap.export_common_followers(OVERLAP_FILE)
+
+
+if __name__ == "__main__":
+    main()
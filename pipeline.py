@@ -0,0 +1,246 @@
+import argparse
+import ast
+import hashlib
+import importlib
+import json
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from metrics import stage_metrics
+
+# Hashes das entradas da última execução bem-sucedida de cada etapa
+STATE_FILE = "pipeline_state.json"
+
+# Etapa: função `módulo:função` com os arquivos/diretórios que lê e que grava
+Stage = namedtuple("Stage", ["name", "target", "inputs", "outputs"])
+
+ALLTIME = ["trending_artists_allTime.json", "followers_allTime.json", "trending_tracks_allTime.json"]
+TRACKS = "trending_tracks.json"
+# Scripts do allTime: leem o snapshot do grafo (etapa graph) e as faixas, não os seguidores
+GRAPH_INPUTS = ["graph_allTime", "trending_tracks_allTime.json"]
+CORPUS = "corpus_month"
+LABELS = ("Títulos", "Descrições", "Tags", "Todos")
+# Bigramas de text_analysis.py (BIGRAMS_FILE), gravados ao lado dos `bigrams_*.csv` originais
+BIGRAM_FILES = [f"bigramas_{label}.csv" for label in LABELS]
+# Figuras de text_analysis.py (gravadas com savefig; o pipeline roda sem interface gráfica)
+LENGTH_FIGURES = [f"distribuicao_tamanho_{label}.png" for label in LABELS[:3]]
+SENTIMENT_FIGURES = [f"distribuicao_sentimento_{label}.png" for label in LABELS]
+WORDCLOUD_FIGURES = [f"nuvem_palavras_{label}.png" for label in LABELS]
+TOPIC_MODELS = [f"topics_{name}_model" for name in ("titles", "descriptions", "tags", "all")]
+
+# Coordenadas do layout (layout.cached_layout): gravadas pela etapa statistics e
+# só lidas pela communities, que por isso roda depois dela e não em paralelo
+POSITIONS = "layout_positions.npz"
+
+# Etapas sem entradas (fontes): a coleta depende da API, não de arquivos, então
+# o hash nunca muda. Só rodam com `--force` ou quando falta alguma saída
+SOURCES = {"collect"}
+
+# Os arquivos allTime não têm etapa de coleta própria: script_artists.py grava
+# artistas e seguidores com os nomes do mês (renomeados à mão) e as faixas já
+# em trending_tracks_allTime.json, então entram como fontes
+STAGES = [
+    Stage("collect", "script:main", [], [TRACKS, "trending_artists.json", "followers.json"]),
+    Stage("graph", "network:build_stage", ALLTIME, ["graph_allTime"]),
+    Stage("statistics", "network:statistics_stage", GRAPH_INPUTS,
+          ["graph_data.csv", "graph_stats_allTime.json", "distribuicao_graus_allTime.png", "grafo_artistas.png",
+           POSITIONS]),
+    Stage("communities", "comunidades:main", GRAPH_INPUTS + [POSITIONS],
+          ["network_communities.csv", "network_communities_runs.csv", "comunidadeslouvin.png"]),
+    Stage("overlap", "overlap:main", GRAPH_INPUTS, ["common_followers_allTime.json"]),
+    Stage("export", "gephi:main", GRAPH_INPUTS + ["network_communities.csv"], ["network_graph.gexf"]),
+    Stage("corpus", "text_analysis:corpus_stage", [TRACKS], [CORPUS]),
+    Stage("text_statistics", "text_analysis:statistics_stage", [CORPUS], LENGTH_FIGURES),
+    Stage("topics", "text_analysis:topics_stage", [CORPUS], TOPIC_MODELS),
+    Stage("reduction", "text_analysis:reduction_stage", [CORPUS], ["reducao_tsne.png"]),
+    Stage("bigrams", "text_analysis:bigrams_stage", [CORPUS], BIGRAM_FILES),
+    Stage("sentiment", "text_analysis:sentiment_stage", [CORPUS], ["sentiment_scores.csv.gz"] + SENTIMENT_FIGURES),
+    Stage("wordcloud", "text_analysis:wordcloud_stage", [CORPUS], WORDCLOUD_FIGURES),
+]
+
+
+def path_hash(path, digest):
+    """Acrescenta ao `digest` o conteúdo de um arquivo ou de todos os arquivos de um diretório."""
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                full = os.path.join(root, name)
+                digest.update(os.path.relpath(full, path).encode("utf-8"))
+                path_hash(full, digest)
+    elif os.path.exists(path):
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+    else:
+        digest.update(b"\0missing")
+
+
+def local_modules(module, found=None):
+    """Módulos do projeto (arquivos `.py` no diretório atual) que `module` importa,
+    direta ou indiretamente, incluindo ele mesmo e importações dentro de funções."""
+    found = set() if found is None else found
+    path = module + ".py"
+    if module in found or not os.path.exists(path):
+        return found
+    found.add(module)
+    with open(path, "r", encoding="utf-8") as file:
+        tree = ast.parse(file.read(), path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            local_modules(name.split(".")[0], found)
+    return found
+
+
+def stage_hash(stage):
+    """Hash das entradas da etapa e do código que ela executa (o módulo e os
+    módulos do projeto que ele importa, como `graph_stats` ou `corpus`)."""
+    digest = hashlib.sha1(stage.target.encode("utf-8"))
+    module = stage.target.split(":")[0]
+    code = [name + ".py" for name in sorted(local_modules(module))]
+    for path in code + list(stage.inputs):
+        digest.update(path.encode("utf-8"))
+        path_hash(path, digest)
+    return digest.hexdigest()
+
+
+def run_stage(name, target, profile=None):
+    """Executa `módulo:função` (no processo de trabalho; as importações pesadas acontecem aqui).
+
+    Tempo, CPU, memória e requisições da etapa vão para `metrics/` (ver `metrics.py`);
+    `profile` (`cprofile`/`sampling`) liga o profiler nesta etapa.
+    """
+    module, function = target.split(":")
+    with stage_metrics(name, profile):
+        getattr(importlib.import_module(module), function)()
+
+
+def load_state(filename=STATE_FILE):
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, "r") as file:
+        return json.load(file)
+
+
+def save_state(state, filename=STATE_FILE):
+    temp = filename + ".tmp"
+    with open(temp, "w") as file:
+        json.dump(state, file, indent=2)
+    os.replace(temp, filename)
+
+
+def dependencies(stages):
+    """Etapas de que cada etapa depende (as que gravam alguma das suas entradas)."""
+    producers = {output: stage.name for stage in stages for output in stage.outputs}
+    return {
+        stage.name: {producers[path] for path in stage.inputs if path in producers}
+        for stage in stages
+    }
+
+
+def select(stages, targets):
+    """As etapas pedidas e todas as que vêm antes delas."""
+    if not targets:
+        return stages
+    by_name = {stage.name: stage for stage in stages}
+    unknown = set(targets) - set(by_name)
+    if unknown:
+        raise ValueError(f"Etapas desconhecidas: {', '.join(sorted(unknown))}")
+    deps = dependencies(stages)
+    wanted = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(deps[name])
+    return [stage for stage in stages if stage.name in wanted]
+
+
+def run_pipeline(stages=STAGES, targets=None, force=(), max_workers=None, state_file=STATE_FILE, profile=None):
+    """Roda as etapas em ordem de dependência, em paralelo quando independentes.
+
+    Uma etapa é pulada quando o hash das suas entradas (e do seu código) é o da
+    última execução bem-sucedida e todas as suas saídas existem; as de `SOURCES`
+    (a coleta) não têm entradas e só rodam quando falta alguma saída. `force` lista
+    etapas a rodar de qualquer forma (é assim que se coleta de novo) e `profile`, `{etapa: "cprofile" | "sampling"}`,
+    as etapas a perfilar. Retorna `{etapa: "run" | "skipped" | "failed" | "blocked"}`.
+    """
+    stages = select(stages, targets)
+    deps = dependencies(stages)
+    state = load_state(state_file)
+    status = {}
+    running = {}
+    # Sem interface gráfica nos processos de trabalho: plt.show() não bloqueia
+    os.environ.setdefault("MPLBACKEND", "Agg")
+
+    # Um processo novo por etapa: a memória medida não inclui a deixada por
+    # etapas anteriores no mesmo processo (max_tasks_per_child existe desde o 3.11)
+    options = {"max_tasks_per_child": 1} if sys.version_info >= (3, 11) else {}
+    with ProcessPoolExecutor(max_workers=max_workers, **options) as executor:
+        while len(status) < len(stages):
+            finished = len(status)
+            for stage in stages:
+                if stage.name in status or stage.name in running.values():
+                    continue
+                if any(status.get(dep) in ("failed", "blocked") for dep in deps[stage.name]):
+                    status[stage.name] = "blocked"
+                    print(f"⏭️  {stage.name}: bloqueada por falha em etapa anterior")
+                    continue
+                if not all(status.get(dep) in ("run", "skipped") for dep in deps[stage.name]):
+                    continue
+                complete = all(os.path.exists(p) for p in stage.outputs)
+                if stage.name in SOURCES and complete and stage.name not in force:
+                    status[stage.name] = "skipped"
+                    print(f"✔️  {stage.name}: dados já coletados (--force {stage.name} para coletar de novo)")
+                    continue
+                digest = stage_hash(stage)
+                unchanged = state.get(stage.name) == digest and complete
+                if unchanged and stage.name not in force:
+                    status[stage.name] = "skipped"
+                    print(f"✔️  {stage.name}: sem mudanças")
+                    continue
+                print(f"▶️  {stage.name}")
+                task = executor.submit(run_stage, stage.name, stage.target, (profile or {}).get(stage.name))
+                running[task] = stage.name
+
+            if not running:
+                if len(status) == finished:
+                    raise RuntimeError("Dependência circular entre as etapas")
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                stage = next(stage for stage in stages if stage.name == name)
+                try:
+                    future.result()
+                except Exception as error:
+                    status[name] = "failed"
+                    print(f"❌ {name}: {error}")
+                    continue
+                status[name] = "run"
+                state[name] = stage_hash(stage)
+                save_state(state, state_file)
+                print(f"✅ {name}")
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Roda as etapas da análise, pulando as que não mudaram.")
+    parser.add_argument("stages", nargs="*", help="etapas a rodar (com as anteriores); padrão: todas")
+    parser.add_argument("--force", nargs="*", default=[], help="etapas a rodar mesmo sem mudanças (collect: coletar de novo)")
+    parser.add_argument("--workers", type=int, default=None, help="processos em paralelo")
+    parser.add_argument("--profile", nargs="*", default=[], help="etapas a perfilar (resultado em metrics/)")
+    parser.add_argument("--profiler", choices=["cprofile", "sampling"], default="cprofile",
+                        help="cProfile ou amostragem com pyinstrument")
+    args = parser.parse_args()
+    run_pipeline(targets=args.stages, force=set(args.force), max_workers=args.workers,
+                 profile={name: args.profiler for name in args.profile})
@@ -0,0 +1,93 @@
+import numpy as np
+import scipy.sparse as sp
+
+# Dimensão intermediária (SVD truncada) antes da projeção em 2D
+SVD_COMPONENTS = 50
+
+# Documentos processados por bloco e documentos sorteados para ajustar a SVD
+CHUNK_DOCS = 20_000
+SVD_SAMPLE = 50_000
+
+
+def count_rows(corpus, docs):
+    """Matriz esparsa documento × palavra (contagens) dos documentos `docs` do corpus."""
+    starts = corpus.offsets[docs]
+    lengths = corpus.offsets[docs + 1] - starts
+    indptr = np.concatenate([[0], np.cumsum(lengths)])
+    positions = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])
+    counts = sp.csr_matrix(
+        (np.ones(len(positions), dtype=np.float64), corpus.tokens[positions], indptr),
+        shape=(len(docs), len(corpus.vocabulary)),
+    )
+    counts.sum_duplicates()
+    return counts
+
+
+def inverse_document_frequency(corpus, docs, chunk=CHUNK_DOCS):
+    """IDF suavizado (como no `TfidfVectorizer`), contando as frequências por bloco."""
+    df = np.zeros(len(corpus.vocabulary))
+    for start in range(0, len(docs), chunk):
+        df += np.bincount(count_rows(corpus, docs[start:start + chunk]).indices, minlength=len(df))
+    return np.log((1 + len(docs)) / (1 + df)) + 1
+
+
+def tfidf_rows(corpus, docs, idf):
+    """TF-IDF esparso com normalização L2 por linha (padrão do `TfidfVectorizer`)."""
+    X = count_rows(corpus, docs) @ sp.diags(idf)
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    return sp.diags(np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)) @ X
+
+
+def svd_projection(corpus, field=None, n_components=SVD_COMPONENTS, sample=SVD_SAMPLE,
+                   chunk=CHUNK_DOCS, seed=42):
+    """TF-IDF → SVD truncada sem densificar a matriz e sem montá-la inteira.
+
+    A SVD é ajustada numa amostra de até `sample` documentos e aplicada bloco a
+    bloco; a memória fica limitada pelo bloco e pelo resultado `n × n_components`.
+    """
+    from sklearn.decomposition import TruncatedSVD
+
+    first, last = corpus.document_range(field)
+    docs = np.arange(first, last)
+    idf = inverse_document_frequency(corpus, docs, chunk)
+
+    rng = np.random.default_rng(seed)
+    fit_docs = np.sort(rng.choice(docs, size=min(sample, len(docs)), replace=False))
+    n_components = max(1, min(n_components, len(corpus.vocabulary) - 1, len(fit_docs) - 1))
+    svd = TruncatedSVD(n_components=n_components, random_state=seed)
+    svd.fit(tfidf_rows(corpus, fit_docs, idf))
+
+    reduced = np.empty((len(docs), n_components), dtype=np.float32)
+    for start in range(0, len(docs), chunk):
+        block = docs[start:start + chunk]
+        reduced[start:start + len(block)] = svd.transform(tfidf_rows(corpus, block, idf))
+    return reduced
+
+
+def embed_2d(X, method="tsne", perplexity=30, seed=42):
+    """Projeção 2D com vizinhos aproximados.
+
+    `tsne` usa o openTSNE (vizinhos pelo Annoy e gradiente por FFT, O(n)) quando
+    instalado, ou o t-SNE Barnes–Hut do scikit-learn; `umap` usa o umap-learn.
+    """
+    perplexity = min(perplexity, max(1.0, (len(X) - 1) / 3))
+    if method == "umap":
+        import umap
+
+        return umap.UMAP(n_components=2, random_state=seed, low_memory=True).fit_transform(X)
+    try:
+        from openTSNE import TSNE
+    except ImportError:
+        from sklearn.manifold import TSNE
+
+        return TSNE(n_components=2, perplexity=perplexity, method="barnes_hut", random_state=seed).fit_transform(X)
+    embedding = TSNE(
+        n_components=2, perplexity=perplexity, neighbors="annoy",
+        negative_gradient_method="fft", random_state=seed, n_jobs=-1,
+    ).fit(X)
+    return np.asarray(embedding)
+
+
+def reduce_corpus(corpus, field=None, method="tsne", n_components=SVD_COMPONENTS, seed=42):
+    """Coordenadas 2D de cada documento do campo (TF-IDF esparso → SVD → t-SNE/UMAP)."""
+    return embed_2d(svd_projection(corpus, field, n_components, seed=seed), method, seed=seed)
@@ -1,79 +1,30 @@
-import requests
-import json
-import os
-
-# Define o nome do aplicativo para as requisições
-APP_NAME = "MARS_STUDY"
-
-# Lista de URLs da API
-BASE_URLS = [
-    "https://discoveryprovider.audius.co",
-    "https://audius-discovery-5.cultur3stake.com",
-    "https://blockdaemon-audius-discovery-03.bdnodes.net"
-]
-
-
-def fetch_data(url, params=None):
-    """Realiza uma requisição GET e retorna os dados se a resposta for bem-sucedida."""
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        return response.json().get("data", [])
-    except requests.RequestException as e:
-        print(f"Erro ao conectar com {url}: {e}")
-        return []
-
-
-def get_trending_tracks(time="month", limit=100):
-    """Obtém as faixas em alta e retorna uma lista com um limite máximo de resultados."""
-    for base_url in BASE_URLS:
-        url = f"{base_url}/v1/tracks/trending"
-        params = {"time": time, "app_name": APP_NAME}
-        tracks = fetch_data(url, params)
-        if tracks:
-            print(f"Trending tracks obtidas com sucesso de: {base_url}")
-            return tracks[:limit]
-    print("Não foi possível obter dados de nenhum endpoint.")
-    return []
-
-
-def get_artist_ids_from_tracks(tracks):
-    """Extrai os IDs únicos dos artistas a partir das faixas."""
-    return list({track.get("user", {}).get("id") for track in tracks if track.get("user")})
-
-
-def get_followers(artist_id, limit=50):
-    """Obtém seguidores de um artista específico."""
-    for base_url in BASE_URLS:
-        url = f"{base_url}/v1/users/{artist_id}/followers"
-        params = {"limit": limit, "app_name": APP_NAME}
-        followers = fetch_data(url, params)
-        if followers:
-            print(f"Followers obtidos para o artista {artist_id}.")
-            return followers
-    return []
-
-
-def save_to_file(data, filename):
-    """Salva os dados em um arquivo JSON."""
-    with open(filename, "w") as file:
-        json.dump(data, file, indent=4)
-    print(f"Dados salvos em '{filename}'")
-
-
-def load_from_file(filename):
-    """Carrega dados de um arquivo JSON se ele existir."""
-    if os.path.exists(filename):
-        with open(filename, "r") as file:
-            return json.load(file)
-    return None
-
-
-def main():
-    """Fluxo principal de execução."""
+from audius_api import (
+    APP_NAME,
+    get_artist_ids_from_tracks,
+    get_followers,
+    get_trending_tracks,
+    load_from_file,
+    node_pool,
+    save_to_file,
+)
+from columnar import file_hash, file_stamp, save_tracks_columnar
+from crawler import crawl_all_followers, crawl_followers
+from metrics import stage_metrics
+from snapshots import record_snapshot
+
+
+def main(concurrent=True, paginate=False, max_followers=None):
+    """Fluxo principal de execução.
+
+    Com `concurrent=True` os seguidores são obtidos em paralelo (ver `crawler.py`).
+    Com `paginate=True` a lista completa de seguidores é percorrida (até
+    `max_followers` por artista), com checkpoint em `followers_pages.jsonl`.
+    """
     tracks_file = "trending_tracks.json"
     artists_file = "trending_artists.json"
     followers_file = "followers.json"
+    # Cópia colunar das faixas, lida por coluna sem carregar o JSON inteiro (ver `columnar.py`)
+    tracks_columns = "trending_tracks_columns"
 
     # Obtém e salva as trending tracks
     tracks = load_from_file(tracks_file)
@@ -81,6 +32,7 @@ def main():
         print("Arquivo de trending tracks não encontrado. Obtendo dados...")
         tracks = get_trending_tracks()
         save_to_file(tracks, tracks_file)
+        save_tracks_columnar(tracks, tracks_columns, source=file_hash(tracks_file), stamp=file_stamp(tracks_file))
     else:
         print("Trending tracks carregadas do arquivo.")
 
@@ -97,17 +49,26 @@ def main():
     followers_data = load_from_file(followers_file)
     if followers_data is None:
         print("Arquivo de seguidores não encontrado. Obtendo seguidores dos artistas...")
-        followers_data = {}
-        for artist_id in artist_ids:
-            followers = get_followers(artist_id, limit=50)
-            if followers:
-                followers_data[artist_id] = followers
-            else:
-                print(f"Nenhum seguidor encontrado para o artista {artist_id}.")
+        if paginate:
+            followers_data = crawl_all_followers(artist_ids, node_pool(), APP_NAME, max_followers=max_followers)
+        elif concurrent:
+            followers_data = crawl_followers(artist_ids, node_pool(), APP_NAME, limit=50)
+        else:
+            followers_data = {}
+            for artist_id in artist_ids:
+                followers = get_followers(artist_id, limit=50)
+                if followers:
+                    followers_data[artist_id] = followers
+                else:
+                    print(f"Nenhum seguidor encontrado para o artista {artist_id}.")
         save_to_file(followers_data, followers_file)
     else:
         print("Dados de seguidores carregados do arquivo.")
 
+    # Acrescenta a coleta ao histórico (a mesma coleta não é gravada duas vezes; ver snapshots.py)
+    record_snapshot(tracks, followers_data, time_range="month")
+
 
 if __name__ == "__main__":
-    main()
+    with stage_metrics("collect"):
+        main()
@@ -0,0 +1,77 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Tabela com as pontuações por faixa e campo
+SENTIMENT_FILE = "sentiment_scores.csv.gz"
+
+# Textos pontuados por tarefa enviada aos processos
+SENTIMENT_CHUNK = 2000
+
+SCORE_COLUMNS = ["compound", "pos", "neg", "neu"]
+
+# Analisador do processo de trabalho, criado uma única vez em `init_worker`
+_worker_analyzer = None
+
+
+def init_worker():
+    global _worker_analyzer
+    from nltk.sentiment import SentimentIntensityAnalyzer
+
+    _worker_analyzer = SentimentIntensityAnalyzer()
+
+
+def score_chunk(texts):
+    """Pontuações VADER (`compound`, `pos`, `neg`, `neu`) de cada texto do bloco."""
+    scores = np.empty((len(texts), len(SCORE_COLUMNS)))
+    for i, text in enumerate(texts):
+        polarity = _worker_analyzer.polarity_scores(text)
+        scores[i] = [polarity[column] for column in SCORE_COLUMNS]
+    return scores
+
+
+def score_documents(texts, chunk=SENTIMENT_CHUNK, max_workers=None):
+    """Pontua cada texto distinto uma única vez, em blocos distribuídos entre processos."""
+    unique, inverse = np.unique(np.asarray(texts, dtype=object), return_inverse=True)
+    unique = unique.tolist()
+    chunks = [unique[start:start + chunk] for start in range(0, len(unique), chunk)]
+    print(f"Sentimento: {len(unique)} textos distintos de {len(texts)}")
+    if not chunks:
+        return np.zeros((0, len(SCORE_COLUMNS)))
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker) as executor:
+        scores = np.concatenate(list(executor.map(score_chunk, chunks)))
+    return scores[inverse.ravel()]
+
+
+def sentiment_table(corpus, filename=SENTIMENT_FILE, max_workers=None):
+    """Tabela `track_id, field, compound, pos, neg, neu` de todos os documentos do corpus.
+
+    Fica salva em `filename` (com o hash do arquivo de faixas ao lado) e só é
+    recalculada quando o corpus muda.
+    """
+    meta_file = filename + ".json"
+    if os.path.exists(filename) and os.path.exists(meta_file):
+        with open(meta_file, "r") as file:
+            if json.load(file)["source"] == corpus.source:
+                print(f"Pontuações de sentimento carregadas de '{filename}'")
+                return pd.read_csv(filename, dtype={"track_id": str})
+
+    track_ids, fields = corpus.document_fields()
+    scores = score_documents(corpus.texts(), max_workers=max_workers)
+    table = pd.DataFrame(scores, columns=SCORE_COLUMNS)
+    table.insert(0, "field", fields)
+    table.insert(0, "track_id", track_ids)
+    table.to_csv(filename, index=False, float_format="%.4f")
+    with open(meta_file, "w") as file:
+        json.dump({"source": corpus.source}, file)
+    print(f"Pontuações de sentimento salvas em '{filename}'")
+    return table
+
+
+def field_scores(table, field=None, column="compound"):
+    """Pontuações de um campo (ou de todos, com `None`)."""
+    rows = table if field is None else table[table["field"] == field]
+    return rows[column].to_numpy()
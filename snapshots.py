@@ -0,0 +1,390 @@
+import hashlib
+import json
+import os
+import sqlite3
+from collections import Counter
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from graph import build_bipartite
+from overlap import AudienceOverlap
+
+# Histórico das coletas (só recebe acréscimos; nada é sobrescrito)
+SNAPSHOT_DB = "snapshots.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    snapshot INTEGER PRIMARY KEY,
+    time_range TEXT NOT NULL,
+    collected_at TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    num_tracks INTEGER NOT NULL,
+    UNIQUE (time_range, digest)
+);
+CREATE INDEX IF NOT EXISTS snapshots_time ON snapshots (time_range, collected_at);
+CREATE TABLE IF NOT EXISTS artists (
+    artist INTEGER PRIMARY KEY,
+    id TEXT UNIQUE NOT NULL,
+    name TEXT,
+    handle TEXT
+);
+CREATE TABLE IF NOT EXISTS tracks (
+    track INTEGER PRIMARY KEY,
+    id TEXT UNIQUE NOT NULL,
+    title TEXT,
+    genre TEXT,
+    artist INTEGER REFERENCES artists (artist)
+);
+CREATE TABLE IF NOT EXISTS users (
+    user INTEGER PRIMARY KEY,
+    id TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS track_ranks (
+    track INTEGER NOT NULL,
+    snapshot INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    play_count INTEGER,
+    repost_count INTEGER,
+    favorite_count INTEGER,
+    PRIMARY KEY (track, snapshot)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS track_ranks_snapshot ON track_ranks (snapshot, rank);
+CREATE TABLE IF NOT EXISTS artist_stats (
+    artist INTEGER NOT NULL,
+    snapshot INTEGER NOT NULL,
+    follower_count INTEGER,
+    collected_followers INTEGER,
+    best_rank INTEGER,
+    trending_tracks INTEGER NOT NULL,
+    PRIMARY KEY (artist, snapshot)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS artist_stats_snapshot ON artist_stats (snapshot);
+CREATE TABLE IF NOT EXISTS genre_counts (
+    snapshot INTEGER NOT NULL,
+    genre TEXT NOT NULL,
+    tracks INTEGER NOT NULL,
+    PRIMARY KEY (snapshot, genre)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS follows (
+    snapshot INTEGER NOT NULL,
+    artist INTEGER NOT NULL,
+    user INTEGER NOT NULL,
+    PRIMARY KEY (snapshot, artist, user)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS overlap (
+    artist INTEGER NOT NULL,
+    snapshot INTEGER NOT NULL,
+    other INTEGER NOT NULL,
+    common INTEGER NOT NULL,
+    jaccard REAL NOT NULL,
+    PRIMARY KEY (artist, snapshot, other)
+) WITHOUT ROWID;
+"""
+
+
+def timestamp(value=None):
+    """Data em ISO 8601 (UTC, até o segundo), que ordena como texto; aceita
+    `datetime`, texto ISO ou segundos desde a época."""
+    if value is None:
+        value = datetime.now(timezone.utc)
+    elif isinstance(value, (int, float)):
+        value = datetime.fromtimestamp(value, timezone.utc)
+    elif isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def content_digest(tracks, followers):
+    digest = hashlib.sha1(json.dumps(tracks, sort_keys=True).encode("utf-8"))
+    digest.update(json.dumps(followers, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SnapshotStore:
+    """Histórico das faixas em alta, artistas e seguidores em SQLite indexado.
+
+    Cada coleta vira um snapshot (`add_snapshot`) com a posição e contagens de
+    cada faixa, números de cada artista, as arestas artista-seguidor e a
+    sobreposição de público entre pares de artistas já calculada. As consultas
+    (séries por faixa e artista, maiores variações, participação por gênero e
+    crescimento da sobreposição) usam os índices e não releem os JSON.
+    """
+
+    def __init__(self, filename=SNAPSHOT_DB):
+        self.db = sqlite3.connect(filename)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def intern(self, table, key, node_id, **columns):
+        """Nó inteiro de um id na tabela de dimensão, atualizando os demais campos."""
+        names = ["id"] + list(columns)
+        updates = ", ".join(f"{name} = coalesce(excluded.{name}, {name})" for name in columns) or "id = id"
+        self.db.execute(
+            f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+            f"ON CONFLICT (id) DO UPDATE SET {updates}",
+            [node_id] + list(columns.values()),
+        )
+        return self.db.execute(f"SELECT {key} FROM {table} WHERE id = ?", (node_id,)).fetchone()[0]
+
+    def add_snapshot(self, tracks=None, followers=None, time_range="month", collected_at=None):
+        """Grava uma coleta e retorna o número do snapshot.
+
+        `tracks` é a lista de `trending_tracks*.json` (na ordem do ranking) e
+        `followers` o `{artist_id: [seguidores]}` de `followers*.json`; qualquer
+        um pode faltar. Uma coleta idêntica a uma já gravada não é repetida.
+        """
+        tracks = tracks or []
+        followers = followers or {}
+        digest = content_digest(tracks, followers)
+        found = self.db.execute(
+            "SELECT snapshot FROM snapshots WHERE time_range = ? AND digest = ?", (time_range, digest)
+        ).fetchone()
+        if found:
+            return found[0]
+
+        with self.db:
+            snapshot = self.db.execute(
+                "INSERT INTO snapshots (time_range, collected_at, digest, num_tracks) VALUES (?, ?, ?, ?)",
+                (time_range, timestamp(collected_at), digest, len(tracks)),
+            ).lastrowid
+
+            stats = {}
+            ranks = []
+            for rank, track in enumerate(tracks, start=1):
+                user = track.get("user") or {}
+                artist = None
+                if user.get("id"):
+                    artist = self.intern("artists", "artist", user["id"], name=user.get("name"), handle=user.get("handle"))
+                    entry = stats.setdefault(artist, {"follower_count": user.get("follower_count"),
+                                                      "best_rank": rank, "trending_tracks": 0})
+                    entry["trending_tracks"] += 1
+                track_node = self.intern("tracks", "track", track["id"], title=track.get("title"),
+                                         genre=track.get("genre"), artist=artist)
+                ranks.append((track_node, snapshot, rank, track.get("play_count"),
+                               track.get("repost_count"), track.get("favorite_count")))
+            self.db.executemany("INSERT OR IGNORE INTO track_ranks VALUES (?, ?, ?, ?, ?, ?)", ranks)
+            genres = Counter(track.get("genre") or "" for track in tracks)
+            self.db.executemany("INSERT INTO genre_counts VALUES (?, ?, ?)",
+                                [(snapshot, genre, n) for genre, n in genres.items()])
+
+            edges = []
+            for artist_id, followers_list in followers.items():
+                artist = self.intern("artists", "artist", artist_id)
+                stats.setdefault(artist, {"follower_count": None, "best_rank": None, "trending_tracks": 0})
+                stats[artist]["collected_followers"] = len(followers_list)
+                for follower in followers_list:
+                    follower_id = follower.get("id") if isinstance(follower, dict) else follower
+                    edges.append((snapshot, artist, self.intern("users", "user", follower_id)))
+            self.db.executemany("INSERT OR IGNORE INTO follows VALUES (?, ?, ?)", edges)
+            self.db.executemany(
+                "INSERT INTO artist_stats VALUES (?, ?, ?, ?, ?, ?)",
+                [(artist, snapshot, s["follower_count"], s.get("collected_followers"), s["best_rank"],
+                  s["trending_tracks"]) for artist, s in stats.items()],
+            )
+            if followers:
+                self.add_overlap(snapshot, followers)
+        return snapshot
+
+    def add_overlap(self, snapshot, followers):
+        """Seguidores em comum e Jaccard de cada par de artistas (nos dois sentidos)."""
+        overlap = AudienceOverlap(build_bipartite(list(followers), followers))
+        nodes = [self.intern("artists", "artist", artist_id) for artist_id in overlap.artist_ids]
+        co = overlap.co_followers.tocoo()
+        sizes = overlap.sizes
+        jaccard = co.data / (sizes[co.row] + sizes[co.col] - co.data)
+        self.db.executemany(
+            "INSERT INTO overlap VALUES (?, ?, ?, ?, ?)",
+            [(nodes[a], snapshot, nodes[b], int(c), float(j))
+             for a, b, c, j in zip(co.row.tolist(), co.col.tolist(), co.data.tolist(), jaccard.tolist())],
+        )
+
+    def query(self, sql, params=()):
+        return pd.read_sql_query(sql, self.db, params=params)
+
+    def snapshots(self, time_range="month"):
+        return self.query(
+            "SELECT snapshot, collected_at FROM snapshots WHERE time_range = ? ORDER BY collected_at", (time_range,)
+        )
+
+    def bounds(self, time_range, since=None, until=None, with_tracks=False):
+        """Primeiro snapshot a partir de `since` e último até `until` (ou None).
+
+        Com `with_tracks`, só contam os snapshots gravados com faixas (coletas
+        só de seguidores não têm ranking nem contagens de seguidores da API).
+        """
+        since = timestamp(since) if since is not None else ""
+        until = timestamp(until) if until is not None else "9999"
+        tracks = " AND num_tracks > 0" if with_tracks else ""
+        first = self.db.execute(
+            f"SELECT snapshot FROM snapshots WHERE time_range = ? AND collected_at >= ?{tracks} "
+            "ORDER BY collected_at LIMIT 1", (time_range, since)).fetchone()
+        last = self.db.execute(
+            f"SELECT snapshot FROM snapshots WHERE time_range = ? AND collected_at <= ?{tracks} "
+            "ORDER BY collected_at DESC LIMIT 1", (time_range, until)).fetchone()
+        if first is None or last is None:
+            return None
+        return first[0], last[0]
+
+    def track_history(self, track_id, time_range="month"):
+        """Posição e contagens de uma faixa em cada snapshot em que ela apareceu."""
+        return self.query(
+            "SELECT s.collected_at, r.rank, r.play_count, r.repost_count, r.favorite_count "
+            "FROM tracks t JOIN track_ranks r ON r.track = t.track "
+            "JOIN snapshots s ON s.snapshot = r.snapshot "
+            "WHERE t.id = ? AND s.time_range = ? ORDER BY s.collected_at",
+            (track_id, time_range),
+        )
+
+    def artist_history(self, artist_id, time_range="month"):
+        """Seguidores, melhor posição e faixas em alta de um artista em cada snapshot."""
+        return self.query(
+            "SELECT s.collected_at, a.follower_count, a.collected_followers, a.best_rank, a.trending_tracks "
+            "FROM artists x JOIN artist_stats a ON a.artist = x.artist "
+            "JOIN snapshots s ON s.snapshot = a.snapshot "
+            "WHERE x.id = ? AND s.time_range = ? ORDER BY s.collected_at",
+            (artist_id, time_range),
+        )
+
+    def top_movers(self, k=10, since=None, until=None, time_range="month"):
+        """Faixas que mais subiram no ranking entre o primeiro e o último snapshot do período.
+
+        Faixas que entraram no ranking depois do início contam como vindas da
+        posição logo abaixo da última.
+        """
+        bounds = self.bounds(time_range, since, until, with_tracks=True)
+        if bounds is None:
+            return pd.DataFrame()
+        first, last = bounds
+        return self.query(
+            "SELECT t.id, t.title, t.genre, "
+            "coalesce(b.rank, (SELECT max(rank) + 1 FROM track_ranks WHERE snapshot = :first)) AS rank_before, "
+            "e.rank AS rank_after, "
+            "coalesce(b.rank, (SELECT max(rank) + 1 FROM track_ranks WHERE snapshot = :first)) - e.rank AS gain "
+            "FROM track_ranks e JOIN tracks t ON t.track = e.track "
+            "LEFT JOIN track_ranks b ON b.track = e.track AND b.snapshot = :first "
+            "WHERE e.snapshot = :last ORDER BY gain DESC, e.rank LIMIT :k",
+            {"first": first, "last": last, "k": k},
+        )
+
+    def top_follower_growth(self, k=10, since=None, until=None, time_range="month"):
+        """Artistas com maior ganho de seguidores (contagem da API) no período."""
+        bounds = self.bounds(time_range, since, until, with_tracks=True)
+        if bounds is None:
+            return pd.DataFrame()
+        first, last = bounds
+        return self.query(
+            "SELECT x.id, x.name, b.follower_count AS before, e.follower_count AS after, "
+            "e.follower_count - b.follower_count AS growth "
+            "FROM artist_stats e JOIN artist_stats b ON b.artist = e.artist AND b.snapshot = :first "
+            "JOIN artists x ON x.artist = e.artist "
+            "WHERE e.snapshot = :last AND e.follower_count IS NOT NULL AND b.follower_count IS NOT NULL "
+            "ORDER BY growth DESC LIMIT :k",
+            {"first": first, "last": last, "k": k},
+        )
+
+    def overlap_growth(self, artist_id, k=10, since=None, until=None, time_range="allTime", metric="common"):
+        """Artistas cuja sobreposição de público com `artist_id` mais cresceu no período.
+
+        `metric` é `common` (seguidores em comum) ou `jaccard`; pares sem seguidores
+        em comum num dos extremos contam como zero.
+        """
+        if metric not in ("common", "jaccard"):
+            raise ValueError(f"Métrica desconhecida: {metric}")
+        bounds = self.bounds(time_range, since, until)
+        if bounds is None:
+            return pd.DataFrame()
+        first, last = bounds
+        return self.query(
+            "SELECT id, name, before, after, after - before AS growth FROM ("
+            f"SELECT x.id, x.name, sum(CASE WHEN o.snapshot = :first THEN o.{metric} ELSE 0 END) AS before, "
+            f"sum(CASE WHEN o.snapshot = :last THEN o.{metric} ELSE 0 END) AS after "
+            "FROM overlap o JOIN artists x ON x.artist = o.other "
+            "WHERE o.artist = (SELECT artist FROM artists WHERE id = :artist) AND o.snapshot IN (:first, :last) "
+            "GROUP BY o.other) ORDER BY growth DESC LIMIT :k",
+            {"first": first, "last": last, "artist": artist_id, "k": k},
+        )
+
+    def genre_share(self, freq="week", time_range="month"):
+        """Participação de cada gênero entre as faixas em alta, média por semana (ou `day`/`month`).
+
+        Retorna uma tabela período × gênero.
+        """
+        formats = {"day": "%Y-%m-%d", "week": "%Y-W%W", "month": "%Y-%m"}
+        # Média das participações nos snapshots do período (contagens por gênero
+        # gravadas na inserção); gênero ausente num snapshot conta como zero
+        table = self.query(
+            "WITH periods AS (SELECT snapshot, num_tracks, strftime(:format, collected_at) AS period "
+            "FROM snapshots WHERE time_range = :time_range AND num_tracks > 0), "
+            "counts AS (SELECT period, count(*) AS snapshots FROM periods GROUP BY period) "
+            "SELECT p.period, g.genre, sum(g.tracks * 1.0 / p.num_tracks) / c.snapshots AS share "
+            "FROM periods p JOIN counts c ON c.period = p.period JOIN genre_counts g ON g.snapshot = p.snapshot "
+            "GROUP BY p.period, g.genre",
+            {"format": formats[freq], "time_range": time_range},
+        )
+        return table.pivot(index="period", columns="genre", values="share").fillna(0.0)
+
+    def followers(self, snapshot):
+        """`{artist_id: [follower_id, ...]}` de um snapshot (o formato de `followers*.json` só com os ids)."""
+        result = {}
+        rows = self.db.execute(
+            "SELECT a.id, u.id FROM follows f JOIN artists a ON a.artist = f.artist "
+            "JOIN users u ON u.user = f.user WHERE f.snapshot = ?", (snapshot,))
+        for artist_id, user_id in rows:
+            result.setdefault(artist_id, []).append(user_id)
+        return result
+
+    def follows_diff(self, before, after):
+        """Pares `(artist_id, follower_id)` seguidos e desfeitos entre dois snapshots
+        (as entradas de `IncrementalNetwork.apply_delta`), comparados no banco."""
+        query = (
+            "SELECT a.id, u.id FROM (SELECT artist, user FROM follows WHERE snapshot = ? "
+            "EXCEPT SELECT artist, user FROM follows WHERE snapshot = ?) f "
+            "JOIN artists a ON a.artist = f.artist JOIN users u ON u.user = f.user"
+        )
+        followed = self.db.execute(query, (after, before)).fetchall()
+        unfollowed = self.db.execute(query, (before, after)).fetchall()
+        return followed, unfollowed
+
+
+def record_snapshot(tracks=None, followers=None, time_range="month", filename=SNAPSHOT_DB, collected_at=None):
+    """Acrescenta uma coleta ao histórico (usado pelos coletores ao fim de cada execução)."""
+    store = SnapshotStore(filename)
+    try:
+        snapshot = store.add_snapshot(tracks, followers, time_range, collected_at)
+    finally:
+        store.close()
+    print(f"Snapshot {snapshot} ({time_range}) registrado em '{filename}'")
+    return snapshot
+
+
+def import_files(tracks_file, followers_file, time_range, filename=SNAPSHOT_DB):
+    """Importa dumps JSON já existentes, datados pela modificação do arquivo mais novo."""
+    data = []
+    for path in (tracks_file, followers_file):
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                data.append(json.load(file))
+        else:
+            data.append(None)
+    mtimes = [os.path.getmtime(p) for p in (tracks_file, followers_file) if p and os.path.exists(p)]
+    if not mtimes:
+        raise FileNotFoundError(f"Nenhum dos arquivos existe: {tracks_file}, {followers_file}")
+    return record_snapshot(data[0], data[1], time_range, filename, max(mtimes))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Importa dumps JSON existentes para o histórico de snapshots.")
+    parser.add_argument("--tracks", default="trending_tracks.json")
+    parser.add_argument("--followers", default="followers.json")
+    parser.add_argument("--time-range", default="month", choices=["week", "month", "year", "allTime"])
+    parser.add_argument("--db", default=SNAPSHOT_DB)
+    args = parser.parse_args()
+    import_files(args.tracks, args.followers, args.time_range, args.db)
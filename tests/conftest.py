@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# Os módulos do projeto ficam na raiz do repositório
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.generate import generate_dataset  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def dataset():
+    """Coleta sintética pequena: `(faixas, artistas, seguidores)`."""
+    return generate_dataset(num_tracks=40, num_users=600, mean_followers=25, seed=7)
@@ -0,0 +1,69 @@
+import json
+
+import networkx as nx
+import numpy as np
+import pytest
+from scipy.sparse.csgraph import shortest_path
+
+from approx_stats import (
+    approximate_betweenness,
+    approximate_effective_diameter,
+    approximate_eigenvector_centrality,
+    approximate_network_statistics,
+    effective_diameter,
+    sampled_average_clustering,
+    summarize,
+    wedge_sampling_clustering,
+)
+from graph import build_bipartite
+from graph_stats import bipartite_clustering, eigenvector_centrality
+
+
+@pytest.fixture(scope="module")
+def graph(dataset):
+    _, artists, followers = dataset
+    return build_bipartite(artists, followers)
+
+
+def test_sampled_clustering_matches_exact(graph):
+    exact = bipartite_clustering(graph).mean()
+    estimate = sampled_average_clustering(graph, num_samples=graph.num_nodes)
+    assert estimate.value == pytest.approx(exact, abs=0.05)
+    assert estimate.low <= estimate.value <= estimate.high
+
+
+def test_wedge_sampling_matches_robins_alexander(graph):
+    exact = nx.bipartite.robins_alexander_clustering(graph.to_networkx())
+    estimate = wedge_sampling_clustering(graph, num_samples=20_000)
+    half_width = estimate.high - estimate.value
+    assert abs(estimate.value - exact) <= 2 * half_width
+
+
+def test_betweenness_with_every_pivot_is_exact(graph):
+    betweenness, _ = approximate_betweenness(graph, num_pivots=graph.num_nodes)
+    expected = nx.betweenness_centrality(graph.to_networkx())
+    assert np.allclose(betweenness.value, [expected[node_id] for node_id in graph.ids])
+
+
+def test_effective_diameter_matches_exact(graph):
+    distances = shortest_path(graph.adjacency, unweighted=True)
+    reachable = distances[np.isfinite(distances)]
+    curve = np.array([(reachable <= t).sum() for t in range(int(reachable.max()) + 1)], dtype=np.float64)
+    estimate = approximate_effective_diameter(graph, trials=5)
+    assert estimate.value == pytest.approx(effective_diameter(curve), abs=0.5)
+
+
+def test_approximate_eigenvector_matches_exact(graph):
+    approximate = approximate_eigenvector_centrality(graph, max_iter=1000, tol=1.0e-8)
+    assert np.allclose(approximate, eigenvector_centrality(graph), atol=1e-4)
+
+
+def test_summary_is_json(graph):
+    summary = summarize(graph, approximate_network_statistics(graph, sample_budget=200), top=5)
+    decoded = json.loads(json.dumps(summary))
+    assert decoded["num_nodes"] == graph.num_nodes
+    assert decoded["samples"]["clustering_nodes"] == min(200, graph.num_nodes)
+    for name in ("clustering", "robins_alexander", "avg_distance", "effective_diameter"):
+        assert decoded[name]["low"] <= decoded[name]["value"] <= decoded[name]["high"]
+    values = [entry["value"] for entry in decoded["top_betweenness"]]
+    assert len(values) == 5 and values == sorted(values, reverse=True)
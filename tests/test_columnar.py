@@ -0,0 +1,66 @@
+import json
+import os
+
+import pytest
+
+import columnar
+import corpus
+from columnar import load_tracks
+
+
+@pytest.fixture
+def tracks_file(dataset, tmp_path):
+    tracks, _, _ = dataset
+    path = tmp_path / "trending_tracks.json"
+    path.write_text(json.dumps(tracks), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def hashes(monkeypatch):
+    """Conta as vezes em que um arquivo é relido inteiro para calcular o hash."""
+    calls = []
+    file_hash = columnar.file_hash
+
+    def counted(filepath):
+        calls.append(filepath)
+        return file_hash(filepath)
+
+    monkeypatch.setattr(columnar, "file_hash", counted)
+    return calls
+
+
+def test_load_tracks_reads_only_requested_columns(dataset, tracks_file):
+    tracks, _, _ = dataset
+    loaded = load_tracks(tracks_file, ["id", "title", "user.id"])
+    assert loaded == [{"id": t["id"], "title": t["title"], "user": {"id": t["user"]["id"]}} for t in tracks]
+
+
+def test_load_tracks_hashes_only_when_the_file_changes(dataset, tracks_file, hashes):
+    tracks, _, _ = dataset
+    load_tracks(tracks_file, ["id", "title"])
+    assert len(hashes) == 1
+    load_tracks(tracks_file, ["id", "genre"])
+    assert len(hashes) == 1
+
+    # Mesmo conteúdo com outra data: confere o hash uma vez e não regrava a cópia
+    os.utime(tracks_file, ns=(1, 1))
+    load_tracks(tracks_file, ["id", "title"])
+    load_tracks(tracks_file, ["id", "title"])
+    assert len(hashes) == 2
+
+    changed = [dict(track, title="Outro") for track in tracks]
+    with open(tracks_file, "w", encoding="utf-8") as file:
+        json.dump(changed, file)
+    assert {track["title"] for track in load_tracks(tracks_file, ["title"])} == {"Outro"}
+    assert len(hashes) == 3
+
+
+def test_load_corpus_reuses_saved_corpus_without_hashing(tracks_file, tmp_path, hashes):
+    directory = str(tmp_path / "corpus")
+    first = corpus.load_corpus(tracks_file, directory)
+    calls = len(hashes)
+    again = corpus.load_corpus(tracks_file, directory)
+    assert len(hashes) == calls
+    assert again.vocabulary == first.vocabulary
+    assert (again.tokens == first.tokens).all()
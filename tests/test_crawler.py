@@ -0,0 +1,25 @@
+from crawler import crawl_all_followers, crawl_followers
+
+
+class StubPool:
+    """Responde `/v1/users/<id>/followers` com os objetos completos de `followers`."""
+
+    def __init__(self, followers):
+        self.followers = followers
+
+    def request(self, path, params=None):
+        artist_id = path.split("/")[3]
+        offset = params.get("offset", 0)
+        return self.followers.get(artist_id, [])[offset:offset + params["limit"]]
+
+
+def test_collectors_keep_full_follower_objects(dataset, tmp_path):
+    _, artists, followers = dataset
+    followers = {artist: [dict(follower, profile_picture={"150x150": "url"}) for follower in followers_list]
+                 for artist, followers_list in followers.items()}
+    pool = StubPool(followers)
+    expected = {artist: followers[artist][:50] for artist in artists if followers.get(artist)}
+    assert crawl_followers(artists, pool, "TESTE", limit=50) == expected
+
+    pages = crawl_all_followers(artists, pool, "TESTE", str(tmp_path / "pages.jsonl"), page_size=7)
+    assert pages == {artist: followers[artist] for artist in artists if followers.get(artist)}
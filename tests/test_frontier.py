@@ -0,0 +1,169 @@
+import time
+
+import numpy as np
+import pytest
+
+from benchmarks.server import stand_in_server
+from discovery_nodes import NodePool, TokenBucket
+from frontier import DONE, FAILED, MAX_ATTEMPTS, PENDING, BloomFilter, CrawlFrontier, crawl_network
+from metrics import HttpMetrics
+
+
+def status(frontier, user_id):
+    return frontier.db.execute("SELECT depth, status, attempts FROM users WHERE id = ?", (user_id,)).fetchone()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"user{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+    false_positives = sum(f"other{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_next_batch_order_and_depth_promotion(tmp_path):
+    frontier = CrawlFrontier(str(tmp_path / "crawl.sqlite"), bloom_capacity=1000)
+    try:
+        frontier.seed(["s"])
+        assert frontier.next_batch(10, max_depth=2) == [(1, "s", 0)]
+        frontier.record(1, 0, {"followers": [{"id": "a", "follower_count": 5}, {"id": "b", "follower_count": 50}]})
+        assert status(frontier, "s")[1] == DONE
+        # Mesma profundidade: o mais seguido primeiro
+        assert [user_id for _, user_id, _ in frontier.next_batch(10, max_depth=2)] == ["b", "a"]
+        assert frontier.next_batch(10, max_depth=0) == []
+
+        node_b = frontier.lookup("b")[0]
+        frontier.record(node_b, 1, {"followers": [{"id": "c"}]})
+        assert status(frontier, "c")[0] == 2
+        # `c` reaparece mais perto da semente enquanto pendente: sobe de profundidade
+        node_a = frontier.lookup("a")[0]
+        frontier.record(node_a, 1, {"followers": []})
+        frontier.seed(["c"])
+        assert status(frontier, "c")[0] == 0
+        # Já expandido, `b` não muda de profundidade
+        frontier.record(frontier.lookup("c")[0], 0, {"followers": [{"id": "b"}]})
+        assert status(frontier, "b")[:2] == (1, DONE)
+        assert frontier.next_batch(10, max_depth=2, exclude={node_a}) == []
+    finally:
+        frontier.close()
+
+
+def test_failed_expansions_stop_after_max_attempts(tmp_path):
+    frontier = CrawlFrontier(str(tmp_path / "crawl.sqlite"), bloom_capacity=1000)
+    try:
+        frontier.seed(["s"])
+        for attempt in range(1, MAX_ATTEMPTS):
+            frontier.record(1, 0, None)
+            assert status(frontier, "s") == (0, PENDING, attempt)
+            assert frontier.next_batch(1, max_depth=0) == [(1, "s", 0)]
+        frontier.record(1, 0, None)
+        assert status(frontier, "s") == (0, FAILED, MAX_ATTEMPTS)
+        assert frontier.next_batch(1, max_depth=0) == []
+    finally:
+        frontier.close()
+
+
+def test_edge_list_uses_node_positions(tmp_path):
+    frontier = CrawlFrontier(str(tmp_path / "crawl.sqlite"), bloom_capacity=1000)
+    try:
+        frontier.seed(["s", "t"])
+        frontier.record(1, 0, {"followers": [{"id": "a"}], "following": [{"id": "t"}]})
+        edges = frontier.edge_list()
+        assert edges.ids == ["s", "t", "a"]
+        assert edges.artists.tolist() == [0, 1]
+        pairs = {(edges.ids[a], edges.ids[b]) for a, b in zip(edges.src.tolist(), edges.dst.tolist())}
+        # (seguido, seguidor)
+        assert pairs == {("s", "a"), ("t", "s")}
+    finally:
+        frontier.close()
+
+
+def crawled(frontier):
+    edges = frontier.edge_list()
+    return {(edges.ids[a], edges.ids[b]) for a, b in zip(edges.src.tolist(), edges.dst.tolist())}
+
+
+def test_resume_matches_a_single_crawl(dataset, tmp_path, capsys):
+    tracks, artists, followers = dataset
+    seeds = artists[:3]
+    with stand_in_server(tracks, followers) as base_url:
+        pool = NodePool([base_url])
+        try:
+            full = crawl_network(seeds, pool, "TESTE", str(tmp_path / "full.sqlite"), max_depth=2, budget=10_000,
+                                 page_size=7, max_in_flight=4)
+            partial = crawl_network(seeds, pool, "TESTE", str(tmp_path / "resumed.sqlite"), max_depth=2, budget=5,
+                                    page_size=7, max_in_flight=4)
+            assert partial.expanded() == 5
+            partial.close()
+            resumed = crawl_network(seeds, pool, "TESTE", str(tmp_path / "resumed.sqlite"), max_depth=2,
+                                    budget=10_000, page_size=7, max_in_flight=4)
+            assert resumed.expanded() == full.expanded() > 5
+            assert crawled(resumed) == crawled(full)
+            # Todas as arestas de um artista semente estão lá
+            assert {(seeds[0], f["id"]) for f in followers[seeds[0]]} <= crawled(full)
+            full.close()
+            resumed.close()
+        finally:
+            pool.close()
+
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(rate=20, burst=2)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    # Duas fichas da rajada e mais quatro a 20 por segundo
+    assert time.monotonic() - start == pytest.approx(0.2, abs=0.08)
+
+
+@pytest.fixture
+def servers(dataset):
+    """Um node lento e um rápido, com os mesmos dados."""
+    tracks, _, followers = dataset
+    with stand_in_server(tracks, followers, latency=1.0) as slow, stand_in_server(tracks, followers) as fast:
+        yield slow, fast
+
+
+def test_hedged_fetch_answers_from_the_second_node(servers):
+    slow, fast = servers
+    metrics = HttpMetrics()
+    pool = NodePool([slow, fast], metrics=metrics)
+    pool.stats[slow].latencies.extend([0.05] * 20)
+    try:
+        start = time.monotonic()
+        assert pool.request("/v1/tracks/trending") is not None
+        assert time.monotonic() - start < 0.8
+        assert metrics.fallbacks == {(slow, fast, "hedge"): 1}
+    finally:
+        pool.close()
+
+
+def test_waiting_for_a_token_does_not_trigger_the_hedge(dataset):
+    tracks, _, followers = dataset
+    with stand_in_server(tracks, followers) as first, stand_in_server(tracks, followers) as second:
+        metrics = HttpMetrics()
+        pool = NodePool([first, second], metrics=metrics, rate=5, burst=1)
+        for stats in pool.stats.values():
+            stats.latencies.extend([0.05] * 20)
+        try:
+            for _ in range(3):
+                assert pool.request("/v1/tracks/trending") is not None
+            assert not metrics.fallbacks
+        finally:
+            pool.close()
+
+
+def test_failed_node_falls_back_to_the_next(dataset):
+    tracks, _, followers = dataset
+    with stand_in_server(tracks, followers) as working:
+        # Porta fechada: a conexão é recusada antes do prazo da cópia
+        metrics = HttpMetrics()
+        pool = NodePool(["http://127.0.0.1:9", working], metrics=metrics)
+        try:
+            assert len(pool.request("/v1/tracks/trending")) == len(tracks)
+            assert metrics.fallbacks == {("http://127.0.0.1:9", working, "fallback"): 1}
+            assert np.isclose(pool.stats["http://127.0.0.1:9"].error_rate, 0.2)
+        finally:
+            pool.close()
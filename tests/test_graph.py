@@ -0,0 +1,75 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from graph import BipartiteGraph, build_bipartite
+
+
+def networkx_builder(artists, followers):
+    """Montagem original de `network.build_network`, direto no NetworkX."""
+    G = nx.Graph()
+    for artist in artists:
+        G.add_node(artist, type="artist")
+    for artist, followers_list in followers.items():
+        for follower in followers_list:
+            follower_id = follower.get("id") if isinstance(follower, dict) else follower
+            G.add_node(follower_id, type="follower")
+            G.add_edge(artist, follower_id)
+    return G
+
+
+def memory_mapped(array):
+    """Se o vetor é (uma vista de) um arquivo mapeado em memória."""
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+@pytest.fixture(scope="module")
+def graph(dataset):
+    _, artists, followers = dataset
+    return build_bipartite(artists, followers)
+
+
+def test_save_and_load_round_trip(graph, tmp_path):
+    graph.save(str(tmp_path))
+    loaded = BipartiteGraph.load(str(tmp_path), mmap=True)
+    arrays = (loaded.is_artist, loaded.adjacency.data, loaded.adjacency.indices, loaded.adjacency.indptr,
+              loaded.followers.indices, loaded.followers.indptr)
+    assert all(memory_mapped(array) for array in arrays)
+    assert loaded.ids == graph.ids
+    assert (loaded.is_artist == graph.is_artist).all()
+    assert (loaded.adjacency != graph.adjacency).nnz == 0
+    assert (loaded.incidence() != graph.incidence()).nnz == 0
+    assert loaded.degrees().tolist() == graph.degrees().tolist()
+    assert loaded.snapshot_hash() == graph.snapshot_hash()
+
+
+def test_snapshot_hash_follows_content(dataset, graph):
+    _, artists, followers = dataset
+    assert build_bipartite(artists, followers).snapshot_hash() == graph.snapshot_hash()
+    first = next(iter(followers))
+    fewer = dict(followers, **{first: followers[first][1:]})
+    assert build_bipartite(artists, fewer).snapshot_hash() != graph.snapshot_hash()
+
+
+def test_to_networkx_matches_networkx_builder(dataset, graph):
+    _, artists, followers = dataset
+    expected = networkx_builder(artists, followers)
+    G = graph.to_networkx()
+    assert set(G.nodes) == set(expected.nodes)
+    assert {frozenset(edge) for edge in G.edges} == {frozenset(edge) for edge in expected.edges}
+    assert nx.get_node_attributes(G, "type") == nx.get_node_attributes(expected, "type")
+
+
+def test_plain_ids_and_repeated_edges():
+    graph = build_bipartite(["a", "b"], {"a": ["x", {"id": "y"}, "x"], "b": [{"id": "x"}, "a"]})
+    assert graph.ids == ["a", "b", "x", "y"]
+    assert graph.is_artist.tolist() == [True, True, False, False]
+    assert graph.num_edges == 4
+    assert graph.degrees().tolist() == [3, 2, 2, 1]
+    # `a` segue `b`: a aresta entra na adjacência, mas na incidência dirigida
+    # aparece só na linha de `b`
+    assert graph.incidence().toarray().tolist() == [[0, 0, 1, 1], [1, 0, 1, 0]]
@@ -0,0 +1,47 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from graph import build_bipartite
+from graph_stats import (
+    as_node_dict,
+    bipartite_clustering,
+    degree_centrality,
+    degree_histogram,
+    eigenvector_centrality,
+)
+
+
+@pytest.fixture(scope="module")
+def graphs(dataset):
+    _, artists, followers = dataset
+    graph = build_bipartite(artists, followers)
+    return graph, graph.to_networkx()
+
+
+def test_degree_centrality(graphs):
+    graph, G = graphs
+    degrees, centrality = degree_centrality(graph)
+    assert as_node_dict(graph, degrees) == dict(G.degree())
+    expected = nx.degree_centrality(G)
+    for node_id, value in as_node_dict(graph, centrality).items():
+        assert value == pytest.approx(expected[node_id])
+
+
+def test_eigenvector_centrality(graphs):
+    graph, G = graphs
+    expected = nx.eigenvector_centrality(G, max_iter=1000, tol=1.0e-6)
+    result = as_node_dict(graph, eigenvector_centrality(graph))
+    assert np.allclose([result[node_id] for node_id in expected], list(expected.values()), atol=1e-4)
+
+
+def test_bipartite_clustering(graphs):
+    graph, G = graphs
+    expected = nx.bipartite.clustering(G, mode="dot")
+    result = as_node_dict(graph, bipartite_clustering(graph))
+    assert np.allclose([result[node_id] for node_id in expected], list(expected.values()))
+
+
+def test_degree_histogram(graphs):
+    graph, G = graphs
+    assert degree_histogram(graph).tolist() == nx.degree_histogram(G)
@@ -0,0 +1,104 @@
+import pytest
+
+import http_cache
+from discovery_nodes import NodePool
+from http_cache import ResponseCache, cache_key
+from metrics import HttpMetrics
+
+
+class Clock:
+    """Relógio controlado pelo teste no lugar de `time.time`."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(http_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttls={"/v1/tracks/trending": 60})
+    yield cache
+    cache.close()
+
+
+def test_key_ignores_app_name_and_order():
+    assert cache_key("/v1/x", {"b": 1, "a": 2, "app_name": "A"}) == cache_key("/v1/x", {"a": 2, "b": 1})
+
+
+def test_entries_expire_after_the_endpoint_ttl(cache, clock):
+    cache.store("/v1/tracks/trending", {"time": "month"}, [1, 2, 3])
+    cache.store("/v1/users/abc/followers", {"limit": 50}, [{"id": "x"}])
+    clock.now += 59
+    assert cache.lookup("/v1/tracks/trending", {"time": "month"}).fresh
+    clock.now += 2
+    entry = cache.lookup("/v1/tracks/trending", {"time": "month"})
+    assert not entry.fresh and entry.data == [1, 2, 3]
+    # Seguidores valem um dia (endpoint normalizado, sem o id)
+    assert cache.lookup("/v1/users/abc/followers", {"limit": 50}).fresh
+    clock.now += http_cache.ENDPOINT_TTLS["/v1/users/{id}/followers"]
+    assert not cache.lookup("/v1/users/abc/followers", {"limit": 50}).fresh
+    assert cache.lookup("/v1/tracks/trending", {"time": "week"}) is None
+
+
+def test_stale_entries_are_revalidated(cache, clock):
+    cache.store("/v1/tracks/trending", {"time": "month"}, ["antigo"],
+                {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2026 00:00:00 GMT"})
+    metrics = HttpMetrics()
+    pool = NodePool(["http://127.0.0.1:9"], cache=cache, metrics=metrics)
+    sent = []
+
+    def not_modified(path, params=None, headers=None):
+        sent.append(headers)
+        return 304, None, {}
+
+    pool.hedged_fetch = not_modified
+    try:
+        assert pool.request("/v1/tracks/trending", {"time": "month"}) == ["antigo"]
+        assert sent == []
+        clock.now += 120
+        assert pool.request("/v1/tracks/trending", {"time": "month"}) == ["antigo"]
+        assert sent == [{"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2026 00:00:00 GMT"}]
+        # O 304 renova a validade: a próxima consulta não vai à rede
+        assert cache.lookup("/v1/tracks/trending", {"time": "month"}).fresh
+        assert pool.request("/v1/tracks/trending", {"time": "month"}) == ["antigo"]
+        assert len(sent) == 1
+
+        # Sem resposta de nenhum node, a entrada vencida é servida assim mesmo
+        clock.now += 120
+        pool.hedged_fetch = lambda path, params=None, headers=None: None
+        assert pool.request("/v1/tracks/trending", {"time": "month"}) == ["antigo"]
+        assert metrics.cache == {"hit": 2, "revalidated": 1, "stale": 1}
+    finally:
+        pool.close()
+
+
+def test_lru_eviction_by_total_bytes(cache, clock):
+    for i in range(3):
+        clock.now += 1
+        cache.store(f"/v1/users/u{i}/followers", {}, [{"id": f"x{j}"} for j in range(100)])
+    size = cache.total_bytes // 3
+    assert cache.total_bytes == cache._stored_bytes()
+    cache.max_bytes = 3 * size + size // 2
+
+    # u0 é lido de novo e passa a ser o mais recente; u1 é o menos usado
+    clock.now += 1
+    cache.lookup("/v1/users/u0/followers", {})
+    clock.now += 1
+    cache.store("/v1/users/u3/followers", {}, [{"id": f"y{j}"} for j in range(100)])
+    present = [i for i in range(4) if cache.lookup(f"/v1/users/u{i}/followers", {}) is not None]
+    assert present == [0, 2, 3]
+    assert cache.total_bytes == cache._stored_bytes() <= cache.max_bytes
+
+    # Substituir uma resposta desconta o tamanho anterior
+    before = cache.total_bytes
+    cache.store("/v1/users/u3/followers", {}, [{"id": "z"}])
+    assert cache.total_bytes == cache._stored_bytes() < before
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from graph import build_bipartite
+from graph_stats import eigenvector_centrality
+from incremental import IncrementalNetwork, follows_matrix
+from snapshots import SnapshotStore
+
+
+def next_snapshot(rng, followers, users):
+    """Tira alguns seguidores de cada artista e acrescenta outros (alguns inéditos)."""
+    changed = {}
+    for artist, followers_list in followers.items():
+        ids = [follower["id"] for follower in followers_list]
+        kept = [node_id for node_id in ids if rng.random() > 0.2]
+        added = rng.choice(users, size=int(rng.integers(0, 5)), replace=False).tolist()
+        if rng.random() < 0.3:
+            added.append(f"novo{rng.integers(1_000_000)}")
+        changed[artist] = [{"id": node_id} for node_id in dict.fromkeys(kept + added)]
+    return changed
+
+
+def assert_matches_rebuild(network, artists, followers):
+    rebuilt = build_bipartite(artists, followers)
+    # Mesmos nós (a ordem pode diferir) e mesmas arestas
+    assert sorted(network.graph.ids) == sorted(rebuilt.ids)
+    order = np.array([network.graph.index[node_id] for node_id in rebuilt.ids])
+    assert (network.graph.adjacency[order][:, order] != rebuilt.adjacency).nnz == 0
+    assert (network.graph.is_artist[order] == rebuilt.is_artist).all()
+    assert (network.degrees[order] == rebuilt.degrees()).all()
+
+    follows = follows_matrix(rebuilt).astype(np.float64)
+    expected = (follows @ follows.T).toarray()
+    np.fill_diagonal(expected, 0)
+    assert np.array_equal(network.co_followers[order][:, order].toarray(), expected)
+    assert network.eigenvector[order] == pytest.approx(eigenvector_centrality(rebuilt), abs=1e-4)
+
+
+def test_update_matches_rebuild(dataset):
+    _, artists, followers = dataset
+    rng = np.random.default_rng(3)
+    users = sorted({follower["id"] for followers_list in followers.values() for follower in followers_list})
+    network = IncrementalNetwork.from_snapshot(artists, followers)
+    for _ in range(5):
+        followers = next_snapshot(rng, followers, users)
+        network.update(artists, followers)
+        assert_matches_rebuild(network, artists, followers)
+
+
+def test_save_and_load(dataset, tmp_path):
+    _, artists, followers = dataset
+    network = IncrementalNetwork.from_snapshot(artists, followers)
+    network.save(str(tmp_path))
+    loaded = IncrementalNetwork.load(str(tmp_path))
+    assert loaded.graph.ids == network.graph.ids
+    assert (loaded.co_followers != network.co_followers).nnz == 0
+    assert np.array_equal(loaded.eigenvector, network.eigenvector)
+
+
+def test_apply_delta_matches_rebuild(dataset, tmp_path):
+    _, artists, followers = dataset
+    rng = np.random.default_rng(5)
+    users = sorted({follower["id"] for followers_list in followers.values() for follower in followers_list})
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite"))
+    before = store.add_snapshot(None, followers, "allTime")
+    network = IncrementalNetwork.from_snapshot(artists, followers)
+    for _ in range(3):
+        followers = next_snapshot(rng, followers, users)
+        after = store.add_snapshot(None, followers, "allTime")
+        followed, unfollowed = store.follows_diff(before, after)
+        network.apply_delta(followed, unfollowed)
+        assert_matches_rebuild(network, artists, followers)
+        before = after
+    store.close()
+
+
+def test_delta_between_artists(dataset):
+    # Artista que segue outro: desfazer um sentido mantém a aresta enquanto o outro existir
+    _, artists, followers = dataset
+    a, b = artists[:2]
+    followers = {artist: list(followers_list) for artist, followers_list in followers.items()}
+    followers.setdefault(a, []).append({"id": b})
+    followers.setdefault(b, []).append({"id": a})
+    network = IncrementalNetwork.from_snapshot(artists, followers)
+    network.apply_delta([], [(a, b)])
+    followers[a] = [follower for follower in followers[a] if follower["id"] != b]
+    assert_matches_rebuild(network, artists, followers)
+    network.apply_delta([(a, b)], [(b, a)])
+    followers[a].append({"id": b})
+    followers[b] = [follower for follower in followers[b] if follower["id"] != a]
+    assert_matches_rebuild(network, artists, followers)
@@ -0,0 +1,85 @@
+import json
+import sys
+import warnings
+
+import numpy as np
+import pytest
+
+from graph import build_bipartite
+from ingest import FOLLOWER_FIELDS, iter_followers, load_graph
+
+
+@pytest.fixture
+def followers_file(dataset, tmp_path):
+    _, artists, followers = dataset
+    followers = {artist: [dict(follower, extra={"id": "ignorado"}) for follower in followers_list]
+                 for artist, followers_list in followers.items()}
+    # Um artista com os seguidores gravados só como ids
+    first = next(iter(followers))
+    followers[first] = [follower["id"] for follower in followers[first]]
+    path = tmp_path / "followers.json"
+    path.write_text(json.dumps(followers), encoding="utf-8")
+    return str(path), followers
+
+
+@pytest.mark.filterwarnings("ignore:ijson")
+def test_load_graph_matches_build_bipartite(dataset, followers_file):
+    _, artists, _ = dataset
+    path, followers = followers_file
+    graph, index = load_graph(artists, path)
+    expected = build_bipartite(artists, followers)
+    assert graph.ids == expected.ids
+    assert (graph.is_artist == expected.is_artist).all()
+    assert (graph.adjacency != expected.adjacency).nnz == 0
+    assert (graph.incidence() != expected.incidence()).nnz == 0
+
+    attributes = index.user_attributes()
+    assert set(attributes) <= set(FOLLOWER_FIELDS)
+    handles = {follower["id"]: follower["handle"]
+               for followers_list in followers.values() for follower in followers_list if isinstance(follower, dict)}
+    position = graph.index
+    for node_id, handle in handles.items():
+        assert attributes["handle"][position[node_id]] == handle
+    assert not np.isin("ignorado", attributes["handle"])
+
+
+def read_followers(path, streaming, monkeypatch):
+    """Itens de `iter_followers` com ou sem o `ijson` (sem ele, o fallback com `json.load`)."""
+    with monkeypatch.context() as patch:
+        if not streaming:
+            patch.setitem(sys.modules, "ijson", None)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return list(iter_followers(path))
+
+
+def test_streaming_matches_fallback(tmp_path, monkeypatch):
+    pytest.importorskip("ijson")
+    followers = {
+        "a": [
+            {"id": "x", "handle": "hx", "follower_count": 3,
+             "profile_picture": {"150x150": "url", "nested": [{"id": "falso", "handle": "falso"}]},
+             "tags": ["t", {"handle": "falso"}], "score": 1.5},
+            {"id": "y", "handle": None, "follower_count": 0, "extra": [[{"id": "falso"}]]},
+        ],
+        "b": [],
+        "c": ["x", "z"],
+        "d": [{"id": "w", "follower_count": 2.5e3}],
+        "e": [],
+    }
+    path = tmp_path / "followers.json"
+    path.write_text(json.dumps(followers), encoding="utf-8")
+    streamed = read_followers(str(path), True, monkeypatch)
+    loaded = read_followers(str(path), False, monkeypatch)
+    assert streamed == loaded
+    assert [artist for artist, follower in streamed if follower is None] == list(followers)
+    assert ("a", {"id": "x", "handle": "hx", "follower_count": 3}) in streamed
+    assert ("c", {"id": "z"}) in streamed
+
+
+def test_fallback_warns_without_ijson(tmp_path, monkeypatch):
+    path = tmp_path / "followers.json"
+    path.write_text(json.dumps({"a": ["x"]}), encoding="utf-8")
+    monkeypatch.setitem(sys.modules, "ijson", None)
+    with pytest.warns(RuntimeWarning, match="ijson"):
+        assert list(iter_followers(str(path))) == [("a", None), ("a", {"id": "x"})]
@@ -0,0 +1,51 @@
+import sys
+from contextlib import nullcontext
+
+import pytest
+
+from pipeline import POSITIONS, STAGES, Stage, dependencies, run_pipeline
+
+STAGE_MODULE = """
+def collect():
+    with open("collected.txt", "a") as file:
+        file.write("x")
+
+
+def count():
+    with open("collected.txt") as file:
+        collected = file.read()
+    with open("count.txt", "w") as file:
+        file.write(str(len(collected)))
+"""
+
+
+@pytest.fixture
+def stages(tmp_path, monkeypatch):
+    (tmp_path / "fake_stages.py").write_text(STAGE_MODULE)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr("pipeline.stage_metrics", lambda name, profile: nullcontext())
+    yield [
+        Stage("collect", "fake_stages:collect", [], ["collected.txt"]),
+        Stage("count", "fake_stages:count", ["collected.txt"], ["count.txt"]),
+    ]
+    sys.modules.pop("fake_stages", None)
+
+
+def test_positions_are_written_before_communities():
+    deps = dependencies(STAGES)
+    assert "statistics" in deps["communities"]
+    writers = [stage.name for stage in STAGES if POSITIONS in stage.outputs]
+    assert writers == ["statistics"]
+
+
+def test_collect_runs_only_when_missing_or_forced(stages, tmp_path):
+    assert run_pipeline(stages, max_workers=1) == {"collect": "run", "count": "run"}
+    assert run_pipeline(stages, max_workers=1) == {"collect": "skipped", "count": "skipped"}
+
+    # Sem --force, mesmo com o código da coleta alterado, os dados não são coletados de novo
+    (tmp_path / "fake_stages.py").write_text(STAGE_MODULE + "\n# alterado\n")
+    assert run_pipeline(stages, max_workers=1)["collect"] == "skipped"
+
+    assert run_pipeline(stages, force={"collect"}, max_workers=1) == {"collect": "run", "count": "run"}
+    assert (tmp_path / "count.txt").read_text() == "2"
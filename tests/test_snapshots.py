@@ -0,0 +1,93 @@
+import pytest
+
+from snapshots import SnapshotStore
+
+
+@pytest.fixture
+def store(dataset, tmp_path):
+    """Três coletas: a original, uma com o ranking invertido e mais seguidores e uma só de seguidores."""
+    tracks, _, followers = dataset
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite"))
+    store.add_snapshot(tracks, followers, "month", "2026-01-01")
+    reversed_tracks = [dict(track, user=dict(track["user"], follower_count=track["user"]["follower_count"] + i))
+                       for i, track in enumerate(reversed(tracks))]
+    store.add_snapshot(reversed_tracks, followers, "month", "2026-02-01")
+    store.add_snapshot(None, {artist: followers_list[:1] for artist, followers_list in followers.items()},
+                       "month", "2026-03-01")
+    yield store
+    store.close()
+
+
+def test_repeated_snapshot_is_not_stored(dataset, store):
+    tracks, _, followers = dataset
+    assert store.add_snapshot(tracks, followers, "month", "2026-04-01") == 1
+    assert len(store.snapshots("month")) == 3
+
+
+def test_bounds_skip_snapshots_without_tracks(store):
+    assert store.bounds("month") == (1, 3)
+    assert store.bounds("month", with_tracks=True) == (1, 2)
+    assert store.bounds("month", since="2026-01-15", until="2026-02-15") == (2, 2)
+    assert store.bounds("week") is None
+
+
+def test_top_movers(dataset, store):
+    tracks, _, _ = dataset
+    movers = store.top_movers(3)
+    # A última faixa do ranking original passa a ser a primeira
+    assert movers["id"].tolist()[0] == tracks[-1]["id"]
+    assert movers["rank_before"].tolist()[0] == len(tracks)
+    assert movers["gain"].tolist()[0] == len(tracks) - 1
+
+
+def test_track_history(dataset, store):
+    tracks, _, _ = dataset
+    history = store.track_history(tracks[0]["id"])
+    assert history["rank"].tolist() == [1, len(tracks)]
+
+
+def test_top_follower_growth(store):
+    growth = store.top_follower_growth(5)
+    assert len(growth) == 5
+    assert (growth["growth"] == growth["after"] - growth["before"]).all()
+    assert growth["growth"].is_monotonic_decreasing
+
+
+def test_genre_share(store):
+    share = store.genre_share(freq="month")
+    # A coleta só de seguidores não tem faixas e fica fora
+    assert share.index.tolist() == ["2026-01", "2026-02"]
+    assert share.sum(axis=1).tolist() == pytest.approx([1.0, 1.0])
+
+
+def test_followers_round_trip(dataset, store):
+    _, _, followers = dataset
+    stored = store.followers(1)
+    assert {artist: sorted(ids) for artist, ids in stored.items()} == \
+        {artist: sorted(follower["id"] for follower in followers_list)
+         for artist, followers_list in followers.items() if followers_list}
+
+
+def test_overlap_growth(dataset, tmp_path):
+    _, _, followers = dataset
+    store = SnapshotStore(str(tmp_path / "overlap.sqlite"))
+    try:
+        store.add_snapshot(None, followers, "allTime", "2026-01-01")
+        artist = next(iter(followers))
+        # Um único snapshot no período: antes e depois coincidem e nada cresceu
+        single = store.overlap_growth(artist, k=100)
+        assert len(single) > 0
+        assert (single["before"] == single["after"]).all()
+        assert (single["growth"] == 0).all()
+
+        # O artista ganha os seguidores de outro: o público em comum com ele cresce
+        other = next(name for name in single["id"] if name != artist)
+        grown = dict(followers, **{artist: followers[artist] + followers[other]})
+        store.add_snapshot(None, grown, "allTime", "2026-02-01")
+        growth = store.overlap_growth(artist, k=100)
+        assert (growth["growth"] == growth["after"] - growth["before"]).all()
+        top = growth.iloc[0]
+        assert top["id"] == other
+        assert top["growth"] == len({f["id"] for f in followers[other]} - {f["id"] for f in followers[artist]})
+    finally:
+        store.close()
@@ -1,164 +1,177 @@
-import json
 import pandas as pd
-import re
-import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import PCA
-from sklearn.manifold import TSNE
-from wordcloud import WordCloud
-from bertopic import BERTopic  # Modelagem de tópicos
-from collections import Counter
-from nltk import bigrams
-from nltk.sentiment import SentimentIntensityAnalyzer
-import nltk
-nltk.download('vader_lexicon')
-
-# 1. Carregar os dados
-def load_data(filepath):
-    with open(filepath, 'r', encoding='utf-8') as file:
-        return json.load(file)
-
-data = load_data('trending_tracks.json')
-
-# 2. Extrair texto relevante
-def extract_text(data, field):
-    documents = []
-    for track in data:
-        text = track.get(field, '')
-        if not text:
-            text = ''  # Garantir que não seja None
-        if isinstance(text, list):
-            text = " ".join(text)
-        documents.append(text)
-    return documents
-
-titles = extract_text(data, 'title')
-descriptions = extract_text(data, 'description')
-tags = extract_text(data, 'tags')
-
-# 3. Pré-processamento
-def preprocess(text):
-    if not isinstance(text, str):
-        text = ''  # Garantir que o texto seja uma string
-    text = text.lower()
-    text = re.sub(r'-', ' ', text)  # Substituir hífens por espaços
-    text = re.sub(r'[^a-z\s]', '', text)  # Remover caracteres especiais
-    text = re.sub(r'\s+', ' ', text).strip()  # Remover espaços extras
-    return text
-
-clean_titles = [preprocess(doc) for doc in titles]
-clean_descriptions = [preprocess(doc) for doc in descriptions]
-clean_tags = [preprocess(doc) for doc in tags]
-
-all_texts = clean_titles + clean_descriptions + clean_tags
+from matplotlib.figure import Figure
+
+# BERTopic, WordCloud e NLTK são importados só nas etapas que os usam (ver pipeline.py)
+from corpus import load_corpus
+from embeddings import EmbeddingStore
+from ngrams import field_ngrams, save_ngrams
+from reduction import reduce_corpus
+from sentiment import field_scores, sentiment_table
+
+# Campos analisados e o rótulo de cada um nos gráficos (None = todos os campos)
+LABELS = {"title": "Títulos", "description": "Descrições", "tags": "Tags", None: "Todos"}
+
+# Figuras gravadas pelas etapas ({} = rótulo do campo). São `Figure` sem pyplot,
+# como em layout.render_graph: não se acumulam na memória nem bloqueiam a execução
+LENGTHS_FIGURE = "distribuicao_tamanho_{}.png"
+SENTIMENT_FIGURE = "distribuicao_sentimento_{}.png"
+WORDCLOUD_FIGURE = "nuvem_palavras_{}.png"
+REDUCTION_FIGURE = "reducao_tsne.png"
+
+# Bigramas contados por ngrams.py, com chaves de hash (ver NGramCounts). Nome
+# próprio para não sobrescrever os `bigrams_*.csv` da contagem original
+BIGRAMS_FILE = "bigramas_{}.csv"
+
+# 1-3. Carregar, extrair e pré-processar os textos: cada campo é tokenizado uma
+# única vez e o corpus fica salvo em disco (ver corpus.py)
 
 # 4. Estatísticas dos textos
-def text_statistics(documents, label):
-    lengths = [len(doc.split()) for doc in documents]
+def text_statistics(corpus, field, label):
+    lengths = pd.Series(corpus.lengths(field))
     stats = {
-        'Média': round(pd.Series(lengths).mean(), 2),
-        'Mediana': round(pd.Series(lengths).median(), 2),
-        'Desvio-Padrão': round(pd.Series(lengths).std(), 2),
-        'Mínimo': min(lengths),
-        'Máximo': max(lengths)
+        'Média': round(lengths.mean(), 2),
+        'Mediana': round(lengths.median(), 2),
+        'Desvio-Padrão': round(lengths.std(), 2),
+        'Mínimo': lengths.min(),
+        'Máximo': lengths.max()
     }
     print(f'Estatísticas para {label}:', stats)
     return stats
 
-text_statistics(clean_titles, "Títulos")
-text_statistics(clean_descriptions, "Descrições")
-text_statistics(clean_tags, "Tags")
-
 # 5. Visualização de Distribuições
-def plot_distribution(documents, label):
-    lengths = [len(doc.split()) for doc in documents]
-    plt.figure(figsize=(10, 5))
-    sns.histplot(lengths, bins=20, kde=True)
-    plt.xlabel("Número de Palavras")
-    plt.ylabel("Frequência")
-    plt.title(f"Distribuição do Tamanho dos Textos - {label}")
-    plt.show()
-
-plot_distribution(clean_titles, "Títulos")
-plot_distribution(clean_descriptions, "Descrições")
-plot_distribution(clean_tags, "Tags")
-
-# 6. Modelagem de tópicos com BERTopic
-def analyze_topics(documents, label, filename):
+def plot_distribution(corpus, field, label):
+    lengths = corpus.lengths(field)
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    sns.histplot(lengths, bins=20, kde=True, ax=ax)
+    ax.set_xlabel("Número de Palavras")
+    ax.set_ylabel("Frequência")
+    ax.set_title(f"Distribuição do Tamanho dos Textos - {label}")
+    fig.savefig(LENGTHS_FIGURE.format(label), bbox_inches="tight")
+
+# 6. Modelagem de tópicos com BERTopic, com embeddings já calculados (ver embeddings.py)
+def analyze_topics(documents, label, filename, embeddings=None):
+    from bertopic import BERTopic
+
     model = BERTopic()
-    topics, probs = model.fit_transform(documents)
+    topics, probs = model.fit_transform(documents, embeddings=embeddings)
     topic_info = model.get_topic_info()
     print(f"Resumo dos tópicos para {label}:")
     print(topic_info.head())
     model.save(filename)
 
-analyze_topics(clean_titles, "Títulos", "topics_titles_model")
-analyze_topics(clean_descriptions, "Descrições", "topics_descriptions_model")
-analyze_topics(clean_tags, "Tags", "topics_tags_model")
-analyze_topics(all_texts, "Todos", "topics_all_model")
-
-# 7. Redução de Dimensionalidade com PCA + t-SNE
-def reduce_dimensionality(documents):
-    vectorizer = TfidfVectorizer()
-    vectors = vectorizer.fit_transform(documents).toarray()
-    pca = PCA(n_components=50).fit_transform(vectors)
-    tsne = TSNE(n_components=2, perplexity=30, random_state=42).fit_transform(pca)
-    
-    plt.figure(figsize=(8, 6))
-    plt.scatter(tsne[:, 0], tsne[:, 1], alpha=0.5)
-    plt.title("Redução de Dimensionalidade com t-SNE")
-    plt.xlabel("Componente 1")
-    plt.ylabel("Componente 2")
-    plt.show()
-
-reduce_dimensionality(all_texts)
-
-# 8. Contador de Termos (Bigramas)
-def generate_bigrams(documents, label):
-    all_words = " ".join(documents).split()
-    bigram_counts = Counter(bigrams(all_words))
+# 7. Redução de Dimensionalidade: TF-IDF esparso + SVD truncada + t-SNE aproximado (ver reduction.py)
+def reduce_dimensionality(corpus, field=None, method="tsne"):
+    tsne = reduce_corpus(corpus, field, method)
     
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+    ax.scatter(tsne[:, 0], tsne[:, 1], alpha=0.5)
+    ax.set_title("Redução de Dimensionalidade com t-SNE")
+    ax.set_xlabel("Componente 1")
+    ax.set_ylabel("Componente 2")
+    fig.savefig(REDUCTION_FIGURE, bbox_inches="tight")
+
+# 8. Contador de Termos (Bigramas): contagens por campo em paralelo, sem cruzar
+# documentos; "Todos" é a soma dos campos (ver ngrams.py)
+def generate_bigrams(counter, label):
     print(f"Top 10 Bigramas para {label}:")
-    for bigram, freq in bigram_counts.most_common(10):
+    for bigram, freq in counter.most_common(10):
         print(f"{' '.join(bigram)}: {freq}")
+    save_ngrams(counter, BIGRAMS_FILE.format(label))
 
-generate_bigrams(clean_titles, "Títulos")
-generate_bigrams(clean_descriptions, "Descrições")
-generate_bigrams(clean_tags, "Tags")
-
-generate_bigrams(all_texts, "Todos")
-
-# 9. Análise de Sentimento
-def analyze_sentiment(documents, label):
-    sia = SentimentIntensityAnalyzer()
-    sentiments = [sia.polarity_scores(text)["compound"] for text in documents]
+# 9. Análise de Sentimento (pontuações calculadas uma vez por texto e salvas; ver sentiment.py)
+def analyze_sentiment(table, field, label):
+    sentiments = field_scores(table, field)
     
-    plt.figure(figsize=(10, 5))
-    sns.histplot(sentiments, bins=20, kde=True)
-    plt.xlabel("Pontuação de Sentimento")
-    plt.ylabel("Frequência")
-    plt.title(f"Distribuição de Sentimentos - {label}")
-    plt.show()
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    sns.histplot(sentiments, bins=20, kde=True, ax=ax)
+    ax.set_xlabel("Pontuação de Sentimento")
+    ax.set_ylabel("Frequência")
+    ax.set_title(f"Distribuição de Sentimentos - {label}")
+    fig.savefig(SENTIMENT_FIGURE.format(label), bbox_inches="tight")
     
     print(f"Média de Sentimento para {label}: {round(pd.Series(sentiments).mean(), 2)}")
 
-analyze_sentiment(clean_titles, "Títulos")
-analyze_sentiment(clean_descriptions, "Descrições")
-analyze_sentiment(clean_tags, "Tags")
-analyze_sentiment(all_texts, "Todos")
-
-# 10. Nuvem de Palavras
-def generate_wordcloud(documents, label):
-    all_text = " ".join(documents)
-    wordcloud = WordCloud(width=800, height=400, background_color='white').generate(all_text)
-    plt.figure(figsize=(10, 5))
-    plt.imshow(wordcloud, interpolation='bilinear')
-    plt.axis('off')
-    plt.title(f"Nuvem de Palavras - {label}")
-    plt.show()
-
-generate_wordcloud(clean_titles, "Títulos")
-generate_wordcloud(clean_descriptions, "Descrições")
-generate_wordcloud(clean_tags, "Tags")
-generate_wordcloud(all_texts, "Todos")
+# 10. Nuvem de Palavras (a partir das frequências já contadas no corpus)
+def generate_wordcloud(corpus, field, label):
+    from wordcloud import WordCloud, STOPWORDS
+
+    frequencies = {word: count for word, count in corpus.word_counts(field).items() if word not in STOPWORDS}
+    wordcloud = WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(frequencies)
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.imshow(wordcloud, interpolation='bilinear')
+    ax.axis('off')
+    ax.set_title(f"Nuvem de Palavras - {label}")
+    fig.savefig(WORDCLOUD_FIGURE.format(label), bbox_inches="tight")
+
+# Etapas da análise (cada uma pode rodar sozinha no pipeline; ver pipeline.py)
+TRACKS_FILE = 'trending_tracks.json'
+
+def corpus_stage():
+    load_corpus(TRACKS_FILE)
+
+def statistics_stage():
+    corpus = load_corpus(TRACKS_FILE)
+    for field in ("title", "description", "tags"):
+        text_statistics(corpus, field, LABELS[field])
+    for field in ("title", "description", "tags"):
+        plot_distribution(corpus, field, LABELS[field])
+
+def topics_stage():
+    corpus = load_corpus(TRACKS_FILE)
+    texts = {field: corpus.texts(field) for field in LABELS}
+
+    # Cada texto é codificado uma única vez (e só se ainda não estiver em cache);
+    # os campos são fatias do corpus completo
+    embeddings = EmbeddingStore().embed(texts[None])
+
+    def field_embeddings(field):
+        first, last = corpus.document_range(field)
+        return embeddings[first:last]
+
+    analyze_topics(texts["title"], "Títulos", "topics_titles_model", field_embeddings("title"))
+    analyze_topics(texts["description"], "Descrições", "topics_descriptions_model", field_embeddings("description"))
+    analyze_topics(texts["tags"], "Tags", "topics_tags_model", field_embeddings("tags"))
+    analyze_topics(texts[None], "Todos", "topics_all_model", embeddings)
+
+def reduction_stage():
+    reduce_dimensionality(load_corpus(TRACKS_FILE))
+
+def bigrams_stage():
+    load_corpus(TRACKS_FILE)
+    bigrams = field_ngrams(n=2)
+    for field, label in LABELS.items():
+        generate_bigrams(bigrams[field], label)
+
+def sentiment_stage():
+    import nltk
+
+    # Baixa o léxico do VADER só na primeira vez (sem acesso à rede nas execuções em cache)
+    try:
+        nltk.data.find('sentiment/vader_lexicon.zip')
+    except LookupError:
+        nltk.download('vader_lexicon')
+    sentiments = sentiment_table(load_corpus(TRACKS_FILE))
+    for field, label in LABELS.items():
+        analyze_sentiment(sentiments, field, label)
+
+def wordcloud_stage():
+    corpus = load_corpus(TRACKS_FILE)
+    for field, label in LABELS.items():
+        generate_wordcloud(corpus, field, label)
+
+def main():
+    corpus_stage()
+    statistics_stage()
+    topics_stage()
+    reduction_stage()
+    bigrams_stage()
+    sentiment_stage()
+    wordcloud_stage()
+
+if __name__ == "__main__":
+    main()